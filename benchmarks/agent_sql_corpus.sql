@@ -0,0 +1,37 @@
+-- SQL written by the NBA_Stats_DB agent and the template planner, one statement per line.
+-- Replayed by bench_query_indexes.py; append queries from the logs to keep it representative.
+SELECT player, team, gp, pts FROM player_stats ORDER BY pts DESC LIMIT 5
+SELECT player, pts FROM player_stats ORDER BY pts DESC LIMIT 10
+SELECT player, team, gp, reb FROM player_stats ORDER BY reb DESC LIMIT 5
+SELECT player, team, gp, ast FROM player_stats ORDER BY ast DESC LIMIT 5
+SELECT player, team, gp, stl FROM player_stats ORDER BY stl DESC LIMIT 5
+SELECT player, team, gp, blk FROM player_stats ORDER BY blk DESC LIMIT 3
+SELECT player, team, gp, three_pm FROM player_stats ORDER BY three_pm DESC LIMIT 5
+SELECT player, team, gp, min FROM player_stats ORDER BY min DESC LIMIT 5
+SELECT player, team, gp, tov FROM player_stats ORDER BY tov ASC LIMIT 5
+SELECT player, team, gp, ROUND(CAST(pts AS REAL) / gp, 1) AS pts_per_game FROM player_stats WHERE gp > 0 ORDER BY pts_per_game DESC LIMIT 5
+SELECT player, team, gp, fg_pct FROM player_stats WHERE fgm >= 300 ORDER BY fg_pct DESC LIMIT 5
+SELECT player, team, gp, three_p_pct FROM player_stats WHERE three_pm >= 82 ORDER BY three_p_pct DESC LIMIT 10
+SELECT player, pts, reb, ast FROM player_stats WHERE team = 'OKC' ORDER BY pts DESC
+SELECT player, pts FROM player_stats WHERE team = 'LAL' ORDER BY pts DESC LIMIT 1
+SELECT player, reb FROM player_stats WHERE team = 'DEN' ORDER BY reb DESC LIMIT 3
+SELECT player, ast FROM player_stats WHERE team = 'BOS' ORDER BY ast DESC LIMIT 3
+SELECT SUM(pts) FROM player_stats WHERE team = 'GSW'
+SELECT AVG(age) FROM player_stats WHERE team = 'LAL'
+SELECT COUNT(*) FROM player_stats WHERE team = 'MIA'
+SELECT team, SUM(pts) AS total_points FROM player_stats GROUP BY team ORDER BY total_points DESC LIMIT 5
+SELECT team, SUM(reb) AS total_rebounds FROM player_stats GROUP BY team ORDER BY total_rebounds DESC LIMIT 1
+SELECT team, COUNT(*) FROM player_stats GROUP BY team
+SELECT player, age, team FROM player_stats WHERE age >= 38 ORDER BY age DESC
+SELECT player, age FROM player_stats WHERE age <= 20
+SELECT player, team, pts FROM player_stats WHERE age < 23 ORDER BY pts DESC LIMIT 5
+SELECT player, age FROM player_stats ORDER BY age DESC LIMIT 1
+SELECT * FROM player_stats WHERE player = 'Nikola Jokić'
+SELECT player, team, gp, pts, ast FROM player_stats WHERE player IN ('Shai Gilgeous-Alexander', 'Trae Young')
+SELECT player, pts, reb, ast FROM player_stats WHERE player LIKE '%James%'
+SELECT player, ast, tov FROM player_stats WHERE ast > 400 ORDER BY ast DESC
+SELECT player, pts FROM player_stats WHERE pts > 2000
+SELECT player, plus_minus FROM player_stats ORDER BY plus_minus DESC LIMIT 5
+SELECT player, dreb FROM player_stats ORDER BY dreb DESC LIMIT 5
+SELECT player, ftm, ft_pct FROM player_stats WHERE ftm >= 125 ORDER BY ft_pct DESC LIMIT 5
+SELECT COUNT(*) FROM player_stats WHERE pts > 1500 AND ast > 500
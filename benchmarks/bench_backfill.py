@@ -0,0 +1,53 @@
+"""
+Benchmark: multi-file ingestion (`ingest_directory`) with 1 to N worker processes.
+
+--files synthetic workbooks of --rows rows each (those of bench_ingestion.py,
+named by season) are ingested into an empty database, with a cold source
+cache, once per worker count.
+
+Usage:
+    python benchmarks/bench_backfill.py --files 8 --rows 50000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Add project root to python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_ingestion import make_workbook
+from src.core.config import settings
+from src.data.backfill import ingest_directory
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=50_000, help="Rows per workbook")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count()])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = os.path.join(tmp, "raw")
+        os.makedirs(raw)
+        for i in range(args.files):
+            make_workbook(os.path.join(raw, f"regular_NBA_{2000 + i}-{(i + 1) % 100:02d}.xlsx"), args.rows, seed=i)
+        print(f"{args.files} workbooks of {args.rows} rows, {os.cpu_count()} cores")
+
+        baseline = None
+        for workers in args.workers:
+            run = os.path.join(tmp, f"run_{workers}")
+            os.makedirs(run)
+            settings.DATABASE_URL = f"sqlite:///{os.path.join(run, 'stats.db')}"
+            settings.SOURCE_CACHE_DIR = os.path.join(run, "cache")
+            settings.DATA_VERSION_FILE = os.path.join(run, "data_version.json")
+
+            start = time.perf_counter()
+            reports = ingest_directory(raw, workers=workers)
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            rows = sum(report.result.inserted for report in reports)
+            print(f"workers={workers:<3} {rows} rows in {seconds:6.1f}s ({rows / seconds:,.0f} rows/s, {baseline / seconds:.1f}x)")
+            shutil.rmtree(settings.SOURCE_CACHE_DIR)
@@ -0,0 +1,113 @@
+"""
+Benchmark: analytical stats queries on SQLite vs the in-memory columnar engine.
+
+Each question is answered both with the SQL the agent would write (run on a
+pooled read engine, rows fetched) and with `ColumnarStats.query` (NumPy
+arrays, text table formatted). Works on a copy of the stats DB, optionally
+with its rows replicated to see how both sides grow with the table.
+
+Usage:
+    python load_excel_to_db.py   # once, to create data/sportsee.db
+    python benchmarks/bench_columnar_stats.py --iterations 1000 --scale 1
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# Add project root to python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from src.core.config import settings
+from src.data.engine import get_read_engine
+from src.rag.columnar_stats import ColumnarStats
+
+# (question, SQL, columnar query arguments)
+QUERIES = [
+    (
+        "top 5 scorers",
+        "SELECT player, team, gp, pts FROM player_stats WHERE season = :season ORDER BY pts DESC LIMIT 5",
+        {"metric": "pts"},
+    ),
+    (
+        "top 5 reb/game, gp >= 50",
+        "SELECT player, team, gp, CAST(reb AS REAL) / gp AS r FROM player_stats WHERE season = :season AND gp >= 50 ORDER BY r DESC LIMIT 5",
+        {"metric": "reb", "per_game": True, "filters": [{"column": "gp", "op": ">=", "value": 50}]},
+    ),
+    (
+        "mean age, pts > 1000",
+        "SELECT AVG(age) FROM player_stats WHERE season = :season AND pts > 1000",
+        {"metric": "age", "operation": "mean", "filters": [{"column": "pts", "op": ">", "value": 1000}]},
+    ),
+    (
+        "points by team",
+        "SELECT team, SUM(pts) AS total FROM player_stats WHERE season = :season GROUP BY team ORDER BY total DESC LIMIT 5",
+        {"metric": "pts", "operation": "sum", "group_by_team": True},
+    ),
+    (
+        "90th percentile of ast",
+        "SELECT ast FROM player_stats WHERE season = :season AND ast IS NOT NULL ORDER BY ast "
+        "LIMIT 1 OFFSET (SELECT CAST(0.9 * (COUNT(ast) - 1) AS INTEGER) FROM player_stats WHERE season = :season)",
+        {"metric": "ast", "operation": "percentile", "percentile": 90},
+    ),
+    (
+        "median pts by team",
+        "WITH ranked AS (SELECT team, pts, ROW_NUMBER() OVER (PARTITION BY team ORDER BY pts) AS rn, "
+        "COUNT(*) OVER (PARTITION BY team) AS n FROM player_stats WHERE season = :season AND pts IS NOT NULL) "
+        "SELECT team, AVG(pts) AS median FROM ranked WHERE rn IN ((n + 1) / 2, (n + 2) / 2) "
+        "GROUP BY team ORDER BY median DESC LIMIT 5",
+        {"metric": "pts", "operation": "median", "group_by_team": True},
+    ),
+]
+
+
+def median_ms(fn, iterations: int) -> float:
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--scale", type=int, default=1, help="Copies of the player rows")
+    args = parser.parse_args()
+
+    source = settings.DATABASE_URL.replace("sqlite:///", "", 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stats.db")
+        shutil.copyfile(source, path)
+        with sqlite3.connect(path) as conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(player_stats)") if row[1] != "id"]
+            names = ", ".join(columns)
+            # Each copy is an earlier season: (player, team, season) stays unique
+            copied = ", ".join("?" if column == "season" else column for column in columns)
+            last_id = conn.execute("SELECT MAX(id) FROM player_stats").fetchone()[0]
+            for i in range(1, args.scale):
+                conn.execute(
+                    f"INSERT INTO player_stats ({names}) SELECT {copied} FROM player_stats WHERE id <= ?",
+                    (f"19{i:02d}-{(i + 1) % 100:02d}", last_id),
+                )
+            season = conn.execute("SELECT MAX(season) FROM player_stats").fetchone()[0]
+
+        engine = get_read_engine(f"sqlite:///{path}")
+        columnar = ColumnarStats(engine)
+        start = time.perf_counter()
+        snapshot = columnar.snapshot()
+        print(f"{snapshot.rows} player rows, columnar load {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        print(f"{'question':<28} {'sqlite':>10} {'columnar':>10} {'speedup':>8}")
+        with engine.connect() as conn:
+            for question, sql, kwargs in QUERIES:
+                sqlite_ms = median_ms(lambda: conn.execute(text(sql), {"season": season}).fetchall(), args.iterations)
+                columnar_ms = median_ms(lambda: columnar.query(**kwargs), args.iterations)
+                print(f"{question:<28} {sqlite_ms:>8.3f}ms {columnar_ms:>8.3f}ms {sqlite_ms / columnar_ms:>7.1f}x")
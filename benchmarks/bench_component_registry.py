@@ -0,0 +1,68 @@
+"""
+Benchmark: per-request agent overhead before/after the component registry.
+
+"before" rebuilds the hybrid agent like the old /chat handler did on every RAG
+query (Mistral clients + SQL schema reflection + FAISS load). "after" is what a
+request pays once the registry has been warmed up at startup.
+
+No LLM call is made: only construction overhead is measured.
+
+Usage:
+    python benchmarks/bench_component_registry.py --iterations 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add project root to python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api.components import ComponentRegistry
+from src.rag.chain import get_rag_agent
+
+
+def _summary(label: str, samples):
+    samples_ms = sorted(s * 1000 for s in samples)
+    p50 = statistics.median(samples_ms)
+    p95 = samples_ms[int(0.95 * (len(samples_ms) - 1))]
+    print(f"{label:<28} p50={p50:9.3f} ms   p95={p95:9.3f} ms   n={len(samples_ms)}")
+
+
+def bench_before(iterations: int):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        get_rag_agent()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_after(iterations: int):
+    registry = ComponentRegistry()
+    start = time.perf_counter()
+    registry.warmup()
+    print(f"One-off warmup at startup: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    async def run():
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            # What chat_endpoint does before invoking the agent
+            await registry.ensure_ready()
+            registry.agent
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    _summary("before (build per request)", bench_before(args.iterations))
+    _summary("after (shared registry)", bench_after(args.iterations))
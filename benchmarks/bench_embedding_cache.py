@@ -0,0 +1,69 @@
+"""
+Benchmark: query embeddings through `CachedEmbeddings`, memory and disk tiers.
+
+An embedder that sleeps --latency ms per call stands in for mistral-embed.
+--queries queries are drawn from --distinct texts (skewed like real traffic),
+first on a cold cache, then by a second "worker" sharing only the disk tier.
+
+Usage:
+    python benchmarks/bench_embedding_cache.py --queries 2000 --distinct 200 --latency 150
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add project root to python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.embeddings import Embeddings
+
+from src.rag.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+class SlowEmbeddings(Embeddings):
+    model = "slow-embed"
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        time.sleep(self.latency)
+        return [float(ord(c)) for c in text[:16].ljust(16)] * 64
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+def run(name, embeddings, queries):
+    start = time.perf_counter()
+    for query in queries:
+        embeddings.embed_query(query)
+    seconds = time.perf_counter() - start
+    stats = embeddings.cache.stats()
+    print(
+        f"{name:<14} {len(queries)} queries in {seconds:6.2f}s, {embeddings.embeddings.calls} API calls, "
+        f"hit rate {stats['hit_rate']:.1%}, saved {stats['saved_seconds']:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--distinct", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=150, help="Milliseconds per API call")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts = [f"Who had the most {i} points in season {i % 7}?" for i in range(args.distinct)]
+    queries = [texts[min(int(rng.paretovariate(1.2)) - 1, args.distinct - 1)] for _ in range(args.queries)]
+    print(f"No cache: about {args.queries * args.latency / 1000:.1f}s of API calls")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "embeddings.db")
+        run("cold worker", CachedEmbeddings(SlowEmbeddings(args.latency / 1000), EmbeddingCache(path=path)), queries)
+        run("second worker", CachedEmbeddings(SlowEmbeddings(args.latency / 1000), EmbeddingCache(path=path)), queries)
@@ -0,0 +1,146 @@
+"""
+Benchmark: vectorized validation + batched Core inserts vs the previous
+iterrows / per-row PlayerStats / per-row ORM object ingestion.
+
+A synthetic workbook is generated from the rows of data/raw/regular_NBA.xlsx
+(names made unique, stats jittered, ~0.1% invalid cells, PlayerStats
+columns only), in the same layout (header on the second row). The workbook is read once; each loader then
+writes into its own empty SQLite database. The legacy loader is slow, so it
+runs on the first --legacy-rows rows and its throughput is extrapolated.
+The bulk database is then refreshed twice, as a nightly re-ingestion would:
+with the same rows (nothing to write) and with --changed-pct of the rows
+modified and as many removed and added.
+
+Usage:
+    python benchmarks/bench_ingestion.py --rows 1000000
+    python benchmarks/bench_ingestion.py --rows 100000 --workbook /tmp/stats_100k.xlsx   # kept for reruns
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.data.aggregates import materialize_aggregates
+from src.data.excel_reader import read_stats_excel
+from src.data.ingestion import load_dataframe
+from src.data.models import Base, PlayerStatsSQL
+from src.data.schemas import PlayerStats
+
+SOURCE_WORKBOOK = "data/raw/regular_NBA.xlsx"
+
+
+def make_workbook(path: str, rows: int, seed: int = 0, chunk: int = 50_000):
+    """
+    Streams the synthetic rows to a write-only workbook (a DataFrame.to_excel
+    of 1M rows does not fit in memory). Only the PlayerStats columns are kept.
+    """
+    rng = np.random.default_rng(seed)
+    base = read_stats_excel(SOURCE_WORKBOOK)
+    columns = [field.alias for field in PlayerStats.model_fields.values()]
+    base = base[columns]
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(["Synthetic NBA stats"])
+    sheet.append(columns)
+    for offset in range(0, rows, chunk):
+        size = min(chunk, rows - offset)
+        df = base.iloc[rng.integers(0, len(base), size)].reset_index(drop=True)
+        df["Player"] = df["Player"] + " #" + pd.Series(np.arange(offset, offset + size)).astype(str)
+        for column in ("PTS", "REB", "AST"):
+            df[column] = (df[column] * rng.uniform(0.8, 1.2, size)).round()
+        # A few bad cells, reported as row errors
+        df["Age"] = df["Age"].astype(object)
+        df.loc[rng.choice(size, max(1, size // 1000), replace=False), "Age"] = "n/a"
+        for row in df.itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(path)
+
+
+def legacy_load(df: pd.DataFrame, engine):
+    """
+    The previous ingestion loop, kept here as the baseline.
+    """
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    valid_count, errors = 0, []
+    for index, row in df.iterrows():
+        try:
+            player_data = PlayerStats(**row.to_dict())
+            session.add(PlayerStatsSQL(**player_data.model_dump()))
+            valid_count += 1
+        except Exception as e:
+            errors.append(f"Row {index}: {e}")
+    session.commit()
+    session.close()
+    return valid_count, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--legacy-rows", type=int, default=20_000, help="Rows loaded by the legacy loader")
+    parser.add_argument("--batch-size", type=int, default=None, help="Default: INGESTION_BATCH_SIZE")
+    parser.add_argument("--changed-pct", type=float, default=1.0, help="Share of rows changed for the refresh")
+    parser.add_argument("--workbook", help="Path of the synthetic workbook, reused if it exists")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workbook = args.workbook or os.path.join(tmp, "synthetic.xlsx")
+        if not os.path.exists(workbook):
+            start = time.perf_counter()
+            make_workbook(workbook, args.rows)
+            print(f"Generated {args.rows} rows in {time.perf_counter() - start:.1f}s ({os.path.getsize(workbook) / 1e6:.0f} MB)")
+
+        start = time.perf_counter()
+        df = read_stats_excel(workbook)
+        read_seconds = time.perf_counter() - start
+        print(f"read: {len(df)} rows in {read_seconds:.1f}s")
+
+        legacy_df = df.head(args.legacy_rows)
+        start = time.perf_counter()
+        legacy_count, legacy_errors = legacy_load(legacy_df, create_engine(f"sqlite:///{os.path.join(tmp, 'legacy.db')}"))
+        legacy_seconds = time.perf_counter() - start
+        legacy_rate = len(legacy_df) / legacy_seconds
+
+        bulk_engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bulk.db')}")
+        start = time.perf_counter()
+        result = load_dataframe(df, engine=bulk_engine, batch_size=args.batch_size)
+        count, errors = result.inserted, result.errors
+        bulk_seconds = time.perf_counter() - start
+        # The legacy loop did not build the aggregates: time them separately
+        start = time.perf_counter()
+        with bulk_engine.begin() as conn:
+            materialize_aggregates(conn)
+        aggregates_seconds = time.perf_counter() - start
+        bulk_rate = len(df) / (bulk_seconds - aggregates_seconds)
+
+        print(f"legacy: {legacy_count} rows, {len(legacy_errors)} errors in {legacy_seconds:.1f}s "
+              f"({legacy_rate:,.0f} rows/s, ~{len(df) / legacy_rate:.0f}s extrapolated to {len(df)} rows)")
+        print(f"bulk:   {count} rows, {len(errors)} errors in {bulk_seconds:.1f}s, of which ~{aggregates_seconds:.1f}s "
+              f"of aggregates ({bulk_rate:,.0f} rows/s without them) -> {bulk_rate / legacy_rate:.0f}x")
+
+        start = time.perf_counter()
+        same = load_dataframe(df, engine=bulk_engine, batch_size=args.batch_size)
+        print(f"refresh, unchanged rows: {same.unchanged} unchanged in {time.perf_counter() - start:.1f}s")
+
+        delta = max(1, int(len(df) * args.changed_pct / 100))
+        refreshed = df.iloc[delta:].copy()
+        refreshed.iloc[:delta, refreshed.columns.get_loc("PTS")] += 1
+        added = df.iloc[:delta].copy()
+        added["Player"] = added["Player"] + " (new)"
+        refreshed = pd.concat([refreshed, added])
+        start = time.perf_counter()
+        diff = load_dataframe(refreshed, engine=bulk_engine, batch_size=args.batch_size)
+        print(f"refresh, {args.changed_pct:g}% changed: {diff.inserted} inserted, {diff.updated} updated, "
+              f"{diff.deleted} deleted, {diff.unchanged} unchanged in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,90 @@
+"""
+Benchmark: peak memory (RSS) of loading a large workbook with
+`pd.read_excel` vs the streaming reader.
+
+Each mode runs in a fresh process, so that its peak RSS is its own:
+- ingest_read_excel: whole workbook in a DataFrame, then `load_dataframe`
+  (the previous ingestion)
+- ingest_stream: `ingest_data`'s path, batches of INGESTION_BATCH_SIZE rows
+  from `iter_stats_excel` into `load_batches`
+- drift_read_excel / drift_sample: the frames built by `run_drift_analysis`
+  before / after (a DRIFT_MAX_ROWS sample), without the Evidently report
+
+The synthetic workbook is the one of bench_ingestion.py.
+
+Usage:
+    python benchmarks/bench_ingestion_memory.py --rows 1000000 --workbook /tmp/stats_1m.xlsx
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add project root to python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from bench_ingestion import make_workbook
+from src.core.config import settings
+from src.data.excel_reader import iter_stats_excel, sample_stats_excel
+from src.data.ingestion import STAT_ALIASES, load_batches, load_dataframe
+
+MODES = ("ingest_read_excel", "ingest_stream", "drift_read_excel", "drift_sample")
+
+
+def peak_rss_mb() -> float:
+    # KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode: str, workbook: str, database: str) -> dict:
+    baseline = peak_rss_mb()
+    engine = create_engine(f"sqlite:///{database}")
+    start = time.perf_counter()
+    if mode == "ingest_read_excel":
+        df = pd.read_excel(workbook, header=1)
+        rows = load_dataframe(df, engine=engine).inserted
+    elif mode == "ingest_stream":
+        batches = iter_stats_excel(workbook, settings.INGESTION_BATCH_SIZE, columns=STAT_ALIASES)
+        rows = load_batches(batches, engine=engine).inserted
+    elif mode == "drift_read_excel":
+        rows = len(pd.read_excel(workbook, header=1))
+    else:
+        rows = len(sample_stats_excel(workbook, settings.DRIFT_MAX_ROWS))
+    return {"rows": rows, "seconds": time.perf_counter() - start, "baseline_mb": baseline, "peak_mb": peak_rss_mb()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workbook", help="Path of the synthetic workbook, reused if it exists")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)  # child process
+    parser.add_argument("--database", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.workbook, args.database)))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workbook = args.workbook or os.path.join(tmp, "synthetic.xlsx")
+        if not os.path.exists(workbook):
+            make_workbook(workbook, args.rows)
+        print(f"Workbook: {workbook} ({os.path.getsize(workbook) / 1e6:.0f} MB)")
+
+        for mode in args.modes:
+            database = os.path.join(tmp, f"{mode}.db")
+            child = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--mode", mode, "--workbook", workbook, "--database", database],
+                capture_output=True, text=True, check=True,
+            )
+            stats = json.loads(child.stdout.strip().splitlines()[-1])
+            print(f"{mode:18} {stats['rows']:>9} rows in {stats['seconds']:6.1f}s, "
+                  f"peak RSS {stats['peak_mb']:7.0f} MB (+{stats['peak_mb'] - stats['baseline_mb']:.0f} MB over imports)")
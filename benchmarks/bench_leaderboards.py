@@ -0,0 +1,111 @@
+"""
+Benchmark: top-N and team questions on player_stats vs the materialized views.
+
+"before" runs the queries the planner and the SQL agent write against
+player_stats (sort of the whole table, GROUP BY team). "after" runs the same
+questions against the `leaderboard` and `team_stats` views that the ingestion
+materializes, for the latest season. Works on a copy of the stats DB,
+optionally with its rows replicated as earlier seasons to see how both sides
+grow with the table.
+
+Usage:
+    python load_excel_to_db.py   # once, to create data/sportsee.db
+    python benchmarks/bench_leaderboards.py --iterations 2000 --scale 1
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Add project root to python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from src.core.config import settings
+from src.data.aggregates import materialize_aggregates
+
+# (question, player_stats query, view query)
+QUERIES = [
+    (
+        "top 5 points",
+        "SELECT player, team, gp, pts FROM player_stats WHERE season = :season ORDER BY pts DESC, player LIMIT 5",
+        "SELECT player, team, gp, value AS pts FROM leaderboard WHERE stat = 'pts' AND season = :season ORDER BY rank LIMIT 5",
+    ),
+    (
+        "top 5 assists per game",
+        "SELECT player, team, gp, ROUND(CAST(ast AS REAL) / gp, 1) AS ast_per_game FROM player_stats WHERE season = :season AND gp > 0 ORDER BY ast_per_game DESC, player LIMIT 5",
+        "SELECT player, team, gp, value_per_game AS ast_per_game FROM leaderboard WHERE stat = 'ast' AND season = :season AND per_game_rank IS NOT NULL ORDER BY per_game_rank LIMIT 5",
+    ),
+    (
+        "top 10 3P% (qualified)",
+        "SELECT player, team, gp, three_p_pct FROM player_stats WHERE season = :season AND three_pm >= 82 ORDER BY three_p_pct DESC, player LIMIT 10",
+        "SELECT player, team, gp, value AS three_p_pct FROM leaderboard WHERE stat = 'three_p_pct' AND season = :season ORDER BY rank LIMIT 10",
+    ),
+    (
+        "team with most points",
+        "SELECT team, SUM(pts) AS pts_total FROM player_stats WHERE season = :season GROUP BY team ORDER BY pts_total DESC LIMIT 1",
+        "SELECT team, pts_total FROM team_stats WHERE season = :season ORDER BY pts_total DESC LIMIT 1",
+    ),
+    (
+        "team FG%",
+        "SELECT team, ROUND(100.0 * SUM(fgm) / SUM(fga), 1) AS fg_pct FROM player_stats WHERE season = :season AND team = 'OKC' GROUP BY team",
+        "SELECT team, fg_pct FROM team_stats WHERE season = :season AND team = 'OKC'",
+    ),
+]
+
+
+def measure(conn, sql: str, params: dict, iterations: int) -> float:
+    """
+    Median latency in ms.
+    """
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        conn.execute(text(sql), params).fetchall()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--scale", type=int, default=1, help="Copies of the player rows")
+    args = parser.parse_args()
+
+    source = settings.DATABASE_URL.replace("sqlite:///", "", 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stats.db")
+        shutil.copyfile(source, path)
+        engine = create_engine(f"sqlite:///{path}")
+
+        with engine.begin() as conn:
+            columns = [row[1] for row in conn.execute(text("PRAGMA table_info(player_stats)")) if row[1] != "id"]
+            names = ", ".join(columns)
+            # Each copy is an earlier season: (player, team, season) stays unique
+            copied = ", ".join(":season" if column == "season" else column for column in columns)
+            last_id = conn.execute(text("SELECT MAX(id) FROM player_stats")).scalar()
+            for i in range(1, args.scale):
+                conn.execute(
+                    text(f"INSERT INTO player_stats ({names}) SELECT {copied} FROM player_stats WHERE id <= :last_id"),
+                    {"season": f"19{i:02d}-{(i + 1) % 100:02d}", "last_id": last_id},
+                )
+            season = conn.execute(text("SELECT MAX(season) FROM player_stats")).scalar()
+            start = time.perf_counter()
+            materialize_aggregates(conn)
+            materialize_ms = (time.perf_counter() - start) * 1000
+
+        with engine.connect() as conn:
+            count = conn.execute(text("SELECT COUNT(*) FROM player_stats")).scalar()
+            print(f"{count} player rows, aggregates materialized in {materialize_ms:.0f} ms")
+            print(f"{'question':<26} {'before':>10} {'after':>10} {'speedup':>8}")
+            for question, before_sql, after_sql in QUERIES:
+                # Both sides must answer the question the same way (ties broken by player name)
+                params = {"season": season}
+                assert conn.execute(text(before_sql), params).fetchall() == conn.execute(text(after_sql), params).fetchall(), question
+                before = measure(conn, before_sql, params, args.iterations)
+                after = measure(conn, after_sql, params, args.iterations)
+                print(f"{question:<26} {before:>8.3f}ms {after:>8.3f}ms {before / after:>7.1f}x")
@@ -0,0 +1,133 @@
+"""
+Benchmark: replays a corpus of agent SQL with and without the player_stats
+indexes, and reports the query plan of each statement.
+
+"before" is a copy of the stats DB with only the original indexes (id,
+player); "after" has the indexes of `PlayerStatsSQL` (see `ensure_indexes`)
+and fresh ANALYZE statistics. For each query, EXPLAIN QUERY PLAN tells
+whether SQLite searches an index, walks one in order, scans the whole table
+and/or sorts in a temporary b-tree. Queries that still scan after the
+indexes are listed at the end: they are the candidates for the next index
+(or are full-table by nature, like LIKE '%...%').
+
+Usage:
+    python load_excel_to_db.py   # once, to create data/sportsee.db
+    python benchmarks/bench_query_indexes.py --scale 20
+    python benchmarks/bench_query_indexes.py --corpus queries.sql   # one statement per line
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# Add project root to python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+
+from src.core.config import settings
+from src.data.models import PlayerStatsSQL, ensure_indexes
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agent_sql_corpus.sql")
+ORIGINAL_INDEXES = {"ix_player_stats_id", "ix_player_stats_player"}
+
+
+def load_corpus(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip().rstrip(";") for line in f]
+    return [line for line in lines if line and not line.startswith("--")]
+
+
+def query_plan(conn: sqlite3.Connection, sql: str) -> list:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def classify(plan: list) -> str:
+    """
+    search: index lookup; index: ordered/covering index walk; scan: full
+    table scan; "+sort" when the rows are sorted in a temporary b-tree.
+    """
+    kind = "search"
+    for detail in plan:
+        if detail.startswith("SCAN") and "USING" not in detail:
+            kind = "scan"
+        elif detail.startswith("SCAN") and kind != "scan":
+            kind = "index"
+    if any("TEMP B-TREE" in detail for detail in plan):
+        kind += "+sort"
+    return kind
+
+
+def median_ms(conn: sqlite3.Connection, sql: str, iterations: int) -> float:
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        conn.execute(sql).fetchall()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+def prepare(source: str, target: str, scale: int, indexed: bool):
+    shutil.copyfile(source, target)
+    with sqlite3.connect(target) as conn:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(player_stats)") if row[1] != "id"]
+        names = ", ".join(columns)
+        # Each copy is an earlier season: (player, team, season) stays unique
+        copied = ", ".join("?" if column == "season" else column for column in columns)
+        last_id = conn.execute("SELECT MAX(id) FROM player_stats").fetchone()[0]
+        for i in range(1, scale):
+            conn.execute(
+                f"INSERT INTO player_stats ({names}) SELECT {copied} FROM player_stats WHERE id <= ?",
+                (f"19{i:02d}-{(i + 1) % 100:02d}", last_id),
+            )
+        for index in PlayerStatsSQL.__table__.indexes:
+            if index.name not in ORIGINAL_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {index.name}")
+        conn.execute("DROP TABLE IF EXISTS sqlite_stat1")
+
+    if indexed:
+        engine = create_engine(f"sqlite:///{target}")
+        ensure_indexes(engine)
+        engine.dispose()
+        with sqlite3.connect(target) as conn:
+            conn.execute("ANALYZE")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="SQL statements, one per line")
+    parser.add_argument("--scale", type=int, default=1, help="Copies of the player rows, e.g. one per season")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    source = settings.DATABASE_URL.replace("sqlite:///", "", 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        before_path, after_path = os.path.join(tmp, "before.db"), os.path.join(tmp, "after.db")
+        prepare(source, before_path, args.scale, indexed=False)
+        prepare(source, after_path, args.scale, indexed=True)
+        before, after = sqlite3.connect(before_path), sqlite3.connect(after_path)
+        rows = after.execute("SELECT COUNT(*) FROM player_stats").fetchone()[0]
+
+        print(f"{len(corpus)} queries, {rows} player rows, {args.iterations} runs each")
+        print(f"{'query':<60} {'before':<12} {'after':<12} {'before ms':>10} {'after ms':>10}")
+        still_scanning = []
+        total_before = total_after = 0.0
+        for sql in corpus:
+            plan_before, plan_after = query_plan(before, sql), query_plan(after, sql)
+            ms_before, ms_after = median_ms(before, sql, args.iterations), median_ms(after, sql, args.iterations)
+            total_before += ms_before
+            total_after += ms_after
+            label = sql if len(sql) <= 60 else sql[:57] + "..."
+            print(f"{label:<60} {classify(plan_before):<12} {classify(plan_after):<12} {ms_before:>10.3f} {ms_after:>10.3f}")
+            if classify(plan_after).startswith("scan"):
+                still_scanning.append((sql, plan_after))
+
+        print(f"\nTotal median time: before {total_before:.2f} ms, after {total_after:.2f} ms")
+        print(f"Full table scans: before {sum(classify(query_plan(before, sql)).startswith('scan') for sql in corpus)}, after {len(still_scanning)}")
+        for sql, plan in still_scanning:
+            print(f"\n  {sql}\n    " + "\n    ".join(plan))
@@ -0,0 +1,92 @@
+"""
+Benchmark: NBA_Stats_DB latency and LLM calls with and without the SQL template planner.
+
+Runs a representative question set through the NBA_Stats_DB tool twice:
+"before" sends every question to the ReAct SQL agent, "after" tries the
+template planner first. The SQL agent is the real one from `get_sql_tool`
+against the local SQLite DB; its LLM is a fake with a fixed latency per call
+(2 calls per question, the minimum of a real run, which usually takes 3-6).
+
+Usage:
+    python load_excel_to_db.py   # once, to create data/sportsee.db
+    python benchmarks/bench_query_planner.py --latency 1.0
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add project root to python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_sql_tool_concurrency import FakeReActLLM
+from src.monitoring.timing import StageTimer
+from src.rag.chain import build_sql_agent_tool
+from src.rag.query_planner import get_query_planner
+from src.rag.sql_tool import get_sql_tool
+
+QUESTIONS = [
+    "Top 10 players by points",
+    "Who has the most assists?",
+    "Who has the most rebounds per game?",
+    "Quels sont les 5 meilleurs marqueurs ?",
+    "Qui a le plus de passes décisives par match ?",
+    "Top 5 in steals",
+    "Who has the best FG%?",
+    "Best three point percentage this season",
+    "Top 3 shot blockers by blocks",
+    "Stats for Nikola Jokic",
+    "How many points did Shai Gilgeous-Alexander score?",
+    "Statistiques de Victor Wembanyama",
+    "How many three pointers did Anthony Edwards make?",
+    "What is LeBron James's plus/minus?",
+    "Compare Jayson Tatum and Jaylen Brown",
+    "Compare Luka Dončić and Trae Young in assists and turnovers",
+    "Giannis Antetokounmpo vs Nikola Jokić rebounds",
+    "Which team has the most wins?",
+    "What is the average age of players on the Lakers?",
+    "How many players scored more than 2000 points?",
+]
+
+
+async def run_question(tool, question: str):
+    timer = StageTimer()
+    start = time.perf_counter()
+    await tool.ainvoke(question, config={"callbacks": [timer]})
+    llm_calls = sum(1 for stage in timer.stages if stage["stage"] == "llm")
+    return time.perf_counter() - start, llm_calls
+
+
+async def run_set(tool):
+    return [await run_question(tool, question) for question in QUESTIONS]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=1.0, help="Fake LLM latency per call (s)")
+    args = parser.parse_args()
+
+    sql_agent = get_sql_tool(FakeReActLLM(latency=args.latency))
+    sql_agent.verbose = False
+    planner = get_query_planner()
+
+    before = asyncio.run(run_set(build_sql_agent_tool(sql_agent)))
+    after = asyncio.run(run_set(build_sql_agent_tool(sql_agent, planner)))
+
+    templated = [question for question in QUESTIONS if planner.plan(question) is not None]
+    print(f"{len(QUESTIONS)} questions, {len(templated)} answered from templates ({len(templated) / len(QUESTIONS):.0%})")
+    for question in QUESTIONS:
+        planned = planner.plan(question)
+        print(f"  {planned.intent if planned else 'fallback':<13} {question}")
+
+    print(f"\n{'':<8} {'p50 latency':>12} {'mean latency':>13} {'LLM calls':>10}")
+    for label, results in (("before", before), ("after", after)):
+        latencies = [latency * 1000 for latency, _ in results]
+        calls = sum(llm_calls for _, llm_calls in results)
+        print(f"{label:<8} {statistics.median(latencies):>9.1f} ms {statistics.mean(latencies):>10.1f} ms {calls:>10}")
+
+    saved = sum(c for _, c in before) - sum(c for _, c in after)
+    print(f"\nLLM calls saved: {saved} ({saved / max(1, sum(c for _, c in before)):.0%}); "
+          f"a real SQL agent run takes 3-6 calls, so the saving per templated question is larger in production")
@@ -0,0 +1,89 @@
+"""
+Benchmark: schema context sent to the SQL agent, before/after the schema catalog.
+
+"before" is what the stock SQL agent fetches for every question: the output of
+sql_db_schema, i.e. `SQLDatabase.get_table_info()` (full DDL + 3 sample rows,
+reflected and queried on each call). "after" is the catalog context pruned to
+the question's columns, sent with the question. Token counts use tiktoken's
+cl100k_base encoding when available (len // 4 otherwise); the Mistral
+tokenizer differs slightly but the ratio is what matters.
+
+Usage:
+    python load_excel_to_db.py   # once, to create data/sportsee.db
+    python benchmarks/bench_schema_catalog.py --iterations 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Add project root to python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.utilities import SQLDatabase
+
+from src.core.config import settings
+from src.rag.schema_catalog import get_schema_catalog
+
+QUESTIONS = [
+    "Which team has the most wins?",
+    "What is the average age of players on the Lakers?",
+    "How many players scored more than 2000 points?",
+    "Which players have more than 500 assists and fewer than 200 turnovers?",
+    "What is the correlation between three point attempts and three point percentage?",
+    "Which guards under 25 have the best free throw percentage?",
+    "Who has the best plus/minus among players with at least 60 games played?",
+    "How many offensive rebounds did the Nuggets get in total?",
+]
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+    TOKENIZER = "tiktoken cl100k_base"
+
+    def count_tokens(text: str) -> int:
+        return len(_encoding.encode(text))
+except Exception:  # tiktoken missing or its encoding cannot be downloaded
+    TOKENIZER = "len // 4 estimate"
+
+    def count_tokens(text: str) -> int:
+        return len(text) // 4
+
+
+def time_ms(fn, iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    db = SQLDatabase.from_uri(settings.DATABASE_URL)
+    catalog = get_schema_catalog()
+
+    full_tokens = count_tokens(db.get_table_info())
+    print(f"token counts: {TOKENIZER}")
+    print(f"{'question':<82} {'before':>7} {'after':>6}")
+    after_tokens = []
+    for question in QUESTIONS:
+        tokens = count_tokens(catalog.prompt_context(question))
+        after_tokens.append(tokens)
+        print(f"{question:<82} {full_tokens:>7} {tokens:>6}")
+
+    mean_after = statistics.mean(after_tokens)
+    print(f"\nmean schema tokens per question: {full_tokens} -> {mean_after:.0f} ({1 - mean_after / full_tokens:.0%} fewer)")
+    print("(the stock agent also re-sends the table list and schema in every later step of its scratchpad)")
+
+    before_ms = time_ms(lambda: SQLDatabase.from_uri(settings.DATABASE_URL).get_table_info(), args.iterations)
+    schema_ms = time_ms(db.get_table_info, args.iterations)
+    after_ms = time_ms(lambda: catalog.prompt_context(QUESTIONS[0]), args.iterations)
+    print(f"\nschema cost per question (p50): reflect + get_table_info {before_ms:.2f} ms, "
+          f"get_table_info on a reflected db {schema_ms:.2f} ms, catalog {after_ms:.3f} ms")
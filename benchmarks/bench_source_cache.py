@@ -0,0 +1,61 @@
+"""
+Benchmark: reading a workbook through openpyxl vs from its cached parsed copy.
+
+On the synthetic workbook of bench_ingestion.py, times:
+- the ingestion read (INGESTION_BATCH_SIZE batches of the PlayerStats columns)
+  and the drift read (a DRIFT_MAX_ROWS sample) straight from the workbook
+- the first cached read, which parses the workbook and writes the cache entry
+- the same reads from the memory-mapped cache entry
+
+Usage:
+    python benchmarks/bench_source_cache.py --rows 1000000 --workbook /tmp/stats_1m.xlsx
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_ingestion import make_workbook
+from src.core.config import settings
+from src.data.excel_reader import iter_stats_excel, sample_stats_excel
+from src.data.ingestion import STAT_ALIASES
+from src.data.source_cache import cached_source, iter_source_batches, sample_source
+
+
+def timed(label: str, read) -> float:
+    start = time.perf_counter()
+    rows = read()
+    seconds = time.perf_counter() - start
+    print(f"{label:28} {rows:>9} rows in {seconds:6.2f}s")
+    return seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workbook", help="Path of the synthetic workbook, reused if it exists")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.SOURCE_CACHE_DIR = os.path.join(tmp, "cache")
+        workbook = args.workbook or os.path.join(tmp, "synthetic.xlsx")
+        if not os.path.exists(workbook):
+            make_workbook(workbook, args.rows)
+        print(f"Workbook: {workbook} ({os.path.getsize(workbook) / 1e6:.0f} MB)")
+
+        def ingestion_read(batches):
+            return lambda: sum(len(batch) for batch in batches(workbook, settings.INGESTION_BATCH_SIZE, columns=STAT_ALIASES))
+
+        excel_ingestion = timed("ingestion, openpyxl", ingestion_read(iter_stats_excel))
+        excel_drift = timed("drift, openpyxl", lambda: len(sample_stats_excel(workbook, settings.DRIFT_MAX_ROWS)))
+        timed("cache build", lambda: cached_source(workbook)["rows"])
+        cached_ingestion = timed("ingestion, cached", ingestion_read(iter_source_batches))
+        cached_drift = timed("drift, cached", lambda: len(sample_source(workbook, settings.DRIFT_MAX_ROWS)))
+
+        size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(settings.SOURCE_CACHE_DIR) for name in names)
+        print(f"cache entry: {size / 1e6:.0f} MB; speedup ingestion {excel_ingestion / cached_ingestion:.0f}x, "
+              f"drift {excel_drift / cached_drift:.0f}x")
@@ -0,0 +1,96 @@
+"""
+Load test: NBA_Stats_DB tool throughput vs. concurrency.
+
+Compares the old wrapping (`Tool(func=sql_agent.invoke)`, which `ainvoke`
+can only run in a worker thread for the whole nested agent run) with the
+coroutine tool from `build_sql_agent_tool`. The SQL agent is the real one from
+`get_sql_tool` against the local SQLite DB; only the LLM is replaced by a fake
+model with a fixed latency per call, so the numbers isolate the concurrency
+behaviour of the tool itself.
+
+Usage:
+    python load_excel_to_db.py   # once, to create data/sportsee.db
+    python benchmarks/bench_sql_tool_concurrency.py --latency 0.2 --requests 64
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, List, Optional
+
+# Add project root to python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.tools import Tool
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.rag.chain import build_sql_agent_tool
+from src.rag.sql_tool import get_sql_tool
+
+ACTION = (
+    "Thought: I should query the player_stats table.\n"
+    "Action: sql_db_query\n"
+    "Action Input: SELECT player, pts FROM player_stats ORDER BY pts DESC LIMIT 5"
+)
+FINAL = "Thought: I now know the final answer.\nFinal Answer: Shai Gilgeous-Alexander leads in points."
+
+
+class FakeReActLLM(BaseChatModel):
+    """Answers a ReAct step after `latency` seconds: one query, then the final answer."""
+
+    latency: float = 0.2
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-react"
+
+    def _reply(self, messages) -> ChatResult:
+        prompt = messages[-1].content
+        # The ReAct format instructions already mention "Observation:", so look
+        # for this model's own action in the scratchpad instead
+        content = FINAL if ACTION in prompt else ACTION
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _generate(self, messages: List[Any], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return self._reply(messages)
+
+    async def _agenerate(self, messages: List[Any], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._reply(messages)
+
+
+async def run_load(tool, concurrency: int, requests: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await tool.ainvoke("Who scores the most points?")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake LLM latency per call (s)")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32])
+    args = parser.parse_args()
+
+    sql_agent = get_sql_tool(FakeReActLLM(latency=args.latency))
+    sql_agent.verbose = False
+    tools = {
+        "before (func=invoke)": Tool(name="NBA_Stats_DB", func=sql_agent.invoke, description="stats"),
+        "after (coroutine)": build_sql_agent_tool(sql_agent),
+    }
+
+    print(f"{os.cpu_count()} CPUs, fake LLM latency {args.latency}s, 2 LLM calls + 1 SQL query per request")
+    print(f"{'concurrency':>11} " + " ".join(f"{name:>22}" for name in tools))
+    for concurrency in args.concurrency:
+        row = [asyncio.run(run_load(tool, concurrency, args.requests)) for tool in tools.values()]
+        print(f"{concurrency:>11} " + " ".join(f"{rps:>16.1f} req/s" for rps in row))
@@ -0,0 +1,131 @@
+"""
+Load test: concurrent stats reads while an ingestion rewrites the table.
+
+"before" uses a default SQLAlchemy engine for readers and writer (rollback
+journal, default pool and page cache). "after" uses the read-only pooled
+engine and the WAL writer from src/data/engine.py. Each run works on its own
+copy of the stats DB: reader threads replay typical agent queries while a
+writer thread repeatedly deletes and re-inserts every row in one transaction,
+as `ingest_data` does.
+
+Usage:
+    python load_excel_to_db.py   # once, to create data/sportsee.db
+    python benchmarks/bench_sqlite_reads.py --readers 8 --duration 5
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# Add project root to python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from src.core.config import settings
+from src.data.engine import get_read_engine, get_write_engine
+
+QUERIES = [
+    "SELECT player, pts FROM player_stats ORDER BY pts DESC LIMIT 5",
+    "SELECT team, SUM(pts) AS total FROM player_stats GROUP BY team ORDER BY total DESC LIMIT 5",
+    "SELECT player, ast, tov FROM player_stats WHERE ast > 400 ORDER BY ast DESC",
+    "SELECT AVG(age) FROM player_stats WHERE team = 'LAL'",
+    "SELECT player, fg_pct FROM player_stats WHERE fgm >= 300 ORDER BY fg_pct DESC LIMIT 10",
+    "SELECT * FROM player_stats WHERE player = 'Nikola Jokić'",
+]
+
+
+def reader(engine, stop: threading.Event, latencies: list, errors: list):
+    i = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(text(QUERIES[i % len(QUERIES)])).fetchall()
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(str(e).splitlines()[0])
+        i += 1
+
+
+def writer(engine, rows, columns, stop: threading.Event, loads: list, failures: list):
+    insert = text(f"INSERT INTO player_stats ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})")
+    while not stop.is_set():
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("DELETE FROM player_stats"))
+                conn.execute(insert, rows)
+        except Exception as e:
+            # Without a writer the run would only measure reads: ends it
+            failures.append(e)
+            stop.set()
+            return
+        loads.append(1)
+        time.sleep(0.05)
+
+
+def run(label: str, read_engine, write_engine, rows, columns, readers: int, duration: float):
+    stop = threading.Event()
+    latencies, errors, loads, failures = [], [], [], []
+    threads = [threading.Thread(target=reader, args=(read_engine, stop, latencies, errors)) for _ in range(readers)]
+    threads.append(threading.Thread(target=writer, args=(write_engine, rows, columns, stop, loads, failures)))
+    for thread in threads:
+        thread.start()
+    stop.wait(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    if failures:
+        raise RuntimeError(f"{label}: the writer failed after {len(loads)} loads") from failures[0]
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    p99 = latencies_ms[int(0.99 * (len(latencies_ms) - 1))] if latencies_ms else float("nan")
+    stalled = sum(1 for latency in latencies_ms if latency > 100)
+    print(f"{label:<8} {len(latencies) / duration:>7.0f} q/s  p50={statistics.median(latencies_ms):6.2f} ms  "
+          f"p99={p99:7.2f} ms  max={latencies_ms[-1]:8.2f} ms  >100ms={stalled:>4}  errors={len(errors)}  loads={len(loads)}")
+    if errors:
+        print(f"         e.g. {errors[0]}")
+
+
+def copy_db(source: str, target: str, journal_mode: str):
+    shutil.copyfile(source, target)
+    conn = sqlite3.connect(target)
+    conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per run")
+    parser.add_argument("--scale", type=int, default=100, help="Copies of the rows written by each load, to make its lock longer")
+    args = parser.parse_args()
+
+    source = settings.DATABASE_URL.replace("sqlite:///", "", 1)
+    with sqlite3.connect(source) as conn:
+        cursor = conn.execute("SELECT * FROM player_stats")
+        columns = [d[0] for d in cursor.description if d[0] != "id"]
+        rows = [dict(zip([d[0] for d in cursor.description], row)) for row in cursor.fetchall()]
+        # Each copy is an earlier season: (player, team, season) stays unique
+        rows = [{c: row[c] for c in columns} for row in rows]
+        rows += [{**row, "season": f"19{i:02d}-{(i + 1) % 100:02d}"} for i in range(1, args.scale) for row in rows]
+
+    print(f"{os.cpu_count()} CPUs, {args.readers} reader threads, writer reloads {len(rows)} rows in a loop")
+    with tempfile.TemporaryDirectory() as tmp:
+        before_path, after_path = os.path.join(tmp, "before.db"), os.path.join(tmp, "after.db")
+        copy_db(source, before_path, "DELETE")
+        copy_db(source, after_path, "DELETE")
+
+        before_engine = create_engine(f"sqlite:///{before_path}")
+        run("before", before_engine, before_engine, rows, columns, args.readers, args.duration)
+
+        after_url = f"sqlite:///{after_path}"
+        write_engine = get_write_engine(after_url)
+        with write_engine.connect():
+            pass  # switches the copy to WAL before the readers open it
+        run("after", get_read_engine(after_url), write_engine, rows, columns, args.readers, args.duration)
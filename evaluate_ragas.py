@@ -6,9 +6,10 @@ from ragas import evaluate
 from ragas.metrics import faithfulness, answer_relevancy, context_precision
 from ragas.llms import LangchainLLMWrapper
 from ragas.embeddings import LangchainEmbeddingsWrapper
-from langchain_mistralai import ChatMistralAI, MistralAIEmbeddings
+from langchain_mistralai import ChatMistralAI
 from src.core.config import settings
 from src.rag.chain import get_rag_agent
+from src.rag.vector_store import get_embeddings
 
 # 1. Setup Mistral for Ragas
 mistral_llm = ChatMistralAI(
@@ -16,10 +17,8 @@ mistral_llm = ChatMistralAI(
     api_key=settings.MISTRAL_API_KEY,
     temperature=0
 )
-mistral_embeddings = MistralAIEmbeddings(
-    model="mistral-embed",
-    api_key=settings.MISTRAL_API_KEY
-)
+# Query embeddings cached: the same questions and answers are embedded on every evaluation run
+mistral_embeddings = get_embeddings()
 
 ragas_llm = LangchainLLMWrapper(mistral_llm)
 ragas_embeddings = LangchainEmbeddingsWrapper(mistral_embeddings)
@@ -11,13 +11,13 @@ from langchain_core.documents import Document
 
 from src.core.config import settings
 from src.core.logging import setup_logging, logger
+from src.rag.vector_store import publish_vector_store
 
 # Setup logging
 setup_logging()
 
 # --- Configuration ---
 INPUTS_DIR = "inputs"
-VECTOR_DB_PATH = "vector_db/faiss_index" # Match the path expected by vector_store.py
 
 # --- Pydantic Models for Validation ---
 class ChunkMetadata(BaseModel):
@@ -142,14 +142,9 @@ def ingest_archives():
         
         vectorstore = FAISS.from_documents(final_chunks, embeddings)
         
-        os.makedirs(os.path.dirname(VECTOR_DB_PATH), exist_ok=True)
-        # Note: VectorStoreManager in reference used "vector_db" root.
-        # We stick to saving to "vector_db" folder index name "faiss_index" if compatible.
-        # But vector_store.py loads from "vector_db". FAISS.save_local("path") creates index.faiss inside "path".
-        # So we save to "vector_db".
-        
-        vectorstore.save_local("vector_db") 
-        logger.info(f"Vector store successfully saved to 'vector_db/'")
+        # Saved as a new version of 'vector_db/', picked up by running APIs without a restart
+        publish_vector_store(vectorstore)
+        logger.info(f"Vector store successfully published to 'vector_db/'")
         
     except Exception as e:
         logger.error(f"Error creating vector store: {e}")
@@ -1,18 +1,37 @@
+import argparse
 import sys
 import os
 
 # Add project root to python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.data.ingestion import ingest_data
+from src.core.config import settings
+from src.data.backfill import ingest_directory
 from src.core.logging import setup_logging
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest the stats workbooks into the SQLite database.")
+    parser.add_argument("paths", nargs="*", help="Workbooks to ingest (default: every .xlsx under --dir)")
+    parser.add_argument("--dir", default=settings.INGESTION_SOURCE_DIR, help="Directory searched for workbooks")
+    parser.add_argument("--workers", type=int, default=None, help="Parsing processes (default: INGESTION_WORKERS or one per core)")
+    parser.add_argument("--force", action="store_true", help="Reload workbooks unchanged since their last load")
+    args = parser.parse_args()
+
     setup_logging()
-    
-    input_file = "data/raw/regular_NBA.xlsx"
-    if not os.path.exists(input_file):
-        print(f"Error: File {input_file} not found.")
+
+    missing = [path for path in args.paths if not os.path.exists(path)]
+    if missing or not (args.paths or os.path.isdir(args.dir)):
+        print(f"Error: {', '.join(missing) or args.dir} not found.")
         sys.exit(1)
-        
-    ingest_data(input_file)
+
+    reports = ingest_directory(args.dir, paths=args.paths or None, workers=args.workers, force=args.force)
+
+    print(f"{'source':40} {'season':8} {'rows':>9} {'rows/s':>9} {'inserted':>9} {'updated':>9} {'deleted':>9} {'errors':>7}")
+    for report in reports:
+        result = report.result
+        if report.failure or result.skipped:
+            print(f"{report.source:40} {report.season:8} {'failed: ' + report.failure if report.failure else 'skipped (unchanged)'}")
+            continue
+        print(f"{report.source:40} {report.season:8} {report.rows:>9} {report.rows_per_second:>9,.0f} {result.inserted:>9} "
+              f"{result.updated:>9} {result.deleted:>9} {len(result.errors):>7}")
+    sys.exit(1 if any(report.failure for report in reports) else 0)
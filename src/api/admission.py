@@ -0,0 +1,135 @@
+"""
+Admission control and load shedding for the chat API.
+
+Each request mode gets its own lane (bounded concurrency + bounded wait
+queue), so cheap CHAT requests are never stuck behind long RAG runs. When a
+lane's queue is full the request is rejected immediately (429); when it waited
+too long for a slot it is rejected as well (503). Both carry a Retry-After
+derived from the queue depth and the observed service time of the lane.
+"""
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict
+
+from src.core.config import settings
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is shed. Carries the HTTP status and Retry-After to return.
+    """
+
+    def __init__(self, lane: str, status_code: int, retry_after: int, reason: str):
+        super().__init__(f"{lane} lane {reason}, retry after {retry_after}s")
+        self.lane = lane
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class Lane:
+    """
+    A bounded pool of execution slots with a bounded wait queue.
+    """
+
+    # Weight of the latest sample in the service time moving average
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float, initial_service_time: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.avg_service_time = initial_service_time
+
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    def retry_after(self) -> int:
+        """
+        Seconds until the requests queued ahead (plus this one) should have drained.
+        """
+        backlog = self.waiting + 1
+        return max(1, math.ceil(backlog / self.max_concurrent * self.avg_service_time))
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(self.name, 429, self.retry_after(), "queue full")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise AdmissionRejected(self.name, 503, self.retry_after(), "queue wait timed out")
+        finally:
+            self.waiting -= 1
+
+        self.admitted += 1
+        self.active += 1
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+            elapsed = time.monotonic() - start_time
+            self.avg_service_time += self.EWMA_ALPHA * (elapsed - self.avg_service_time)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "avg_service_time": self.avg_service_time,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+
+class AdmissionController:
+    """
+    One lane per request mode ("RAG", "CHAT").
+    """
+
+    def __init__(self, lanes: Dict[str, Lane]):
+        self.lanes = lanes
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        return cls({
+            "RAG": Lane(
+                "RAG",
+                max_concurrent=settings.ADMISSION_RAG_MAX_CONCURRENT,
+                max_queue=settings.ADMISSION_RAG_MAX_QUEUE,
+                queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+                initial_service_time=10.0,
+            ),
+            "CHAT": Lane(
+                "CHAT",
+                max_concurrent=settings.ADMISSION_CHAT_MAX_CONCURRENT,
+                max_queue=settings.ADMISSION_CHAT_MAX_QUEUE,
+                queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+                initial_service_time=2.0,
+            ),
+        })
+
+    def slot(self, mode: str):
+        """
+        Async context manager holding an execution slot of the `mode` lane.
+        """
+        return self.lanes[mode].slot()
+
+    def stats(self) -> dict:
+        return {name: lane.stats() for name, lane in self.lanes.items()}
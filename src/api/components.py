@@ -0,0 +1,195 @@
+"""
+Process-wide registry of the heavy RAG components.
+
+Building the hybrid agent instantiates the Mistral clients, reflects the SQLite
+schema and loads the FAISS index from disk. This is done once per process (in
+the background at application startup) and the resulting objects are shared by
+every request.
+
+LangChain, mistralai and FAISS are only imported by `_build`, so importing the
+API module stays cheap and `/health` answers before the RAG stack is warm.
+"""
+import asyncio
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from src.api.admission import AdmissionController
+from src.core.config import settings
+from src.core.logging import logger
+from src.core.singleflight import SingleFlight
+from src.rag.answer_cache import AnswerCache
+from src.rag.sql_cache import SQLResultCache
+
+
+class ComponentRegistry:
+    """
+    Holds the LLM clients, classifier, SQL agent, retriever, hybrid agent and
+    the answer cache placed in front of it.
+
+    The built objects are stateless between calls (each `ainvoke` carries its
+    own inputs and callbacks), so they can be shared by concurrent requests.
+    Only the build itself is guarded by a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # pending -> warming -> ready | failed
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.warmup_duration: Optional[float] = None
+        # (loop, event) of the `wait_ready` calls in progress, set from the warmup thread
+        self._ready_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+        self._waiters_lock = threading.Lock()
+
+        self.answer_cache = AnswerCache(
+            max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+            similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+        )
+        self.sql_result_cache = SQLResultCache(
+            max_entries=settings.SQL_RESULT_CACHE_MAX_ENTRIES,
+            max_bytes=settings.SQL_RESULT_CACHE_MAX_BYTES,
+        ) if settings.SQL_RESULT_CACHE_ENABLED else None
+        self.singleflight = SingleFlight()
+        self.admission = AdmissionController.from_settings()
+
+        self.embeddings = None
+        self.llm = None
+        self.chat_llm = None
+        self.classifier = None
+        self.sql_agent = None
+        self.query_planner = None
+        self.schema_catalog = None
+        self.columnar_stats = None
+        self.vector_store = None
+        self.embedding_cache = None
+        self.retriever = None
+        self.agent = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def warmup(self):
+        """
+        Builds every component. Calling it again once ready is a no-op.
+        """
+        with self._lock:
+            if self.ready:
+                return
+
+            self.status = "warming"
+            self.error = None
+            start_time = time.perf_counter()
+            logger.info("Warming up RAG components...")
+
+            try:
+                self._build()
+            except Exception as e:
+                self.status = "failed"
+                self.error = str(e)
+                logger.exception("Failed to warm up RAG components")
+                raise
+
+            self.warmup_duration = time.perf_counter() - start_time
+            self.status = "ready"
+            self._notify_ready()
+            logger.info(f"RAG components ready in {self.warmup_duration:.2f}s")
+
+    async def ensure_ready(self):
+        """
+        Builds the components off the event loop if startup warmup did not run
+        (or failed), so a request never pays the build cost on the loop itself.
+        """
+        if not self.ready:
+            await asyncio.to_thread(self.warmup)
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """
+        Waits up to `timeout` seconds for the components to be ready, without
+        triggering a build. Returns the readiness at the end of the wait.
+        Waits on the event loop: a polling probe holds no worker thread.
+        """
+        if self.ready or timeout <= 0:
+            return self.ready
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._waiters_lock:
+            if self.ready:
+                return True
+            self._ready_waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._waiters_lock:
+                self._ready_waiters.remove(waiter)
+        return self.ready
+
+    def _notify_ready(self):
+        # asyncio.Event is not thread-safe: set on the loop of each waiter
+        with self._waiters_lock:
+            for loop, event in self._ready_waiters:
+                loop.call_soon_threadsafe(event.set)
+
+    def _build(self):
+        # Heavy imports deferred to the first build (see module docstring)
+        from langchain_mistralai import ChatMistralAI
+        from src.rag.chain import get_rag_agent
+        from src.rag.classifier import QueryClassifier
+        from src.rag.columnar_stats import get_columnar_stats
+        from src.rag.embedding_cache import get_embedding_cache
+        from src.rag.mistral_wrapper import SafeChatMistralAI
+        from src.rag.query_planner import get_query_planner
+        from src.rag.schema_catalog import get_schema_catalog
+        from src.rag.sql_tool import get_sql_tool
+        from src.rag.vector_store import get_embeddings, get_retriever, get_vector_store_handle
+
+        self.classifier = QueryClassifier()
+        self.chat_llm = ChatMistralAI(model="mistral-large-latest", api_key=settings.MISTRAL_API_KEY, temperature=0.7)
+        self.llm = SafeChatMistralAI(
+            model="mistral-large-latest",
+            temperature=0,
+            api_key=settings.MISTRAL_API_KEY
+        )
+        self.schema_catalog = get_schema_catalog()
+        # Reflect the schema now rather than on the first stats question
+        self.schema_catalog.table_names()
+        self.sql_agent = get_sql_tool(self.llm, self.schema_catalog, self.sql_result_cache)
+        if settings.SQL_TEMPLATE_PLANNER_ENABLED:
+            self.query_planner = get_query_planner(result_cache=self.sql_result_cache)
+        if settings.COLUMNAR_STATS_ENABLED:
+            self.columnar_stats = get_columnar_stats()
+            # Load the arrays now rather than on the first analytics question
+            self.columnar_stats.snapshot()
+        self.embeddings = get_embeddings()
+        if settings.EMBEDDING_CACHE_ENABLED:
+            self.embedding_cache = get_embedding_cache()
+        # Loaded once, then hot-swapped by its watcher when a new index is published
+        self.vector_store = get_vector_store_handle(self.embeddings)
+        # Answers are invalidated when this process swaps its index, not when one is published
+        self.answer_cache.vector_version = lambda: self.vector_store.version
+        self.retriever = get_retriever(self.embeddings)
+        self.agent = get_rag_agent(
+            llm=self.llm, sql_agent=self.sql_agent, retriever=self.retriever,
+            planner=self.query_planner, catalog=self.schema_catalog, columnar=self.columnar_stats,
+        )
+        if settings.ANSWER_CACHE_SEMANTIC_ENABLED:
+            self.answer_cache.embeddings = self.embeddings
+
+    def vector_store_stats(self) -> dict:
+        return self.vector_store.stats() if self.vector_store is not None else {}
+
+    def embedding_cache_stats(self) -> dict:
+        return self.embedding_cache.stats() if self.embedding_cache is not None else {}
+
+    def state(self) -> dict:
+        return {
+            "status": self.status,
+            "warmup_duration": self.warmup_duration,
+            "error": self.error,
+        }
+
+
+components = ComponentRegistry()
@@ -1,19 +1,53 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
-import logfire
+from fastapi.responses import JSONResponse, PlainTextResponse
 from src.core.config import settings
-from src.core.logging import setup_logging
+from src.core.logging import setup_logging, logger
+from src.api.components import components
 from src.api.routes import router
+from src.monitoring.metrics import metrics
 
 # Setup logging
 setup_logging()
 
 # Configure Logfire
 if settings.LOGFIRE_TOKEN:
+    # Imported here: logfire (and its OpenTelemetry deps) is slow to import
+    import logfire
     logfire.configure(token=settings.LOGFIRE_TOKEN)
     # logfire.instrument_pydantic() 
 
+# Component statistics exported as gauges on /metrics
+metrics.register_collector("answer_cache", components.answer_cache.stats)
+metrics.register_collector("coalescing", components.singleflight.stats)
+metrics.register_collector("admission", components.admission.stats)
+metrics.register_collector("vector_store", components.vector_store_stats)
+metrics.register_collector("embedding_cache", components.embedding_cache_stats)
+if components.sql_result_cache is not None:
+    metrics.register_collector("sql_result_cache", components.sql_result_cache.stats)
+
+async def _warmup_in_background():
+    try:
+        await asyncio.to_thread(components.warmup)
+    except Exception:
+        # Keep serving: /ready reports the failure and requests retry the build
+        logger.error("Startup warmup failed, components will be built on first request")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts building the shared RAG components in the background, so the server
+    accepts connections (and answers /health) right away. /ready turns 200 once
+    the build is done; requests arriving earlier wait for it.
+    """
+    if settings.WARMUP_ON_STARTUP:
+        app.state.warmup_task = asyncio.create_task(_warmup_in_background())
+    yield
+
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.PROJECT_NAME,
     description="Hybrid RAG API for SportSee Basketball Analytics",
     version="1.0.0",
@@ -23,6 +57,7 @@ app = FastAPI(
 
 # Instrument FastAPI
 if settings.LOGFIRE_TOKEN:
+    import logfire
     logfire.instrument_fastapi(app)
     # pass
 
@@ -40,4 +75,24 @@ app.include_router(router, prefix="/api/v1")
 
 @app.get("/health")
 def health_check():
+    """
+    Liveness probe: answers as soon as the process serves HTTP, warm or not.
+    """
     return {"status": "healthy", "project": settings.PROJECT_NAME}
+
+@app.get("/ready")
+async def readiness_check(wait: float = Query(0, ge=0, le=300, description="Seconds to wait for the warmup to finish")):
+    """
+    Readiness probe: 200 once the RAG components are built, 503 otherwise.
+    With `wait`, blocks up to that many seconds for the background warmup.
+    """
+    ready = await components.wait_ready(wait)
+    status_code = 200 if ready else 503
+    return JSONResponse(status_code=status_code, content=components.state())
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """
+    Prometheus scrape endpoint (request/stage latency histograms, token counters, component gauges).
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,56 +1,320 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
-from pydantic import BaseModel
-from src.rag.chain import get_rag_agent
-from src.rag.classifier import QueryClassifier
-from src.core.logging import logger
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import TYPE_CHECKING, List, Optional
+from src.api.admission import AdmissionRejected
+from src.api.components import components
 from src.core.config import settings
-from langchain_mistralai import ChatMistralAI
+from src.core.logging import logger
+from src.monitoring.metrics import metrics
+from src.rag.answer_cache import normalize_query
+import asyncio
+import json
 import time
 
+if TYPE_CHECKING:
+    from src.monitoring.timing import StageTimer
+
 router = APIRouter()
-classifier = QueryClassifier()
-chat_llm = ChatMistralAI(model="mistral-large-latest", api_key=settings.MISTRAL_API_KEY, temperature=0.7)
+
+REQUEST_DURATION = metrics.histogram("request_duration_seconds", "End-to-end chat latency by mode and cache tier.")
+REQUESTS = metrics.counter("requests_total", "Chat requests by mode and outcome.")
 
 class QueryRequest(BaseModel):
     query: str
+    include_timings: bool = False  # Return the per-stage latency breakdown
+
+class StageTiming(BaseModel):
+    stage: str  # classification, llm, tool, retriever
+    name: str
+    duration: float
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    error: Optional[str] = None
+
+class Timings(BaseModel):
+    stages: List[StageTiming]
+    prompt_tokens: int
+    completion_tokens: int
 
 class QueryResponse(BaseModel):
     answer: str
     processing_time: float
     mode: str = "unknown"
+    error: Optional[str] = None
+    cache: Optional[str] = None  # "exact" or "semantic" when served from the answer cache
+    timings: Optional[Timings] = None
+
+class BatchQueryRequest(BaseModel):
+    queries: List[QueryRequest] = Field(min_length=1)
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+
+class BatchQueryResponse(BaseModel):
+    results: List[QueryResponse]
+    total_time: float
+    succeeded: int
+    failed: int
+    max_concurrency: int
+
+async def _classify(query: str, timer: Optional["StageTimer"] = None):
+    start_time = time.perf_counter()
+    # Async path: an ambiguous query's LLM call must not block the event loop
+    needs_rag, confidence, reason = await components.classifier.aneeds_rag(query)
+    if timer is not None:
+        timer.record("classification", "QueryClassifier", time.perf_counter() - start_time)
+    logger.info(f"Classification: RAG={needs_rag} (Conf={confidence:.2f}, Reason={reason})")
+    return needs_rag, confidence, reason
+
+def _chat_messages(query: str):
+    return [("system", "You are a helpful assistant for SportSee."), ("user", query)]
+
+def _response(answer: str, mode: str, start_time: float, timer: "StageTimer", include_timings: bool, cache: Optional[str] = None) -> QueryResponse:
+    duration = time.time() - start_time
+    REQUEST_DURATION.observe(duration, mode=mode, cache=cache or "none")
+    REQUESTS.inc(mode=mode, outcome="ok")
+    
+    timings = None
+    if include_timings:
+        timings = Timings(
+            stages=[StageTiming(**stage) for stage in timer.stages],
+            prompt_tokens=timer.prompt_tokens,
+            completion_tokens=timer.completion_tokens,
+        )
+    return QueryResponse(answer=answer, processing_time=duration, mode=mode, cache=cache, timings=timings)
+
+async def _answer(query: str, include_timings: bool = False) -> QueryResponse:
+    """
+    Classifies the query and answers it with the RAG agent or the simple chat LLM.
+    """
+    # Imported on first use: LangChain's callback machinery is slow to import
+    from src.monitoring.timing import StageTimer
+
+    start_time = time.time()
+    timer = StageTimer()
+    logger.info(f"Received query: {query}")
+    
+    # Components are built once at startup; this only builds them if warmup did not run
+    await components.ensure_ready()
+    cache = components.answer_cache if settings.ANSWER_CACHE_ENABLED else None
+    
+    # 0. Exact cache tier, before any model call
+    if cache is not None:
+        cached = cache.get(query)
+        if cached is not None:
+            logger.info("Request served from answer cache (exact)")
+            return _response(cached.answer, cached.mode, start_time, timer, include_timings, cache="exact")
+    
+    # 1. Classify Intent
+    needs_rag, confidence, reason = await _classify(query, timer)
+    mode = "RAG" if needs_rag else "CHAT"
+    answer = ""
+    
+    if needs_rag:
+        # Semantic cache tier: only RAG answers are cached
+        embedding = None
+        if cache is not None:
+            embedding = await cache.aembed(query)
+            cached = cache.get_similar(query, embedding)
+            if cached is not None:
+                logger.info("Request served from answer cache (semantic)")
+                return _response(cached.answer, cached.mode, start_time, timer, include_timings, cache="semantic")
+        
+        # Shared Agent (RAG + SQL)
+        async def run_agent():
+            # Own timer: coalesced callers all receive the stages of this single run
+            agent_timer = StageTimer()
+            # Not cached if the data (or the served index) changes during the run
+            data_version = cache.data_version() if cache is not None else None
+            async with components.admission.slot("RAG"):
+                result = await components.agent.ainvoke({"input": query}, config={"callbacks": [agent_timer]})
+            if cache is not None:
+                cache.put(query, result["output"], mode, embedding, data_version=data_version)
+            return result["output"], agent_timer.stages
+        
+        if settings.COALESCE_IDENTICAL_QUERIES:
+            # Identical queries arriving while this one runs wait for the same result
+            answer, agent_stages = await components.singleflight.do(normalize_query(query), run_agent)
+        else:
+            answer, agent_stages = await run_agent()
+        timer.stages.extend(agent_stages)
+    else:
+        # Simple Chat interaction
+        async with components.admission.slot("CHAT"):
+            response = await components.chat_llm.ainvoke(_chat_messages(query), config={"callbacks": [timer]})
+        answer = response.content
+    
+    logger.info(f"Request processed in {time.time() - start_time:.2f}s (Mode: {mode})")
+    return _response(answer, mode, start_time, timer, include_timings)
 
 @router.post("/chat", response_model=QueryResponse)
 async def chat_endpoint(request: QueryRequest):
     """
     Main endpoint. Routes to RAG Agent or Simple Chat based on intent.
     """
+    try:
+        return await _answer(request.query, request.include_timings)
+    except AdmissionRejected as e:
+        logger.warning(f"Request shed: {e}")
+        REQUESTS.inc(mode=e.lane, outcome="shed")
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        logger.exception("Error processing query")
+        REQUESTS.inc(mode="unknown", outcome="error")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/chat/batch", response_model=BatchQueryResponse)
+async def chat_batch_endpoint(request: BatchQueryRequest):
+    """
+    Answers a list of queries concurrently (bounded), through the same routing as /chat.
+    A failing item is reported in its own result instead of failing the whole batch.
+    """
+    if len(request.queries) > settings.BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch too large: {len(request.queries)} queries (max {settings.BATCH_MAX_SIZE})"
+        )
+    
+    # Callers may lower the cap, never raise it above the server limit
+    max_concurrency = min(request.max_concurrency or settings.BATCH_MAX_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(max_concurrency)
     start_time = time.time()
+    
+    async def run_item(item: QueryRequest) -> QueryResponse:
+        async with semaphore:
+            item_start = time.time()
+            try:
+                return await _answer(item.query, item.include_timings)
+            except Exception as e:
+                logger.exception(f"Error processing batch query: {item.query}")
+                REQUESTS.inc(mode="unknown", outcome="error")
+                return QueryResponse(answer="", processing_time=time.time() - item_start, mode="ERROR", error=str(e))
+    
+    results = await asyncio.gather(*(run_item(item) for item in request.queries))
+    
+    duration = time.time() - start_time
+    failed = sum(1 for r in results if r.error is not None)
+    logger.info(f"Batch of {len(results)} processed in {duration:.2f}s ({failed} failed, concurrency={max_concurrency})")
+    
+    return BatchQueryResponse(
+        results=results,
+        total_time=duration,
+        succeeded=len(results) - failed,
+        failed=failed,
+        max_concurrency=max_concurrency,
+    )
+
+@router.get("/stats")
+async def stats_endpoint():
+    """
+    Runtime statistics of the shared components (caches, ...).
+    """
+    return {
+        "components": components.state(),
+        "answer_cache": components.answer_cache.stats(),
+        "coalescing": components.singleflight.stats(),
+        "admission": components.admission.stats(),
+        "sql_result_cache": components.sql_result_cache.stats() if components.sql_result_cache is not None else None,
+    }
+
+# --- Streaming (Server-Sent Events) ---
+
+SSE_PREVIEW_CHARS = 500  # Tool inputs/outputs are previews, not full payloads
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+def _preview(value) -> str:
+    text = value if isinstance(value, str) else str(value)
+    return text[:SSE_PREVIEW_CHARS]
+
+def _source_payload(doc) -> dict:
+    return {
+        "source": doc.metadata.get("source"),
+        "page": doc.metadata.get("page"),
+        "snippet": doc.page_content[:200],
+    }
+
+async def _stream_answer(query: str):
+    """
+    Yields SSE frames: classification, tool_start/tool_end, sources, token, done (or error).
+    """
+    from src.monitoring.timing import StageTimer
+
+    start_time = time.time()
+    timer = StageTimer()
     try:
-        logger.info(f"Received query: {request.query}")
-        
-        # 1. Classify Intent
-        needs_rag, confidence, reason = classifier.needs_rag(request.query)
-        logger.info(f"Classification: RAG={needs_rag} (Conf={confidence:.2f}, Reason={reason})")
-        
+        logger.info(f"Received streaming query: {query}")
+        await components.ensure_ready()
+
+        needs_rag, confidence, reason = await _classify(query, timer)
         mode = "RAG" if needs_rag else "CHAT"
-        answer = ""
-        
-        if needs_rag:
-            # Initialize Agent (RAG + SQL)
-            agent = get_rag_agent()
-            result = await agent.ainvoke({"input": request.query})
-            answer = result["output"]
-        else:
-            # Simple Chat interaction
-            messages = [("system", "You are a helpful assistant for SportSee."), ("user", request.query)]
-            response = await chat_llm.ainvoke(messages)
-            answer = response.content
-        
+        yield _sse("classification", {
+            "mode": mode,
+            "confidence": confidence,
+            "reason": reason,
+            "elapsed": time.time() - start_time,
+        })
+
+        tokens = []
+        answer = None
+        # The lane slot is held for the whole stream
+        async with components.admission.slot(mode):
+            if needs_rag:
+                # Tokens produced while a tool runs belong to nested chains, not to the answer
+                active_tools = set()
+                async for event in components.agent.astream_events({"input": query}, config={"callbacks": [timer]}, version="v2"):
+                    kind = event["event"]
+                    if kind == "on_tool_start":
+                        active_tools.add(event["run_id"])
+                        yield _sse("tool_start", {"tool": event["name"], "input": _preview(event["data"].get("input"))})
+                    elif kind == "on_tool_end":
+                        active_tools.discard(event["run_id"])
+                        yield _sse("tool_end", {"tool": event["name"], "output": _preview(event["data"].get("output"))})
+                    elif kind == "on_retriever_end":
+                        documents = event["data"].get("output") or []
+                        yield _sse("sources", {"documents": [_source_payload(doc) for doc in documents]})
+                    elif kind == "on_chat_model_stream":
+                        if active_tools.intersection(event.get("parent_ids", [])):
+                            continue
+                        content = event["data"]["chunk"].content
+                        if isinstance(content, str) and content:
+                            tokens.append(content)
+                            yield _sse("token", {"text": content})
+                    elif kind == "on_chain_end" and not event.get("parent_ids"):
+                        answer = event["data"]["output"]["output"]
+            else:
+                async for chunk in components.chat_llm.astream(_chat_messages(query), config={"callbacks": [timer]}):
+                    if chunk.content:
+                        tokens.append(chunk.content)
+                        yield _sse("token", {"text": chunk.content})
+
         duration = time.time() - start_time
-        logger.info(f"Request processed in {duration:.2f}s (Mode: {mode})")
-        
-        return QueryResponse(answer=answer, processing_time=duration, mode=mode)
-        
+        REQUEST_DURATION.observe(duration, mode=mode, cache="none")
+        REQUESTS.inc(mode=mode, outcome="ok")
+        logger.info(f"Streaming request processed in {duration:.2f}s (Mode: {mode})")
+        yield _sse("done", {
+            "answer": answer if answer is not None else "".join(tokens),
+            "processing_time": duration,
+            "mode": mode,
+        })
+
+    except AdmissionRejected as e:
+        logger.warning(f"Streaming request shed: {e}")
+        REQUESTS.inc(mode=e.lane, outcome="shed")
+        yield _sse("error", {"detail": str(e), "status_code": e.status_code, "retry_after": e.retry_after})
     except Exception as e:
-        logger.exception("Error processing query")
-        raise HTTPException(status_code=500, detail=str(e))
+        # Headers are already sent, so errors are reported in-band
+        logger.exception("Error processing streaming query")
+        REQUESTS.inc(mode="unknown", outcome="error")
+        yield _sse("error", {"detail": str(e)})
+
+@router.post("/chat/stream")
+async def chat_stream_endpoint(request: QueryRequest):
+    """
+    Same routing as /chat, but streams progress events and answer tokens as Server-Sent Events.
+    """
+    return StreamingResponse(
+        _stream_answer(request.query),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
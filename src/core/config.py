@@ -13,6 +13,79 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./data/sportsee.db"
     
+    # API
+    WARMUP_ON_STARTUP: bool = True  # Build the RAG agent at startup instead of on first request
+    BATCH_MAX_SIZE: int = 500  # Max queries accepted by /chat/batch
+    BATCH_MAX_CONCURRENCY: int = 8  # Max queries of one batch executed at the same time
+    
+    # Query classifier (LLM fallback for ambiguous queries)
+    CLASSIFIER_TIMEOUT_SECONDS: float = 3.0  # Past this, fall back to RAG
+    CLASSIFIER_MAX_CONCURRENCY: int = 16
+    
+    # Admission control: separate lanes so CHAT requests are not starved by RAG runs
+    ADMISSION_RAG_MAX_CONCURRENT: int = 8
+    ADMISSION_RAG_MAX_QUEUE: int = 32
+    ADMISSION_CHAT_MAX_CONCURRENT: int = 32
+    ADMISSION_CHAT_MAX_QUEUE: int = 128
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 30  # Max wait for a slot before a 503
+    
+    # Answer cache (in front of the RAG agent)
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_MAX_ENTRIES: int = 1000
+    ANSWER_CACHE_TTL_SECONDS: float = 3600
+    ANSWER_CACHE_SEMANTIC_ENABLED: bool = True  # Similarity tier (one mistral-embed call per RAG query)
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.92  # Cosine similarity needed for a semantic hit
+    
+    # Identical RAG queries in flight at the same time share one agent run
+    COALESCE_IDENTICAL_QUERIES: bool = True
+    
+    # Stats SQL tool
+    # Answer common questions (top N, player stats, comparisons) from SQL templates before the LLM SQL agent
+    SQL_TEMPLATE_PLANNER_ENABLED: bool = True
+    # Read-only SQLite connection pool used by query traffic (ingestion has its own writer)
+    SQLITE_READ_POOL_SIZE: int = 8
+    SQLITE_READ_POOL_TIMEOUT_SECONDS: float = 30
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    # Results of read queries, cached until the next ingestion
+    SQL_RESULT_CACHE_ENABLED: bool = True
+    SQL_RESULT_CACHE_MAX_ENTRIES: int = 512
+    SQL_RESULT_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+    # Guardrails on the SQL agent's statements
+    SQL_GUARD_TIMEOUT_SECONDS: float = 5
+    SQL_GUARD_MAX_ROWS: int = 100
+    SQL_GUARD_MAX_RESULT_CHARS: int = 4000
+    # NBA_Stats_Analytics tool on an in-memory NumPy copy of player_stats
+    COLUMNAR_STATS_ENABLED: bool = False
+    
+    # Ingestion
+    INGESTION_BATCH_SIZE: int = 10_000
+    INGESTION_SEASON: str = "2024-25"  # Season of the rows of a workbook, part of their key (player, team, season)
+    INGESTION_SOURCE_DIR: str = "data/raw"  # Workbooks ingested by load_excel_to_db.py
+    INGESTION_WORKERS: Optional[int] = None  # Parsing/validation processes of a multi-file ingestion, default one per core
+    INGESTION_MAX_ERROR_RATIO: float = 0.5  # Share of invalid rows above which a workbook's load is rejected, nothing written
+
+    # Parsed workbooks cached as Arrow files, keyed by content hash (read by ingestion and drift analysis)
+    SOURCE_CACHE_ENABLED: bool = True
+    SOURCE_CACHE_DIR: str = "data/cache/sources"
+    SOURCE_CACHE_PART_ROWS: int = 100_000
+
+    # Drift analysis: rows sampled from each workbook (uniformly, when it has more)
+    DRIFT_MAX_ROWS: int = 100_000
+
+    # Vector store: the API polls vector_db/current.json and hot-swaps newly published versions
+    VECTOR_STORE_POLL_SECONDS: float = 10  # 0 disables the watcher
+    VECTOR_STORE_KEEP_VERSIONS: int = 2  # Published versions kept on disk, the current one included
+
+    # Query embeddings (mistral-embed) cached in memory and, if EMBEDDING_CACHE_PATH is set, on disk for every worker
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 10_000
+    EMBEDDING_CACHE_PATH: Optional[str] = "data/embedding_cache.db"
+    EMBEDDING_CACHE_DISK_MAX_ENTRIES: int = 200_000
+
+    # Data versioning (bumped by ingestion, used to invalidate caches)
+    DATA_VERSION_FILE: str = "data/data_version.json"
+    
     # Monitoring
     LOGFIRE_TOKEN: Optional[str] = None
     
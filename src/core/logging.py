@@ -1,5 +1,4 @@
 import logging
-import logfire
 from src.core.config import settings
 
 def setup_logging():
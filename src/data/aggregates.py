@@ -0,0 +1,131 @@
+"""
+Leaderboards and team aggregates materialized at ingestion time.
+
+SQLite has no materialized views, so the derived data lives in two tables
+rebuilt in the ingestion transaction, and is exposed to readers through two
+views with a stable shape:
+- `leaderboard`: one row per (stat, season, player) with its rank within the
+  season, for every numeric column of player_stats; top N is a primary-key
+  range lookup
+- `team_stats`: one row per (season, team) with totals, per-game rates and
+  shooting percentages of its players that season
+"""
+from sqlalchemy import Column, Float, Index, Integer, String, Table, text
+from sqlalchemy.engine import Connection
+
+from src.core.logging import logger
+from src.data.models import Base, IngestionManifestSQL, PlayerStatsSQL
+
+PLAYER_RANKS_TABLE = "player_stat_ranks"
+TEAM_AGGREGATES_TABLE = "team_aggregates"
+LEADERBOARD_VIEW = "leaderboard"
+TEAM_STATS_VIEW = "team_stats"
+
+# Storage behind the views and ingestion bookkeeping, not meant to be queried directly
+INTERNAL_TABLES = (PLAYER_RANKS_TABLE, TEAM_AGGREGATES_TABLE, IngestionManifestSQL.__tablename__)
+
+# Every numeric column gets a leaderboard
+RANKED_STATS = [
+    column.name for column in PlayerStatsSQL.__table__.columns
+    if column.name != "id" and isinstance(column.type, (Integer, Float))
+]
+# Season totals, where a per-game average makes sense (min and plus_minus are already per game)
+COUNTING_STATS = ["pts", "reb", "oreb", "dreb", "ast", "stl", "blk", "tov", "fgm", "fga", "three_pm", "three_pa", "ftm", "fta", "pf"]
+# Qualification for percentage leaderboards (NBA minimums on made shots)
+PCT_QUALIFIERS = {"fg_pct": ("fgm", 300), "three_p_pct": ("three_pm", 82), "ft_pct": ("ftm", 125)}
+# Team percentages computed from the made/attempted totals
+TEAM_PCT = {"fg_pct": ("fgm", "fga"), "three_p_pct": ("three_pm", "three_pa"), "ft_pct": ("ftm", "fta")}
+
+player_stat_ranks = Table(
+    PLAYER_RANKS_TABLE,
+    Base.metadata,
+    Column("stat", String, primary_key=True),
+    Column("season", String, primary_key=True),
+    Column("rank", Integer, primary_key=True),
+    Column("player", String, nullable=False),
+    Column("team", String),
+    Column("gp", Integer),
+    Column("value", Float),
+    Column("value_per_game", Float),
+    Column("per_game_rank", Integer),
+    Index("ix_player_stat_ranks_per_game", "stat", "season", "per_game_rank"),
+)
+
+team_aggregates = Table(
+    TEAM_AGGREGATES_TABLE,
+    Base.metadata,
+    Column("season", String, primary_key=True),
+    Column("team", String, primary_key=True),
+    Column("players", Integer),
+    Column("games", Integer),
+    Column("wins", Integer),
+    Column("losses", Integer),
+    Column("avg_age", Float),
+    *[Column(f"{stat}_total", Float) for stat in COUNTING_STATS],
+    *[Column(f"{stat}_per_game", Float) for stat in COUNTING_STATS],
+    *[Column(pct, Float) for pct in TEAM_PCT],
+)
+
+
+def _rank_select(stat: str) -> str:
+    where = ""
+    if stat in PCT_QUALIFIERS:
+        qualifier, minimum = PCT_QUALIFIERS[stat]
+        where = f"WHERE {qualifier} >= {minimum}"
+
+    if stat in COUNTING_STATS:
+        per_game = f"CAST({stat} AS REAL) / gp"
+        value_per_game = f"CASE WHEN gp > 0 THEN ROUND({per_game}, 1) END"
+        per_game_rank = f"CASE WHEN gp > 0 THEN ROW_NUMBER() OVER (PARTITION BY season, gp > 0 ORDER BY {per_game} DESC, player) END"
+    else:
+        value_per_game = per_game_rank = "NULL"
+
+    return (
+        f"SELECT '{stat}', season, ROW_NUMBER() OVER (PARTITION BY season ORDER BY {stat} DESC, player), player, team, gp, {stat}, "
+        f"{value_per_game}, {per_game_rank} FROM player_stats {where}"
+    )
+
+
+def _team_select() -> str:
+    totals = [f"SUM({stat})" for stat in COUNTING_STATS]
+    # Player W/L are the team's results in the games they played: the player
+    # with the most games gives the closest team record and games count
+    per_game = [f"ROUND(SUM({stat}) / NULLIF(MAX(gp), 0), 1)" for stat in COUNTING_STATS]
+    pcts = [f"ROUND(100.0 * SUM({made}) / NULLIF(SUM({attempted}), 0), 1)" for made, attempted in TEAM_PCT.values()]
+    return (
+        "SELECT season, team, COUNT(*), MAX(gp), MAX(w), MAX(l), ROUND(AVG(age), 1), "
+        + ", ".join(totals + per_game + pcts)
+        + " FROM player_stats GROUP BY season, team"
+    )
+
+
+def create_views(conn: Connection):
+    conn.execute(text(f"DROP VIEW IF EXISTS {LEADERBOARD_VIEW}"))
+    conn.execute(text(
+        f"CREATE VIEW {LEADERBOARD_VIEW} AS "
+        f"SELECT stat, season, rank, player, team, gp, value, value_per_game, per_game_rank FROM {PLAYER_RANKS_TABLE}"
+    ))
+    conn.execute(text(f"DROP VIEW IF EXISTS {TEAM_STATS_VIEW}"))
+    conn.execute(text(f"CREATE VIEW {TEAM_STATS_VIEW} AS SELECT * FROM {TEAM_AGGREGATES_TABLE}"))
+
+
+def materialize_aggregates(conn: Connection):
+    """
+    Rebuilds the leaderboard and team aggregates from player_stats, in the
+    caller's transaction so readers see them change together with the data.
+    """
+    # Derived data, recreated rather than emptied: tables created by an older
+    # release (without season) get the current columns
+    for table in (player_stat_ranks, team_aggregates):
+        table.drop(bind=conn, checkfirst=True)
+        table.create(bind=conn)
+
+    columns = ", ".join(column.name for column in player_stat_ranks.columns)
+    for stat in RANKED_STATS:
+        conn.execute(text(f"INSERT INTO {PLAYER_RANKS_TABLE} ({columns}) {_rank_select(stat)}"))
+
+    columns = ", ".join(column.name for column in team_aggregates.columns)
+    conn.execute(text(f"INSERT INTO {TEAM_AGGREGATES_TABLE} ({columns}) {_team_select()}"))
+
+    create_views(conn)
+    logger.info(f"Materialized leaderboards for {len(RANKED_STATS)} stats and team aggregates")
@@ -0,0 +1,224 @@
+"""
+Parallel ingestion of every workbook of a directory (historical backfills).
+
+Parsing and validation are CPU-bound and independent per workbook, while
+SQLite takes one writer at a time. The work is split accordingly:
+1. the workbooks are hashed and parsed into their source cache entries by a
+   process pool, one workbook per process (the entries are written even
+   with SOURCE_CACHE_ENABLED off: their parts are the unit of work);
+2. the pool validates the cached parts against PlayerStats, at most a few
+   parts ahead of the writer (memory stays bounded), in file order;
+3. the main process is the single writer: it loads the validated batches of
+   each workbook in one transaction (`load_validated_batches`), as
+   `ingest_data` does, but rebuilds the indexes, leaderboards, team
+   aggregates and statistics once after the last workbook instead of after
+   each one (`finalize_load`). Until then, readers see the new rows with
+   the previous aggregates.
+
+A workbook's source (its key in the ingestion manifest) is its path relative
+to the directory, e.g. "2023-24/DEN.xlsx", whether it was found in the
+directory or given explicitly (its absolute path when outside of it). Its
+season comes from that path ("..._2023-24.xlsx", "2023-24/..."),
+INGESTION_SEASON otherwise. Workbooks unchanged since their last load are
+skipped, unless `force`.
+"""
+import glob
+import itertools
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from sqlalchemy import func, select
+
+from src.core.config import settings
+from src.core.logging import logger
+from src.data.engine import get_write_engine
+from src.data.ingestion import (
+    STAT_ALIASES, LoadResult, drop_secondary_indexes, finalize_load, is_loaded, load_validated_batches, validate_batches,
+)
+from src.data.models import Base, PlayerStatsSQL, upgrade_schema
+from src.data.source_cache import cached_source, file_sha256, iter_part_batches
+from src.data.versioning import bump_data_version
+
+SEASON_PATTERN = re.compile(r"(?<!\d)((?:19|20)\d{2})[-_]((?:19|20)?\d{2})(?!\d)")
+
+
+@dataclass
+class FileReport:
+    """
+    Outcome of the ingestion of one workbook.
+    """
+    path: str
+    source: str
+    season: str
+    rows: int = 0
+    parse_seconds: float = 0.0
+    load_seconds: float = 0.0
+    result: LoadResult = field(default_factory=LoadResult)
+    failure: Optional[str] = None  # Parse or load error: nothing of the workbook was written
+
+    @property
+    def rows_per_second(self) -> float:
+        seconds = self.parse_seconds + self.load_seconds
+        return self.rows / seconds if seconds else 0.0
+
+
+def season_of(source: str) -> str:
+    """
+    "regular_NBA_2023-24.xlsx" -> "2023-24", INGESTION_SEASON without a season in the name.
+    """
+    match = SEASON_PATTERN.search(source)
+    if match is None:
+        return settings.INGESTION_SEASON
+    return f"{match.group(1)}-{match.group(2)[-2:]}"
+
+
+def source_of(path: str, directory: str) -> str:
+    """
+    "data/raw/2023-24/DEN.xlsx" -> "2023-24/DEN.xlsx" in "data/raw"; the absolute path outside of it.
+    """
+    path = os.path.abspath(path)
+    source = os.path.relpath(path, os.path.abspath(directory))
+    if source.startswith(os.pardir + os.sep):
+        return path
+    return source
+
+
+def discover_workbooks(directory: str) -> List[str]:
+    """
+    The .xlsx files under `directory`, sub-directories included, without Excel's "~$" lock files.
+    """
+    paths = glob.glob(os.path.join(directory, "**", "*.xlsx"), recursive=True)
+    return sorted(path for path in paths if not os.path.basename(path).startswith("~$"))
+
+
+def _parse(file_path: str, file_hash: str) -> Tuple[dict, float]:
+    start = time.perf_counter()
+    manifest = cached_source(file_path, file_hash)
+    return manifest, time.perf_counter() - start
+
+
+def _validate_part(manifest: dict, number: int, batch_size: int) -> List[Tuple[pd.DataFrame, List[str]]]:
+    return list(validate_batches(iter_part_batches(manifest, number, batch_size, columns=STAT_ALIASES)))
+
+
+def _submit_ahead(pool: Executor, tasks: Sequence[tuple], window: int) -> Iterator[Future]:
+    """
+    Futures of `_validate_part` over `tasks`, in order, submitted at most `window` ahead of the consumer.
+    """
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(_validate_part, *task))
+        if len(pending) > window:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
+
+
+def ingest_directory(directory: Optional[str] = None, paths: Optional[Sequence[str]] = None,
+                     workers: Optional[int] = None, force: bool = False) -> List[FileReport]:
+    """
+    Ingests the workbooks `paths`, or every workbook under `directory`
+    (INGESTION_SOURCE_DIR by default, also the root of the sources of
+    `paths`), with `workers` processes (INGESTION_WORKERS, or one per core).
+    Returns one report per workbook.
+    """
+    directory = directory or settings.INGESTION_SOURCE_DIR
+    if paths is None:
+        paths = discover_workbooks(directory)
+    sources = {path: source_of(path, directory) for path in paths}
+    paths = list(sources)
+    workers = workers or settings.INGESTION_WORKERS or os.cpu_count() or 1
+    engine = get_write_engine()
+    batch_size = settings.INGESTION_BATCH_SIZE
+    reports = {path: FileReport(path, source, season_of(source)) for path, source in sources.items()}
+    logger.info(f"Ingesting {len(paths)} workbooks with {workers} processes...")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        hashes = dict(zip(paths, pool.map(file_sha256, paths)))
+        pending = []
+        for path in paths:
+            if not force and is_loaded(engine, reports[path].source, hashes[path], reports[path].season):
+                reports[path].result = LoadResult(skipped=True)
+            else:
+                pending.append(path)
+
+        parses = {pool.submit(_parse, path, hashes[path]): path for path in pending}
+        parsed = []
+        for future in as_completed(parses):
+            path = parses[future]
+            try:
+                manifest, reports[path].parse_seconds = future.result()
+            except Exception as e:
+                logger.error(f"Failed to parse {path}: {e}")
+                reports[path].failure = f"parse: {e}"
+                continue
+            reports[path].rows = manifest["rows"]
+            parsed.append((path, manifest))
+
+        rebuild_indexes = False
+        if parsed:
+            Base.metadata.create_all(bind=engine)
+            upgrade_schema(engine, settings.INGESTION_SEASON)
+            with engine.begin() as conn:
+                # Loads that more than double the table rebuild its indexes at the end
+                stored_rows = conn.execute(select(func.count()).select_from(PlayerStatsSQL.__table__)).scalar()
+                rebuild_indexes = sum(manifest["rows"] for _, manifest in parsed) > stored_rows
+                if rebuild_indexes:
+                    drop_secondary_indexes(conn)
+
+        tasks = [(manifest, number, batch_size) for _, manifest in parsed for number in range(len(manifest["parts"]))]
+        futures = _submit_ahead(pool, tasks, window=2 * workers)
+        for path, manifest in parsed:
+            report = reports[path]
+            # This workbook's share of the futures: the rest of them is skipped if its load fails
+            file_futures = itertools.islice(futures, len(manifest["parts"]))
+            validated = (batch for future in file_futures for batch in future.result())
+            start = time.perf_counter()
+            try:
+                report.result = load_validated_batches(
+                    validated, engine=engine, source=report.source, season=report.season, file_hash=hashes[path],
+                    finalize=False,
+                )
+            except Exception as e:
+                logger.error(f"Failed to load {path}: {e}")
+                report.failure = f"load: {e}"
+                for _ in file_futures:
+                    pass
+            report.load_seconds = time.perf_counter() - start
+
+    reports = [reports[path] for path in paths]
+    changed = any(report.result.changed for report in reports)
+    if changed or rebuild_indexes:
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            finalize_load(conn)
+        logger.info(f"Indexes, leaderboards and team aggregates rebuilt in {time.perf_counter() - start:.1f}s")
+    for report in reports:
+        _log_report(report)
+    if changed:
+        # Invalidate caches built on the previous content of the database
+        bump_data_version("sql")
+    return reports
+
+
+def _log_report(report: FileReport):
+    name = report.source
+    result = report.result
+    if report.failure:
+        logger.error(f"{name} ({report.season}): failed, {report.failure}")
+    elif result.skipped:
+        logger.info(f"{name} ({report.season}): unchanged since its last load, skipped.")
+    else:
+        logger.info(
+            f"{name} ({report.season}): {report.rows} rows in {report.parse_seconds:.1f}s parse + "
+            f"{report.load_seconds:.1f}s load ({report.rows_per_second:,.0f} rows/s); {result.inserted} inserted, "
+            f"{result.updated} updated, {result.deleted} deleted, {result.unchanged} unchanged, {len(result.errors)} errors."
+        )
+        if result.errors:
+            logger.warning(f"{name}: first 5 errors: {result.errors[:5]}")
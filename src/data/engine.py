@@ -0,0 +1,105 @@
+"""
+SQLAlchemy engines of the stats database: one writer, one read-only pool.
+
+Query traffic (SQL agent, template planner, schema catalog) goes through the
+read engine: a bounded pool of `mode=ro` connections with `query_only`, a
+large page cache and memory-mapped I/O, so hot pages are served from memory.
+Ingestion uses the writer, which switches the database to WAL mode; readers
+then keep reading the last committed snapshot while a load is in progress
+instead of waiting for its lock.
+
+Both engines are created once per process and database URL.
+"""
+import os
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+
+from src.core.config import settings
+
+_lock = threading.Lock()
+_read_engines: Dict[str, Engine] = {}
+_write_engines: Dict[str, Engine] = {}
+
+
+def _is_file_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def _read_only_url(url):
+    """
+    sqlite:///path/to.db -> sqlite:///file:/abs/path/to.db?mode=ro&uri=true
+    """
+    path = os.path.abspath(url.database)
+    return url.set(database=f"file:{path}").update_query_dict({"mode": "ro", "uri": "true"})
+
+
+def _create_read_engine(database_url: str) -> Engine:
+    url = make_url(database_url)
+    if not _is_file_sqlite(url):
+        return create_engine(url)
+
+    engine = create_engine(
+        _read_only_url(url),
+        # Connections are used from worker threads (asyncio.to_thread, SQL toolkit)
+        connect_args={"check_same_thread": False},
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=settings.SQLITE_READ_POOL_TIMEOUT_SECONDS,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _configure(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA query_only = ON")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}")
+        # Negative value: cache size in KiB rather than in pages
+        cursor.execute(f"PRAGMA cache_size = -{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        cursor.close()
+
+    return engine
+
+
+def _create_write_engine(database_url: str) -> Engine:
+    url = make_url(database_url)
+    if not _is_file_sqlite(url):
+        return create_engine(url)
+
+    os.makedirs(os.path.dirname(os.path.abspath(url.database)), exist_ok=True)
+    engine = create_engine(url)
+
+    @event.listens_for(engine, "connect")
+    def _configure(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # Persistent in the database file: also applies to the read-only connections
+        cursor.execute("PRAGMA journal_mode = WAL")
+        # Durable at each checkpoint, enough for data that can be re-ingested
+        cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.close()
+
+    return engine
+
+
+def get_read_engine(database_url: Optional[str] = None) -> Engine:
+    """
+    Shared read-only, pooled engine for query traffic.
+    """
+    database_url = database_url or settings.DATABASE_URL
+    with _lock:
+        if database_url not in _read_engines:
+            _read_engines[database_url] = _create_read_engine(database_url)
+        return _read_engines[database_url]
+
+
+def get_write_engine(database_url: Optional[str] = None) -> Engine:
+    """
+    Shared engine for ingestion (the only writer of the stats database).
+    """
+    database_url = database_url or settings.DATABASE_URL
+    with _lock:
+        if database_url not in _write_engines:
+            _write_engines[database_url] = _create_write_engine(database_url)
+        return _write_engines[database_url]
@@ -0,0 +1,111 @@
+"""
+Streaming reader of the stats workbooks.
+
+`pd.read_excel` loads the whole sheet in openpyxl cells, then builds the
+DataFrame from it: peak memory grows with the workbook. Here the sheet is
+opened in openpyxl's read-only mode and its rows are turned into DataFrames
+of at most `batch_size` rows, one at a time, so memory is bounded by the
+batch size whatever the number of rows.
+
+Batches look like `pd.read_excel(file_path, header=1)`: the header is the
+second row, the 3PM column is renamed, and the index is the position of the
+row in the data (as in the "Row {index}" validation errors). Empty rows and
+the cells right of the last header name are skipped.
+"""
+import datetime
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from src.core.logging import logger
+
+HEADER_ROW = 2
+
+
+def _column_name(value, position: int) -> str:
+    # The 3PM header is stored as a time: 15:00, i.e. 3 PM
+    if isinstance(value, datetime.time) and value.hour == 15 and value.minute == 0:
+        return "3PM"
+    if value is None:
+        return f"Unnamed: {position}"
+    return value
+
+
+def iter_stats_excel(file_path: str, batch_size: int, columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yields the rows of the first sheet of `file_path` as DataFrames of up to
+    `batch_size` rows. With `columns`, only these columns are kept (the
+    missing ones are left out, as validation reports them).
+    """
+    logger.info(f"Streaming data from {file_path}...")
+    try:
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+    except Exception as e:
+        logger.error(f"Failed to read Excel: {e}")
+        raise
+
+    try:
+        sheet = workbook.worksheets[0]
+        # The stored sheet dimensions can be wrong, rows are read until the last one
+        sheet.reset_dimensions()
+        rows = sheet.iter_rows(min_row=HEADER_ROW, values_only=True)
+        header = list(next(rows, ()))
+        # Cells right of the last header name are not read (read_excel names them "Unnamed: n")
+        while header and header[-1] is None:
+            header.pop()
+        header = [_column_name(value, position) for position, value in enumerate(header)]
+        if columns is None:
+            positions = list(range(len(header)))
+        else:
+            positions = [header.index(name) for name in columns if name in header]
+        names = [header[position] for position in positions]
+
+        batch: List[tuple] = []
+        index: List[int] = []
+        for row_number, row in enumerate(rows):
+            row = row[:len(header)]
+            if all(value is None for value in row):
+                continue
+            row = row + (None,) * (len(header) - len(row))
+            batch.append(tuple(row[position] for position in positions))
+            index.append(row_number)
+            if len(batch) == batch_size:
+                yield _frame(batch, names, index)
+                batch, index = [], []
+        if batch:
+            yield _frame(batch, names, index)
+    finally:
+        workbook.close()
+
+
+def _frame(rows: List[tuple], names: List[str], index: List[int]) -> pd.DataFrame:
+    # Empty cells are None in object columns (NaN with read_excel), validation treats both as missing
+    return pd.DataFrame.from_records(rows, columns=names, index=pd.Index(index))
+
+
+def read_stats_excel(file_path: str, batch_size: int = 50_000, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    The whole workbook in one DataFrame.
+    """
+    frames = list(iter_stats_excel(file_path, batch_size, columns))
+    return pd.concat(frames) if frames else pd.DataFrame(columns=columns)
+
+
+def sample_stats_excel(file_path: str, max_rows: int, batch_size: int = 50_000, seed: int = 0) -> pd.DataFrame:
+    """
+    A uniform sample of at most `max_rows` rows of the workbook, read in
+    bounded memory: each row gets a random key and the `max_rows` smallest
+    keys seen so far are kept.
+    """
+    rng = np.random.default_rng(seed)
+    sample = None
+    for batch in iter_stats_excel(file_path, batch_size):
+        batch = batch.assign(_key=rng.random(len(batch)))
+        sample = batch if sample is None else pd.concat([sample, batch])
+        if len(sample) > max_rows:
+            sample = sample.nsmallest(max_rows, "_key")
+    if sample is None:
+        return pd.DataFrame()
+    return sample.drop(columns="_key").sort_index()
@@ -1,96 +1,269 @@
+import os
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Tuple
+
 import pandas as pd
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import Column, Index, Integer, MetaData, Table, and_, delete, exists, func, insert, or_, select, text, update
 from src.core.config import settings
 from src.core.logging import logger
+from src.data.aggregates import materialize_aggregates
+from src.data.engine import get_write_engine
+from src.data.models import Base, IngestionManifestSQL, PlayerStatsSQL, ensure_indexes, upgrade_schema
 from src.data.schemas import PlayerStats
-from src.data.models import Base, PlayerStatsSQL
+from src.data.source_cache import file_sha256, iter_source_batches
+from src.data.validation import validate_frame
+from src.data.versioning import bump_data_version
 import datetime
 
-def ingest_data(file_path: str):
-    """
-    Reads Excel file, validates with Pydantic, and saves to SQLite.
-    """
-    logger.info(f"Reading data from {file_path}...")
-    
-    # Read Excel, header is at index 1 (row 2)
-    try:
-        df = pd.read_excel(file_path, header=1)
-    except Exception as e:
-        logger.error(f"Failed to read Excel: {e}")
-        raise
-
-    # Rename the weird 3PM column
-    # It usually comes as datetime.time(15, 0) which is 3PM
-    # We need to find this column and rename it to "3PM"
-    
-    new_columns = {}
-    for col in df.columns:
-        if isinstance(col, datetime.time) and col.hour == 15 and col.minute == 0:
-            new_columns[col] = "3PM"
-    
-    if new_columns:
-        df = df.rename(columns=new_columns)
-        logger.info(f"Renamed columns: {new_columns}")
-
-    # Database Setup
-    engine = create_engine(settings.DATABASE_URL)
-    Base.metadata.create_all(bind=engine)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    session = SessionLocal()
-
-    logger.info("Validating and inserting records...")
-    valid_count = 0
-    errors = []
-
-    for index, row in df.iterrows():
-        try:
-            # Convert row to dict, handle NaN
-            row_dict = row.to_dict()
-            
-            # Pydantic Validation
-            player_data = PlayerStats(**row_dict)
-            
-            # Map to SQL Model
-            db_player = PlayerStatsSQL(
-                player=player_data.player,
-                team=player_data.team,
-                age=player_data.age,
-                gp=player_data.gp,
-                w=player_data.w,
-                l=player_data.l,
-                min=player_data.min,
-                pts=player_data.pts,
-                fgm=player_data.fgm,
-                fga=player_data.fga,
-                fg_pct=player_data.fg_pct,
-                three_pm=player_data.three_pm,
-                three_pa=player_data.three_pa,
-                three_p_pct=player_data.three_p_pct,
-                ftm=player_data.ftm,
-                fta=player_data.fta,
-                ft_pct=player_data.ft_pct,
-                oreb=player_data.oreb,
-                dreb=player_data.dreb,
-                reb=player_data.reb,
-                ast=player_data.ast,
-                tov=player_data.tov,
-                stl=player_data.stl,
-                blk=player_data.blk,
-                pf=player_data.pf,
-                plus_minus=player_data.plus_minus
+STAT_FIELDS = list(PlayerStats.model_fields)
+# Workbook columns read by the ingestion
+STAT_ALIASES = [field.alias or name for name, field in PlayerStats.model_fields.items()]
+COLUMNS = STAT_FIELDS + ["season", "source", "row_hash"]
+
+# Validated rows of the load in progress, with their row in the workbook
+STAGING = Table(
+    "staging_player_stats", MetaData(),
+    *[Column(name, PlayerStatsSQL.__table__.c[name].type) for name in COLUMNS],
+    Column("row", Integer),
+    Index("ix_staging_player_stats_key", "player", "team"),
+    prefixes=["TEMPORARY"],
+)
+STAGING_KEY = (STAGING.c.player, STAGING.c.team)  # + season, the same for every row of a load
+
+@dataclass
+class LoadResult:
+    """
+    What a load changed in player_stats.
+    """
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    errors: List[str] = field(default_factory=list)
+    skipped: bool = False  # Workbook unchanged since its last load, not read
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+def _row_hashes(valid: pd.DataFrame) -> pd.Series:
+    """
+    Hash of the stats of each row, compared with the stored one to find the changed rows.
+    """
+    hashes = pd.util.hash_pandas_object(valid[STAT_FIELDS], index=False)
+    return hashes.map("{:016x}".format)
+
+def _frame_batches(df: pd.DataFrame, batch_size: int) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(df), batch_size):
+        yield df.iloc[start:start + batch_size]
+
+def validate_batches(batches: Iterable[pd.DataFrame]) -> Iterator[Tuple[pd.DataFrame, List[str]]]:
+    """
+    Validates each batch against PlayerStats: yields its valid rows, with
+    their row hash, and the errors of the invalid ones.
+    """
+    for batch in batches:
+        valid, errors = validate_frame(batch)
+        if not valid.empty:
+            valid = valid.assign(row_hash=_row_hashes(valid))
+        yield valid, errors
+
+def _stage(conn, validated: Iterable[Tuple[pd.DataFrame, List[str]]], source: str, season: str, errors: List[str]) -> int:
+    """
+    Appends the valid rows of each batch to the staging table.
+    Returns the number of staged rows.
+    """
+    staged = 0
+    for valid, batch_errors in validated:
+        errors.extend(batch_errors)
+        if valid.empty:
+            continue
+        valid = valid.assign(season=season, source=source, row=valid.index)
+        # executemany of one prepared INSERT per batch
+        conn.execute(insert(STAGING), valid.to_dict("records"))
+        staged += len(valid)
+    return staged
+
+def _drop_duplicate_keys(conn, errors: List[str]) -> int:
+    """
+    Keeps the first row of each (player, team) of the workbook, the others
+    are reported as errors. Returns the number of rows dropped.
+    """
+    first_rows = select(func.min(STAGING.c.row)).group_by(*STAGING_KEY)
+    duplicates = STAGING.c.row.not_in(first_rows)
+    for row, player, team in conn.execute(select(STAGING.c.row, *STAGING_KEY).where(duplicates).order_by(STAGING.c.row)):
+        errors.append(f"Row {row}: duplicate of an earlier row for ({player}, {team}), ignored")
+    return conn.execute(delete(STAGING).where(duplicates)).rowcount
+
+def drop_secondary_indexes(conn):
+    """
+    Drops the indexes of player_stats except the unique key, which loads use
+    to look rows up. Building them once after a large load (`finalize_load`)
+    is faster than updating them row by row.
+    """
+    for index in PlayerStatsSQL.__table__.indexes:
+        if not index.unique:
+            index.drop(bind=conn, checkfirst=True)
+
+def finalize_load(conn):
+    """
+    What follows the loads that changed player_stats: missing indexes,
+    leaderboards and team aggregates, query planner statistics.
+    """
+    ensure_indexes(conn)
+    materialize_aggregates(conn)
+    # Fresh statistics for the query planner's index choices
+    conn.execute(text("ANALYZE"))
+
+def load_batches(batches: Iterable[pd.DataFrame], engine=None, source: str = "dataframe",
+                 season: Optional[str] = None, file_hash: Optional[str] = None) -> LoadResult:
+    """
+    `load_validated_batches` of the row batches validated against PlayerStats.
+    """
+    return load_validated_batches(validate_batches(batches), engine=engine, source=source, season=season, file_hash=file_hash)
+
+def load_validated_batches(validated: Iterable[Tuple[pd.DataFrame, List[str]]], engine=None, source: str = "dataframe",
+                           season: Optional[str] = None, file_hash: Optional[str] = None, finalize: bool = True) -> LoadResult:
+    """
+    Applies the validated batches (of `validate_batches`) to the (player,
+    team, season) keys of player_stats: new keys are inserted, rows whose
+    stats changed are updated, rows previously loaded from `source` that are
+    no longer in the batches are deleted, identical rows are left alone.
+    Loading the same rows twice writes nothing.
+
+    Rows that failed validation may still be in the database: the deletions
+    only happen when every row was valid. A load without valid rows, or with
+    more than INGESTION_MAX_ERROR_RATIO of invalid ones (a renamed header
+    fails them all), raises ValueError and writes nothing, manifest included:
+    the workbook is read again on its next ingestion.
+
+    Batches are staged one at a time in a temporary table, then applied with
+    set-based statements: memory is bounded by the batch size. All of it, the
+    aggregates rebuild and the manifest entry of `source` are one transaction.
+
+    Without `finalize`, for loads of many workbooks in a row, the schema is
+    expected up to date and the indexes, aggregates and statistics are left
+    to one `finalize_load` of the caller after the last load.
+    """
+    engine = engine or get_write_engine()
+    season = season or settings.INGESTION_SEASON
+    table = PlayerStatsSQL.__table__
+    if finalize:
+        Base.metadata.create_all(bind=engine)
+        upgrade_schema(engine, season)
+    result = LoadResult()
+
+    logger.info("Validating and staging records...")
+    with engine.begin() as conn:
+        STAGING.drop(bind=conn, checkfirst=True)
+        STAGING.create(bind=conn)
+        staged = _stage(conn, validated, source, season, result.errors)
+        invalid = len(result.errors)
+        if not staged or invalid > settings.INGESTION_MAX_ERROR_RATIO * (staged + invalid):
+            # Raised inside the transaction: rolled back
+            raise ValueError(
+                f"{source}: {invalid} of {staged + invalid} rows failed validation, load rejected. "
+                f"First errors: {result.errors[:3]}"
             )
-            
-            session.add(db_player)
-            valid_count += 1
-            
-        except Exception as e:
-            errors.append(f"Row {index}: {e}")
-            # logger.warning(f"Validation error at row {index}: {e}")
-
-    session.commit()
-    session.close()
-    
-    logger.info(f"Successfully inserted {valid_count} records.")
-    if errors:
-        logger.warning(f"Encountered {len(errors)} errors. First 5: {errors[:5]}")
+        staged -= _drop_duplicate_keys(conn, result.errors)
+
+        same_key = and_(table.c.player == STAGING.c.player, table.c.team == STAGING.c.team, table.c.season == season)
+        is_new = ~exists().where(same_key)
+        # Loads that more than double the table rebuild its indexes at the
+        # end; readers keep seeing the indexed previous snapshot meanwhile
+        rebuild_indexes = finalize and (
+            conn.execute(select(func.count()).select_from(STAGING).where(is_new)).scalar()
+            > conn.execute(select(func.count()).select_from(table)).scalar()
+        )
+        if rebuild_indexes:
+            drop_secondary_indexes(conn)
+
+        if not invalid:
+            result.deleted = conn.execute(
+                delete(table).where(
+                    table.c.season == season, table.c.source == source,
+                    ~exists().where(STAGING.c.player == table.c.player, STAGING.c.team == table.c.team),
+                )
+            ).rowcount
+        else:
+            # An invalid row is not a removed one: rows missing from the batches are kept
+            logger.warning(f"{source}: {invalid} invalid rows, rows missing from the workbook are not deleted.")
+        # UPDATE ... FROM the staging table
+        result.updated = conn.execute(
+            update(table)
+            .values({name: STAGING.c[name] for name in COLUMNS})
+            .where(same_key, or_(
+                table.c.row_hash.is_distinct_from(STAGING.c.row_hash),
+                table.c.source.is_distinct_from(STAGING.c.source),
+            ))
+        ).rowcount
+        result.inserted = conn.execute(
+            insert(table).from_select(COLUMNS, select(*[STAGING.c[name] for name in COLUMNS]).where(is_new))
+        ).rowcount
+        result.unchanged = staged - result.inserted - result.updated
+        STAGING.drop(bind=conn)
+
+        if finalize and (result.changed or rebuild_indexes):
+            # Leaderboards and team aggregates change in the same transaction as the rows
+            finalize_load(conn)
+
+        manifest = IngestionManifestSQL.__table__
+        conn.execute(delete(manifest).where(manifest.c.source == source))
+        conn.execute(insert(manifest), [{
+            "source": source, "season": season, "file_hash": file_hash, "row_count": staged,
+            "error_count": len(result.errors), "ingested_at": datetime.datetime.now(datetime.timezone.utc),
+        }])
+
+    return result
+
+def load_dataframe(df: pd.DataFrame, engine=None, batch_size: int = None, source: str = "dataframe",
+                   season: Optional[str] = None, file_hash: Optional[str] = None) -> LoadResult:
+    """
+    `load_batches` of a DataFrame, in batches of `batch_size` rows.
+    """
+    batch_size = batch_size or settings.INGESTION_BATCH_SIZE
+    return load_batches(_frame_batches(df, batch_size), engine=engine, source=source, season=season, file_hash=file_hash)
+
+def is_loaded(engine, source: str, file_hash: str, season: str) -> bool:
+    """
+    Whether the manifest says `source` was last loaded with this content and season.
+    """
+    Base.metadata.create_all(bind=engine)
+    manifest = IngestionManifestSQL.__table__
+    with engine.connect() as conn:
+        previous = conn.execute(
+            select(manifest.c.file_hash, manifest.c.season).where(manifest.c.source == source)
+        ).first()
+    return previous is not None and tuple(previous) == (file_hash, season)
+
+def ingest_data(file_path: str, season: Optional[str] = None, force: bool = False) -> LoadResult:
+    """
+    Streams the Excel file in batches validated against the PlayerStats schema,
+    and applies the differences with its previous load to SQLite. A workbook whose content
+    did not change since its last load is skipped, unless `force`. Raises
+    ValueError, nothing written, if too many of its rows are invalid.
+    """
+    engine = get_write_engine()
+    season = season or settings.INGESTION_SEASON
+    source = os.path.basename(file_path)
+    file_hash = file_sha256(file_path)
+
+    if not force and is_loaded(engine, source, file_hash, season):
+        logger.info(f"{source} unchanged since its last load (sha256 {file_hash[:12]}), skipped.")
+        return LoadResult(skipped=True)
+
+    # From the parsed copy of this content, parsed (and streamed) on its first read:
+    # the workbook is never held in memory as a whole
+    batches = iter_source_batches(file_path, settings.INGESTION_BATCH_SIZE, columns=STAT_ALIASES, file_hash=file_hash)
+    result = load_batches(batches, engine=engine, source=source, season=season, file_hash=file_hash)
+
+    logger.info(
+        f"{source}: {result.inserted} inserted, {result.updated} updated, "
+        f"{result.deleted} deleted, {result.unchanged} unchanged records."
+    )
+    if result.changed:
+        # Invalidate caches built on the previous content of the database
+        bump_data_version("sql")
+    if result.errors:
+        logger.warning(f"Encountered {len(result.errors)} errors. First 5: {result.errors[:5]}")
+    return result
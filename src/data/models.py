@@ -1,11 +1,25 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, DateTime, Integer, String, Float, Index, inspect, text
 from sqlalchemy.orm import DeclarativeBase
 
+# Stats the agent sorts on ("top 5 scorers"): an index walks them in order and stops at
+# the LIMIT. Less common sorts stay scans; the leaderboard view covers every stat
+SORT_INDEXED_STATS = ("pts", "reb", "ast", "stl", "blk", "three_pm", "min", "plus_minus", "fg_pct", "three_p_pct", "ft_pct")
+# Team filters and GROUP BY team: (team, stat) serves "WHERE team = ?" on its
+# prefix and covers SUM/AVG/ORDER BY of the stat within a team
+TEAM_INDEXED_STATS = ("pts", "reb", "ast")
+
 class Base(DeclarativeBase):
     pass
 
 class PlayerStatsSQL(Base):
     __tablename__ = "player_stats"
+    __table_args__ = (
+        # Natural key: ingestion upserts on it, so re-loading a workbook never duplicates rows
+        Index("ux_player_stats_player_team_season", "player", "team", "season", unique=True),
+        Index("ix_player_stats_age", "age"),
+        *[Index(f"ix_player_stats_team_{stat}", "team", stat) for stat in TEAM_INDEXED_STATS],
+        *[Index(f"ix_player_stats_{stat}", stat) for stat in SORT_INDEXED_STATS],
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     player = Column(String, index=True)
@@ -34,3 +48,54 @@ class PlayerStatsSQL(Base):
     blk = Column(Float)
     pf = Column(Float)
     plus_minus = Column(Float)
+    season = Column(String)
+    # Ingestion bookkeeping: workbook the row comes from, and hash of its stats to detect changes
+    source = Column(String)
+    row_hash = Column(String)
+
+# Columns added after the first release, created on existing databases by `upgrade_schema`
+ADDED_COLUMNS = ("season", "source", "row_hash")
+
+class IngestionManifestSQL(Base):
+    """
+    One row per ingested workbook: a workbook whose content hash did not
+    change since its last load is skipped.
+    """
+    __tablename__ = "ingestion_manifest"
+
+    source = Column(String, primary_key=True)
+    season = Column(String)
+    file_hash = Column(String)
+    row_count = Column(Integer)
+    error_count = Column(Integer)
+    ingested_at = Column(DateTime)
+
+
+def ensure_indexes(bind):
+    """
+    Creates the indexes missing from an existing database (`create_all` only
+    creates the indexes of the tables it creates).
+    """
+    for index in PlayerStatsSQL.__table__.indexes:
+        index.create(bind=bind, checkfirst=True)
+
+
+def upgrade_schema(engine, season: str):
+    """
+    Brings a player_stats table created by an older release up to date: adds
+    the missing columns (existing rows get `season`), removes the duplicates
+    left by the append-only ingestion (the last loaded row of each key is
+    kept) and creates the missing indexes, the unique key included.
+    """
+    existing = {column["name"] for column in inspect(engine).get_columns(PlayerStatsSQL.__tablename__)}
+    missing = [name for name in ADDED_COLUMNS if name not in existing]
+    with engine.begin() as conn:
+        for name in missing:
+            conn.execute(text(f"ALTER TABLE player_stats ADD COLUMN {name} VARCHAR"))
+        if missing:
+            conn.execute(text("UPDATE player_stats SET season = :season WHERE season IS NULL"), {"season": season})
+            conn.execute(text(
+                "DELETE FROM player_stats WHERE id NOT IN "
+                "(SELECT MAX(id) FROM player_stats GROUP BY player, team, season)"
+            ))
+        ensure_indexes(conn)
@@ -3,36 +3,41 @@ from typing import Optional
 import datetime
 
 class PlayerStats(BaseModel):
+    """
+    Schema of record of a player_stats row. Ingestion validates whole columns
+    against these fields (types and ge/le bounds) and only builds the model
+    for the rows that fail, to report the same errors.
+    """
     model_config = ConfigDict(populate_by_name=True)
 
     player: str = Field(alias="Player")
     team: str = Field(alias="Team")
-    age: int = Field(alias="Age")
-    gp: int = Field(alias="GP")
-    w: int = Field(alias="W")
-    l: int = Field(alias="L")
-    min: float = Field(alias="Min")
-    pts: float = Field(alias="PTS")
-    fgm: float = Field(alias="FGM")
-    fga: float = Field(alias="FGA")
-    fg_pct: float = Field(alias="FG%")
+    age: int = Field(alias="Age", ge=0)
+    gp: int = Field(alias="GP", ge=0)
+    w: int = Field(alias="W", ge=0)
+    l: int = Field(alias="L", ge=0)
+    min: float = Field(alias="Min", ge=0)
+    pts: float = Field(alias="PTS", ge=0)
+    fgm: float = Field(alias="FGM", ge=0)
+    fga: float = Field(alias="FGA", ge=0)
+    fg_pct: float = Field(alias="FG%", ge=0, le=100)
     
     # Handle the weird 3PM column which might be datetime or string
-    three_pm: float = Field(alias="3PM") 
+    three_pm: float = Field(alias="3PM", ge=0) 
     
-    three_pa: float = Field(alias="3PA")
-    three_p_pct: float = Field(alias="3P%")
-    ftm: float = Field(alias="FTM")
-    fta: float = Field(alias="FTA")
-    ft_pct: float = Field(alias="FT%")
-    oreb: float = Field(alias="OREB")
-    dreb: float = Field(alias="DREB")
-    reb: float = Field(alias="REB")
-    ast: float = Field(alias="AST")
-    tov: float = Field(alias="TOV")
-    stl: float = Field(alias="STL")
-    blk: float = Field(alias="BLK")
-    pf: float = Field(alias="PF")
+    three_pa: float = Field(alias="3PA", ge=0)
+    three_p_pct: float = Field(alias="3P%", ge=0, le=100)
+    ftm: float = Field(alias="FTM", ge=0)
+    fta: float = Field(alias="FTA", ge=0)
+    ft_pct: float = Field(alias="FT%", ge=0, le=100)
+    oreb: float = Field(alias="OREB", ge=0)
+    dreb: float = Field(alias="DREB", ge=0)
+    reb: float = Field(alias="REB", ge=0)
+    ast: float = Field(alias="AST", ge=0)
+    tov: float = Field(alias="TOV", ge=0)
+    stl: float = Field(alias="STL", ge=0)
+    blk: float = Field(alias="BLK", ge=0)
+    pf: float = Field(alias="PF", ge=0)
     plus_minus: float = Field(alias="+/-")
     
     @field_validator('three_pm', mode='before')
@@ -0,0 +1,194 @@
+"""
+Content-addressed cache of the parsed stats workbooks.
+
+Parsing a workbook with openpyxl is the slowest step of ingestion and drift
+analysis, and both read the same files. The first reader of a workbook
+streams it through `iter_stats_excel` (3PM header fixed) and stores the rows
+as Arrow IPC (Feather v2) parts, typed and uncompressed, under
+`SOURCE_CACHE_DIR/<sha256 of the file>/`. Every later read of the same content
+memory-maps the parts: the columns are read in place from the page cache, and
+only the rows converted to pandas are copied. A modified workbook has another
+hash, so it gets a new entry; the previous entry of the same file is then
+removed.
+
+Column types are inferred per part: numeric columns keep their dtype, a
+column of one Python type keeps it (str, datetime, ...), and a column mixing
+numbers and text is stored as text ("12" and "n/a"), which validation
+coerces and rejects as it did the cell values.
+"""
+import hashlib
+import json
+import os
+import shutil
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+from src.core.config import settings
+from src.core.logging import logger
+from src.data.excel_reader import iter_stats_excel, sample_stats_excel
+
+MANIFEST = "manifest.json"
+ROW_COLUMN = "__row__"  # Index of the row in the workbook, as in "Row {index}" errors
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _typed_column(values: pd.Series) -> pd.Series:
+    if values.dtype != object:
+        return values
+    types = set(map(type, values.dropna()))
+    if len(types) <= 1:
+        return values
+    if types <= {int, float}:
+        return pd.to_numeric(values)
+    return values.map(lambda v: v if v is None or isinstance(v, str) else str(v))
+
+
+def _typed(batch: pd.DataFrame) -> pa.Table:
+    batch = pd.DataFrame({name: _typed_column(batch[name]) for name in batch.columns}, index=batch.index)
+    batch[ROW_COLUMN] = batch.index
+    return pa.Table.from_pandas(batch, preserve_index=False)
+
+
+def _entry_path(file_hash: str) -> str:
+    return os.path.join(settings.SOURCE_CACHE_DIR, file_hash)
+
+
+def _read_manifest(entry: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(entry, MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _build(file_path: str, file_hash: str) -> str:
+    entry = _entry_path(file_hash)
+    tmp_entry = f"{entry}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_entry, ignore_errors=True)
+    os.makedirs(tmp_entry)
+
+    parts, rows = [], 0
+    for number, batch in enumerate(iter_stats_excel(file_path, settings.SOURCE_CACHE_PART_ROWS)):
+        name = f"part-{number:05d}.arrow"
+        # Uncompressed: reads are memory-mapped without decoding
+        feather.write_feather(_typed(batch), os.path.join(tmp_entry, name), compression="uncompressed")
+        parts.append({"file": name, "rows": len(batch)})
+        rows += len(batch)
+    source = os.path.abspath(file_path)
+    with open(os.path.join(tmp_entry, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({"source": source, "sha256": file_hash, "rows": rows, "parts": parts}, f)
+
+    try:
+        # Atomic: readers see the whole entry or none of it
+        os.rename(tmp_entry, entry)
+    except OSError:
+        # Built by another process in the meantime
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+    logger.info(f"Cached {source} ({rows} rows, {len(parts)} parts) in {entry}")
+
+    for other in os.listdir(settings.SOURCE_CACHE_DIR):
+        other_entry = os.path.join(settings.SOURCE_CACHE_DIR, other)
+        if other != file_hash and (_read_manifest(other_entry) or {}).get("source") == source:
+            shutil.rmtree(other_entry, ignore_errors=True)
+    return entry
+
+
+def cached_source(file_path: str, file_hash: Optional[str] = None) -> dict:
+    """
+    Manifest of the cache entry of `file_path` (with its "path"), built first
+    if the content of the file was never cached.
+    """
+    file_hash = file_hash or file_sha256(file_path)
+    entry = _entry_path(file_hash)
+    manifest = _read_manifest(entry)
+    if manifest is None:
+        os.makedirs(settings.SOURCE_CACHE_DIR, exist_ok=True)
+        entry = _build(file_path, file_hash)
+        manifest = _read_manifest(entry)
+    return {**manifest, "path": entry}
+
+
+def _frame(table: pa.Table, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    if columns is not None:
+        # Missing columns are left out, as validation reports them
+        table = table.select([name for name in columns if name in table.column_names] + [ROW_COLUMN])
+    df = table.to_pandas()
+    # Missing values of text columns are None, as in the streamed batches
+    return df.set_index(ROW_COLUMN).rename_axis(None)
+
+
+def _part_table(manifest: dict, number: int) -> pa.Table:
+    return feather.read_table(os.path.join(manifest["path"], manifest["parts"][number]["file"]), memory_map=True)
+
+
+def _part_tables(manifest: dict) -> Iterator[pa.Table]:
+    for number in range(len(manifest["parts"])):
+        yield _part_table(manifest, number)
+
+
+def iter_part_batches(manifest: dict, number: int, batch_size: int,
+                      columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    The rows of part `number` of a cache entry (of `cached_source`) as
+    DataFrames of up to `batch_size` rows.
+    """
+    table = _part_table(manifest, number)
+    for start in range(0, table.num_rows, batch_size):
+        # Zero-copy slice, only its rows are converted
+        yield _frame(table.slice(start, batch_size), columns)
+
+
+def iter_source_batches(file_path: str, batch_size: int, columns: Optional[Sequence[str]] = None,
+                        file_hash: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    `iter_stats_excel` of `file_path`, served from its cache entry.
+    """
+    if not settings.SOURCE_CACHE_ENABLED:
+        yield from iter_stats_excel(file_path, batch_size, columns)
+        return
+    manifest = cached_source(file_path, file_hash)
+    for number in range(len(manifest["parts"])):
+        yield from iter_part_batches(manifest, number, batch_size, columns)
+
+
+def read_source(file_path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    The whole workbook in one DataFrame.
+    """
+    frames = list(iter_source_batches(file_path, settings.SOURCE_CACHE_PART_ROWS, columns))
+    return pd.concat(frames) if frames else pd.DataFrame(columns=columns)
+
+
+def sample_source(file_path: str, max_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    A uniform sample of at most `max_rows` rows of the workbook. From the
+    cache, the sampled rows are taken from the memory-mapped parts: only they
+    are read.
+    """
+    if not settings.SOURCE_CACHE_ENABLED:
+        return sample_stats_excel(file_path, max_rows, seed=seed)
+    manifest = cached_source(file_path)
+    rows = manifest["rows"]
+    positions = np.arange(rows)
+    if rows > max_rows:
+        positions = np.sort(np.random.default_rng(seed).choice(rows, max_rows, replace=False))
+
+    frames: List[pd.DataFrame] = []
+    offset = 0
+    for table in _part_tables(manifest):
+        start, stop = np.searchsorted(positions, [offset, offset + table.num_rows])
+        if stop > start:
+            frames.append(_frame(table.take(positions[start:stop] - offset), None))
+        offset += table.num_rows
+    return pd.concat(frames) if frames else pd.DataFrame()
@@ -0,0 +1,88 @@
+"""
+Column-level validation of a stats DataFrame against `PlayerStats`.
+
+Validating row by row builds one Pydantic model per row. Here each field of
+`PlayerStats` is checked on its whole column at once: type coercion as in
+Pydantic's lax mode (numeric strings accepted, ints must be whole numbers,
+NaN allowed in unconstrained floats) and the field's ge/gt/le/lt bounds.
+Only the rows that fail are then validated with `PlayerStats` itself, which
+gives the exact error of the row-by-row path (and accepts the rare value the
+column check is stricter about).
+"""
+from typing import List, Tuple
+
+import annotated_types
+import numpy as np
+import pandas as pd
+
+from src.data.schemas import PlayerStats
+
+_BOUNDS = {
+    annotated_types.Ge: ("ge", np.greater_equal),
+    annotated_types.Gt: ("gt", np.greater),
+    annotated_types.Le: ("le", np.less_equal),
+    annotated_types.Lt: ("lt", np.less),
+}
+
+
+def _check_column(values: pd.Series, field) -> Tuple[pd.Series, np.ndarray]:
+    """
+    Returns the coerced column and the mask of its valid values.
+    """
+    if field.annotation is str:
+        return values, values.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+
+    numbers = pd.to_numeric(values, errors="coerce").astype(np.float64)
+    array = numbers.to_numpy()
+    if field.annotation is int:
+        with np.errstate(invalid="ignore"):
+            valid = np.isfinite(array) & (np.floor(array) == array)
+    else:
+        # Unparseable values become NaN: only a value that was missing is a valid NaN
+        valid = ~np.isnan(array) | values.isna().to_numpy()
+
+    for constraint in field.metadata:
+        if type(constraint) in _BOUNDS:
+            attribute, compare = _BOUNDS[type(constraint)]
+            with np.errstate(invalid="ignore"):
+                valid &= compare(array, getattr(constraint, attribute))
+
+    if field.annotation is int:
+        numbers = pd.Series(np.where(valid, array, 0).astype(np.int64), index=values.index)
+    return numbers, valid
+
+
+def validate_frame(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Returns the valid rows (columns named after the PlayerStats fields, in
+    field order, original index kept) and the "Row {index}: {error}" messages
+    of the invalid ones.
+    """
+    columns = {}
+    valid = np.ones(len(df), dtype=bool)
+    for name, field in PlayerStats.model_fields.items():
+        alias = field.alias or name
+        if alias not in df.columns:
+            # Missing column: every row fails, PlayerStats reports it
+            valid[:] = False
+            columns[name] = pd.Series([None] * len(df), index=df.index, dtype=object)
+            continue
+        columns[name], column_valid = _check_column(df[alias], field)
+        valid &= column_valid
+
+    clean = pd.DataFrame(columns, index=df.index)
+    errors = []
+    if not valid.all():
+        clean = clean.astype(object)
+        for position in np.flatnonzero(~valid):
+            index = df.index[position]
+            try:
+                player = PlayerStats(**df.iloc[position].to_dict())
+            except Exception as e:
+                errors.append(f"Row {index}: {e}")
+                continue
+            clean.iloc[position] = list(player.model_dump().values())
+            valid[position] = True
+        clean = clean.infer_objects()
+
+    return clean[valid], errors
@@ -0,0 +1,68 @@
+"""
+Data version counters shared between ingestion scripts and the API process.
+
+Every successful load bumps the counter of its source ("sql" for the stats
+database, "vector" for the FAISS index). Caches compare the version they were
+filled with against the current one and drop their content when it changed.
+The counters live in a small JSON file so that a separate ingestion process
+invalidates the caches of a running API.
+"""
+import json
+import os
+from typing import Dict
+
+from src.core.config import settings
+from src.core.logging import logger
+
+SOURCES = ("sql", "vector")
+
+_cached_key = None
+_cached_versions: Dict[str, int] = {}
+
+
+def get_data_version() -> Dict[str, int]:
+    """
+    Returns the current version of each data source. Cheap: the file is
+    only re-read when its modification time changes.
+    """
+    global _cached_key, _cached_versions
+
+    path = settings.DATA_VERSION_FILE
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {source: 0 for source in SOURCES}
+
+    if (path, mtime) != _cached_key:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read data version file {path}: {e}")
+            stored = {}
+        _cached_versions = {source: int(stored.get(source, 0)) for source in SOURCES}
+        _cached_key = (path, mtime)
+
+    return dict(_cached_versions)
+
+
+def bump_data_version(source: str) -> int:
+    """
+    Increments the version of `source` after its data changed.
+    """
+    if source not in SOURCES:
+        raise ValueError(f"Unknown data source: {source}")
+
+    versions = get_data_version()
+    versions[source] += 1
+
+    path = settings.DATA_VERSION_FILE
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(versions, f)
+    # Atomic on POSIX and Windows: readers never see a half-written file
+    os.replace(tmp_path, path)
+
+    logger.info(f"Data version of '{source}' bumped to {versions[source]}")
+    return versions[source]
@@ -1,7 +1,8 @@
-import pandas as pd
 from evidently.report import Report
 from evidently.metric_preset import DataDriftPreset
+from src.core.config import settings
 from src.core.logging import logger
+from src.data.source_cache import sample_source
 import os
 
 def run_drift_analysis(current_data_path: str, reference_data_path: str, output_path: str = "data/drift_report.html"):
@@ -17,8 +18,9 @@ def run_drift_analysis(current_data_path: str, reference_data_path: str, output_
     try:
         # Load data
         # Assuming Excel for now as per project, but could be CSV or SQL query result
-        current_df = pd.read_excel(current_data_path, header=1) 
-        reference_df = pd.read_excel(reference_data_path, header=1)
+        # Sampled past DRIFT_MAX_ROWS rows, from the memory-mapped parsed copy of each workbook
+        current_df = sample_source(current_data_path, settings.DRIFT_MAX_ROWS)
+        reference_df = sample_source(reference_data_path, settings.DRIFT_MAX_ROWS)
         
         # Simple preprocessing to ensure columns match
         
@@ -0,0 +1,142 @@
+"""
+Minimal in-process metrics registry rendered in the Prometheus text format.
+
+Counters and histograms are updated by the request path; component statistics
+(caches, admission lanes, ...) are pulled at scrape time through collectors.
+Works whether or not Logfire is configured.
+"""
+import math
+import threading
+from typing import Callable, Dict, List, Tuple
+
+# Seconds; covers cache hits (ms) up to long multi-tool agent runs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # labels -> [bucket counts..., sum, count]
+        self._values: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, state in self._values.items():
+                for i, upper in enumerate(self.buckets):
+                    bucket_labels = labels + (("le", _format_value(upper)),)
+                    lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {state[i]}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(state[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {state[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self, namespace: str = "sportsee"):
+        self.namespace = namespace
+        self._metrics: Dict[str, object] = {}
+        self._collectors: Dict[str, Callable[[], dict]] = {}
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        full_name = f"{self.namespace}_{name}"
+        if full_name not in self._metrics:
+            self._metrics[full_name] = Counter(full_name, documentation)
+        return self._metrics[full_name]
+
+    def histogram(self, name: str, documentation: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+        full_name = f"{self.namespace}_{name}"
+        if full_name not in self._metrics:
+            self._metrics[full_name] = Histogram(full_name, documentation, buckets)
+        return self._metrics[full_name]
+
+    def register_collector(self, prefix: str, collect: Callable[[], dict]):
+        """
+        Exposes the numeric values of `collect()` (a possibly nested stats dict)
+        as gauges named `<namespace>_<prefix>_<key>`. Nested dict keys become a
+        label, e.g. {"RAG": {"active": 2}} -> ..._active{key="RAG"} 2.
+        """
+        self._collectors[prefix] = collect
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for prefix, collect in self._collectors.items():
+            lines.extend(self._render_collector(prefix, collect()))
+        return "\n".join(lines) + "\n"
+
+    def _render_collector(self, prefix: str, stats: dict) -> List[str]:
+        samples: Dict[str, List[str]] = {}
+        for key, value in stats.items():
+            if isinstance(value, dict):
+                for sub_key, sub_value in value.items():
+                    if _is_number(sub_value):
+                        name = f"{self.namespace}_{prefix}_{sub_key}"
+                        samples.setdefault(name, []).append(f'{name}{{key="{_escape(key)}"}} {_format_value(sub_value)}')
+            elif _is_number(value):
+                name = f"{self.namespace}_{prefix}_{key}"
+                samples.setdefault(name, []).append(f"{name} {_format_value(value)}")
+
+        lines = []
+        for name, values in samples.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(values)
+        return lines
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+metrics = MetricsRegistry()
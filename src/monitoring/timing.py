@@ -0,0 +1,111 @@
+"""
+Per-stage latency breakdown of a request, captured with LangChain callbacks.
+
+A `StageTimer` is passed in the `callbacks` of an agent run; it records the
+duration of every LLM call (with token usage), tool invocation and retriever
+call. Stages measured outside LangChain (e.g. classification) are added with
+`record()`. Every recorded stage is also observed in the Prometheus metrics.
+"""
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.monitoring.metrics import metrics
+
+STAGE_DURATION = metrics.histogram("stage_duration_seconds", "Duration of each request stage (classification, llm, tool, retriever).")
+LLM_TOKENS = metrics.counter("llm_tokens_total", "Tokens consumed by LLM calls, by kind (prompt/completion).")
+
+
+class StageTimer(BaseCallbackHandler):
+    """
+    Collects stage timings of one request (or of one agent run).
+    """
+
+    # Called directly by the async callback manager instead of in a thread pool
+    run_inline = True
+
+    def __init__(self):
+        self.stages: List[Dict[str, Any]] = []
+        self._started: Dict[UUID, tuple] = {}
+
+    def record(self, stage: str, name: str, duration: float, **extra):
+        self.stages.append({"stage": stage, "name": name, "duration": duration, **extra})
+        STAGE_DURATION.observe(duration, stage=stage, name=name)
+        if extra.get("prompt_tokens"):
+            LLM_TOKENS.inc(extra["prompt_tokens"], kind="prompt", model=name)
+        if extra.get("completion_tokens"):
+            LLM_TOKENS.inc(extra["completion_tokens"], kind="completion", model=name)
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(s.get("prompt_tokens") or 0 for s in self.stages)
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(s.get("completion_tokens") or 0 for s in self.stages)
+
+    # --- LangChain callbacks ---
+
+    def _start(self, run_id: UUID, stage: str, name: str):
+        self._started[run_id] = (stage, name, time.perf_counter())
+
+    def _end(self, run_id: UUID, **extra):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            stage, name, start_time = started
+            self.record(stage, name, time.perf_counter() - start_time, **extra)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id, "llm", _model_name(serialized, kwargs))
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id, "llm", _model_name(serialized, kwargs))
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any):
+        prompt_tokens, completion_tokens = _token_usage(response)
+        self._end(run_id, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, error=str(error))
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id, "tool", (serialized or {}).get("name") or kwargs.get("name") or "tool")
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, error=str(error))
+
+    def on_retriever_start(self, serialized: Dict[str, Any], query: str, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id, "retriever", kwargs.get("name") or "retriever")
+
+    def on_retriever_end(self, documents, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, documents=len(documents))
+
+    def on_retriever_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, error=str(error))
+
+
+def _model_name(serialized: Optional[Dict[str, Any]], kwargs: Dict[str, Any]) -> str:
+    params = kwargs.get("invocation_params") or {}
+    return params.get("model") or params.get("model_name") or (serialized or {}).get("name") or "llm"
+
+
+def _token_usage(response) -> tuple:
+    """
+    Extracts (prompt_tokens, completion_tokens) from an LLMResult, if reported.
+    """
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens"), usage.get("completion_tokens")
+
+    # Streaming runs report usage on the message instead
+    for generations in response.generations:
+        for generation in generations:
+            usage_metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage_metadata:
+                return usage_metadata.get("input_tokens"), usage_metadata.get("output_tokens")
+    return None, None
@@ -0,0 +1,272 @@
+"""
+Answer cache placed in front of the RAG agent.
+
+Two tiers:
+- exact: normalized query text -> answer (no network call at all)
+- semantic: cosine similarity between the query embedding and the embeddings
+  of cached queries, held in a small in-memory matrix. Only queries naming the
+  same entities (`query_entities`: seasons, numbers, players, teams) match:
+  "points leader in 2023-24" and "points leader in 2024-25" embed almost the
+  same, but do not share an answer.
+
+Entries expire after a TTL, the cache is bounded (LRU eviction) and it is
+emptied whenever the data version of the stats DB or vector index changes.
+With a `vector_version` callable (the API passes its VectorStoreHandle's),
+the vector version is that of the index this process actually retrieves
+from: a newly published index only invalidates the cache once it is swapped
+in, not when it is published. Answers computed on data that changed while
+they were computed are not stored.
+"""
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Optional
+
+import numpy as np
+
+from src.core.logging import logger
+from src.data.versioning import get_data_version
+
+
+def normalize_query(query: str) -> str:
+    """
+    Lowercases, strips accents, punctuation and repeated whitespace so that
+    trivially different spellings of a question share a key.
+    """
+    text = unicodedata.normalize("NFKD", query.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    # Keep characters that carry meaning in stat names (3p%, +/-, fg%)
+    text = re.sub(r"[^\w\s%+/-]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+# "2023-24", "2023-2024" or "2023/24", as stored: "2023-24"
+SEASON_PATTERN = re.compile(r"(?<![\w/-])((?:19|20)\d{2})[-/]((?:19|20)?\d{2})(?![\w/-])")
+NBA_TEAM_CODES = {
+    "ATL", "BOS", "BKN", "CHA", "CHI", "CLE", "DAL", "DEN", "DET", "GSW", "HOU", "IND", "LAC", "LAL", "MEM",
+    "MIA", "MIL", "MIN", "NOP", "NYK", "OKC", "ORL", "PHI", "PHX", "POR", "SAC", "SAS", "TOR", "UTA", "WAS",
+}
+
+
+def query_entities(query: str) -> FrozenSet[str]:
+    """
+    Seasons, numbers and names of a query: the capitalized words after the
+    first one ("Jokic", "Lakers", "Western") and the team codes ("OKC").
+    Stat abbreviations like "PPG" or "FG%" are not names.
+    """
+    text = unicodedata.normalize("NFKD", query)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s%+/-]", " ", text)
+    entities = {f"{start}-{end[-2:]}" for start, end in SEASON_PATTERN.findall(text)}
+    words = SEASON_PATTERN.sub(" ", text).split()
+    for i, word in enumerate(words):
+        if word.isdigit() or word in NBA_TEAM_CODES or (i > 0 and word[:1].isupper() and not word.isupper()):
+            entities.add(word.lower())
+    return frozenset(entities)
+
+
+@dataclass
+class CachedAnswer:
+    answer: str
+    mode: str
+    created_at: float
+    slot: Optional[int] = None  # Row of the embedding matrix, if any
+
+
+class AnswerCache:
+    """
+    LRU + TTL answer cache with an exact tier and a semantic tier.
+
+    Used from the event loop only, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600,
+        similarity_threshold: float = 0.92,
+        embeddings=None,
+        vector_version: Optional[Callable[[], Optional[str]]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        # LangChain Embeddings; the semantic tier is disabled while it is None
+        self.embeddings = embeddings
+        self.vector_version = vector_version
+
+        self._entries: "OrderedDict[str, CachedAnswer]" = OrderedDict()
+        self._vectors: Optional[np.ndarray] = None
+        self._slot_keys: List[Optional[str]] = [None] * max_entries
+        self._occupied = np.zeros(max_entries, dtype=bool)
+        # hash() of the `query_entities` of each slot's query
+        self._slot_entities = np.zeros(max_entries, dtype=np.int64)
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        self._data_version = self.data_version()
+
+        self.hits_exact = 0
+        self.hits_semantic = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_answers = 0
+
+    # --- Lookups ---
+
+    def get(self, query: str) -> Optional[CachedAnswer]:
+        """
+        Exact tier: returns the cached answer for the normalized query, if fresh.
+        """
+        self._check_data_version()
+        key = normalize_query(query)
+        entry = self._entries.get(key)
+        if entry is not None and self._is_expired(entry):
+            self._remove(key)
+            self.expirations += 1
+            entry = None
+
+        if entry is None:
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits_exact += 1
+        return entry
+
+    async def aembed(self, query: str) -> Optional[np.ndarray]:
+        """
+        Embeds the normalized query for the semantic tier. Returns None when the
+        tier is disabled or the embedding call fails (the request then just misses).
+        """
+        if self.embeddings is None:
+            return None
+        try:
+            vector = np.asarray(await self.embeddings.aembed_query(normalize_query(query)), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Answer cache: could not embed query, semantic tier skipped: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def get_similar(self, query: str, embedding: Optional[np.ndarray]) -> Optional[CachedAnswer]:
+        """
+        Semantic tier: returns the most similar cached answer above the
+        threshold among the queries naming the same entities as `query`.
+        Counts a miss when nothing is found (the exact tier never counts misses,
+        so a request is counted at most once).
+        """
+        self._check_data_version()
+        if embedding is None or self._vectors is None or not self._entries:
+            self.misses += 1
+            return None
+
+        # Free slots, and queries about other seasons/players/teams, are pushed out of the argmax
+        candidates = self._occupied & (self._slot_entities == hash(query_entities(query)))
+        scores = np.where(candidates, self._vectors @ embedding, -1.0)
+        best_slot = int(np.argmax(scores))
+        key = self._slot_keys[best_slot]
+
+        if key is None or not candidates[best_slot] or scores[best_slot] < self.similarity_threshold:
+            self.misses += 1
+            return None
+
+        entry = self._entries[key]
+        if self._is_expired(entry):
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        logger.info(f"Answer cache: semantic hit (similarity={scores[best_slot]:.3f}) on '{key}'")
+        self._entries.move_to_end(key)
+        self.hits_semantic += 1
+        return entry
+
+    # --- Updates ---
+
+    def put(self, query: str, answer: str, mode: str, embedding: Optional[np.ndarray] = None,
+            data_version: Optional[Dict[str, object]] = None):
+        """
+        Caches `answer`, unless it was computed on `data_version` (taken with
+        `data_version()` before computing it) and the data changed since.
+        """
+        self._check_data_version()
+        if data_version is not None and data_version != self._data_version:
+            self.stale_answers += 1
+            return
+        key = normalize_query(query)
+        if key in self._entries:
+            self._remove(key)
+
+        while len(self._entries) >= self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+        entry = CachedAnswer(answer=answer, mode=mode, created_at=time.monotonic())
+        if embedding is not None:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, embedding.shape[0]), dtype=np.float32)
+            slot = self._free_slots.pop()
+            self._vectors[slot] = embedding
+            self._slot_keys[slot] = key
+            self._slot_entities[slot] = hash(query_entities(query))
+            self._occupied[slot] = True
+            entry.slot = slot
+
+        self._entries[key] = entry
+
+    def clear(self):
+        self._entries.clear()
+        self._slot_keys = [None] * self.max_entries
+        self._occupied[:] = False
+        self._free_slots = list(range(self.max_entries - 1, -1, -1))
+        if self._vectors is not None:
+            self._vectors[:] = 0.0
+
+    def stats(self) -> dict:
+        lookups = self.hits_exact + self.hits_semantic + self.misses
+        return {
+            "size": len(self._entries),
+            "hits_exact": self.hits_exact,
+            "hits_semantic": self.hits_semantic,
+            "misses": self.misses,
+            "hit_rate": (self.hits_exact + self.hits_semantic) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_answers": self.stale_answers,
+            "data_version": self._data_version,
+        }
+
+    def data_version(self) -> Dict[str, object]:
+        """
+        Version of the data answers are computed on.
+        """
+        versions: Dict[str, object] = get_data_version()
+        if self.vector_version is not None:
+            versions["vector"] = self.vector_version()
+        return versions
+
+    # --- Internals ---
+
+    def _is_expired(self, entry: CachedAnswer) -> bool:
+        return time.monotonic() - entry.created_at > self.ttl_seconds
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        if entry.slot is not None:
+            self._vectors[entry.slot] = 0.0
+            self._slot_keys[entry.slot] = None
+            self._occupied[entry.slot] = False
+            self._free_slots.append(entry.slot)
+
+    def _check_data_version(self):
+        current = self.data_version()
+        if current != self._data_version:
+            logger.info(f"Answer cache: data version changed {self._data_version} -> {current}, invalidating")
+            self.clear()
+            self._data_version = current
+            self.invalidations += 1
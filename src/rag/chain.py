@@ -1,40 +1,148 @@
+import asyncio
+from typing import List, Optional
+
 from langchain.agents import create_tool_calling_agent, AgentExecutor
 from src.rag.mistral_wrapper import SafeChatMistralAI
+from langchain.tools import StructuredTool, Tool
 from langchain.tools.retriever import create_retriever_tool
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.pydantic_v1 import BaseModel, Field
 from src.core.config import settings
-from src.rag.sql_tool import get_sql_tool
+from src.rag.columnar_stats import OPERATIONS, get_columnar_stats
+from src.rag.query_planner import get_query_planner
+from src.rag.schema_catalog import get_schema_catalog
+from src.rag.sql_tool import get_sql_tool, with_schema_context
 from src.rag.vector_store import get_retriever
 
 import logfire
 
-def get_rag_agent():
+def build_sql_agent_tool(sql_agent, planner=None, catalog=None):
+    """
+    Exposes the SQL agent as the NBA_Stats_DB tool.
+
+    With a `planner`, questions matching a SQL template (top N, player stats,
+    comparisons) are answered directly and the SQL agent's LLM round trips
+    are only spent on the others. With a schema `catalog`, the question is sent
+    to the SQL agent along with the schema of the columns it refers to.
+
+    The tool has a real coroutine: when the main agent runs with `ainvoke`, the
+    nested SQL agent runs with `ainvoke` too (async LLM calls, SQLite queries
+    offloaded to threads by the SQL toolkit), so concurrent requests overlap
+    instead of each holding a worker thread for the whole nested run.
+    """
+    def query_stats_db(question: str, callbacks=None) -> str:
+        if planner is not None:
+            answer = planner.answer(question)
+            if answer is not None:
+                return answer
+        if catalog is not None:
+            question = with_schema_context(question, catalog)
+        return sql_agent.invoke({"input": question}, config={"callbacks": callbacks})["output"]
+
+    async def aquery_stats_db(question: str, callbacks=None) -> str:
+        if planner is not None:
+            answer = await asyncio.to_thread(planner.answer, question)
+            if answer is not None:
+                return answer
+        if catalog is not None:
+            question = await asyncio.to_thread(with_schema_context, question, catalog)
+        # `callbacks` is filled by the Tool with the child run manager, so the
+        # nested LLM calls show up in traces and stage timings
+        result = await sql_agent.ainvoke({"input": question}, config={"callbacks": callbacks})
+        return result["output"]
+
+    return Tool(
+        name="NBA_Stats_DB",
+        func=query_stats_db,
+        coroutine=aquery_stats_db,
+        description="Useful for querying quantitative NBA stats, player averages, game scores, etc. Input should be a natural language question about stats."
+    )
+
+class StatFilter(BaseModel):
+    column: str = Field(description="player_stats column, e.g. 'age', 'gp', 'pts'")
+    op: str = Field(description="one of =, !=, <, <=, >, >=")
+    value: float
+
+
+class AnalyticsQuery(BaseModel):
+    metric: str = Field(description="player_stats column to rank or aggregate: pts, reb, ast, stl, blk, tov, fg_pct, three_p_pct, ft_pct, min, age, gp, plus_minus, ...")
+    operation: str = Field("top", description=f"one of {', '.join(OPERATIONS)}")
+    per_game: bool = Field(False, description="divide season totals by games played")
+    team: Optional[str] = Field(None, description="3-letter team code to restrict to, e.g. 'OKC'")
+    filters: List[StatFilter] = Field(default_factory=list, description="conditions all players must meet, e.g. gp >= 50")
+    group_by_team: bool = Field(False, description="aggregate per team instead of over all players")
+    percentile: Optional[float] = Field(None, description="0-100, for the percentile operation")
+    limit: int = Field(5, description="rows to return for top/bottom/filter and team groupings")
+    season: Optional[str] = Field(None, description="season to query, e.g. '2023-24' (default: the latest)")
+
+
+def build_columnar_stats_tool(columnar):
+    """
+    Exposes the in-memory columnar stats engine as the NBA_Stats_Analytics tool.
+    """
+    def query_analytics(**kwargs) -> str:
+        kwargs["filters"] = [f.dict() if isinstance(f, BaseModel) else f for f in kwargs.get("filters") or []]
+        try:
+            return columnar.query(**kwargs)
+        except ValueError as e:
+            # Returned to the agent so it can fix its arguments
+            return f"Error: {e}"
+
+    async def aquery_analytics(**kwargs) -> str:
+        return await asyncio.to_thread(query_analytics, **kwargs)
+
+    return StructuredTool.from_function(
+        func=query_analytics,
+        coroutine=aquery_analytics,
+        name="NBA_Stats_Analytics",
+        description=(
+            "Fast structured queries on the season player stats: top/bottom N by a stat, players matching filters, "
+            "and sum/mean/median/min/max/std/count/percentile of a stat, overall or per team, for one season (the latest "
+            "by default). Stats are season totals, "
+            "except min and plus_minus (per game) and percentages (0-100). Prefer it over NBA_Stats_DB when the "
+            "question maps to these arguments."
+        ),
+        args_schema=AnalyticsQuery,
+    )
+
+
+def get_rag_agent(llm=None, sql_agent=None, retriever=None, planner=None, catalog=None, columnar=None):
     """
     Creates a Hybrid RAG Agent (SQL + Vector).
+
+    Components that are already built (e.g. by the API component registry)
+    can be passed in; missing ones are created here.
     """
     # Use Mistral Large or Small depending on availability
-    llm = SafeChatMistralAI(
-        model="mistral-large-latest", 
-        temperature=0, 
-        api_key=settings.MISTRAL_API_KEY
-    )
+    if llm is None:
+        llm = SafeChatMistralAI(
+            model="mistral-large-latest", 
+            temperature=0, 
+            api_key=settings.MISTRAL_API_KEY
+        )
     
     tools = []
     
     # 1. SQL Tool
-    sql_agent = get_sql_tool(llm) # Pass mistral llm
+    if catalog is None:
+        catalog = get_schema_catalog()
+    if sql_agent is None:
+        sql_agent = get_sql_tool(llm, catalog) # Pass mistral llm
+    
+    if planner is None and settings.SQL_TEMPLATE_PLANNER_ENABLED:
+        planner = get_query_planner()
     
     # Wrap SQL Agent as a Tool
-    from langchain.tools import Tool
-    sql_tool = Tool(
-        name="NBA_Stats_DB",
-        func=sql_agent.invoke,
-        description="Useful for querying quantitative NBA stats, player averages, game scores, etc. Input should be a natural language question about stats."
-    )
-    tools.append(sql_tool)
+    tools.append(build_sql_agent_tool(sql_agent, planner, catalog))
+
+    if columnar is None and settings.COLUMNAR_STATS_ENABLED:
+        columnar = get_columnar_stats()
+    if columnar is not None:
+        tools.append(build_columnar_stats_tool(columnar))
     
     # 2. Vector Retriever Tool
-    retriever = get_retriever()
+    if retriever is None:
+        retriever = get_retriever()
     if retriever:
         retriever_tool = create_retriever_tool(
             retriever,
@@ -3,9 +3,11 @@ Module de classification des requêtes pour déterminer si une question nécessi
 """
 
 import re
+import asyncio
 import logging
 from typing import Tuple, Optional
 from mistralai.client import MistralClient
+from mistralai.async_client import MistralAsyncClient
 from mistralai.models.chat_completion import ChatMessage
 
 from src.core.config import settings
@@ -27,6 +29,12 @@ class QueryClassifier:
         Initialise le classificateur de requêtes
         """
         self.mistral_client = MistralClient(api_key=MISTRAL_API_KEY) if MISTRAL_API_KEY else None
+        # Client asynchrone pour ne pas bloquer la boucle d'événements de l'API
+        self.async_client = MistralAsyncClient(
+            api_key=MISTRAL_API_KEY,
+            max_concurrent_requests=settings.CLASSIFIER_MAX_CONCURRENCY,
+        ) if MISTRAL_API_KEY else None
+        self.timeout = settings.CLASSIFIER_TIMEOUT_SECONDS
         
         # Mots-clés liés à SportSee/Basketball
         self.commune_keywords = [
@@ -60,6 +68,46 @@ class QueryClassifier:
         Returns:
             Tuple (besoin_rag, confiance, raison)
         """
+        # 1-2. Règles (salutations, mots-clés du domaine)
+        decision = self._classify_with_rules(query)
+        if decision is not None:
+            return decision
+        
+        # 3. Utiliser le LLM pour les cas ambigus
+        if self.mistral_client:
+            return self._classify_with_llm(query)
+        
+        return self._default_decision(query)
+    
+    async def aneeds_rag(self, query: str) -> Tuple[bool, float, str]:
+        """
+        Version asynchrone de needs_rag, utilisée par l'API: l'appel LLM ne bloque
+        pas la boucle d'événements et est borné par un timeout.
+        
+        Args:
+            query: Requête de l'utilisateur
+            
+        Returns:
+            Tuple (besoin_rag, confiance, raison)
+        """
+        decision = self._classify_with_rules(query)
+        if decision is not None:
+            return decision
+        
+        if self.async_client:
+            try:
+                return await asyncio.wait_for(self._aclassify_with_llm(query), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Timeout ({self.timeout}s) de la classification LLM pour '{query}'")
+                # Même repli qu'en cas d'erreur: RAG par précaution
+                return True, 0.5, f"Timeout de classification ({self.timeout}s), utilisation de RAG par précaution"
+        
+        return self._default_decision(query)
+    
+    def _classify_with_rules(self, query: str) -> Optional[Tuple[bool, float, str]]:
+        """
+        Applique les règles rapides. Retourne None si la requête est ambiguë.
+        """
         # Convertir la requête en minuscules pour la comparaison
         query_lower = query.lower()
         
@@ -74,10 +122,12 @@ class QueryClassifier:
             keywords_str = ", ".join(commune_keywords_found)
             return True, 0.9, f"Contient des mots-clés liés au domaine: {keywords_str}"
         
-        # 3. Utiliser le LLM pour les cas ambigus
-        if self.mistral_client:
-            return self._classify_with_llm(query)
-        
+        return None
+    
+    def _default_decision(self, query: str) -> Tuple[bool, float, str]:
+        """
+        Décision sans LLM pour les cas ambigus.
+        """
         # Par défaut, utiliser RAG pour les questions longues (plus de 5 mots)
         words = query.split()
         if len(words) > 5:
@@ -97,7 +147,38 @@ class QueryClassifier:
             Tuple (besoin_rag, confiance, raison)
         """
         try:
-            system_prompt = f"""Vous êtes un classificateur de requêtes pour un assistant virtuel de {COMMUNE_NAME} (Basketball Analytics).
+            response = self.mistral_client.chat(
+                model=CHAT_MODEL,
+                messages=self._build_messages(query),
+                temperature=0.1,  # Température basse pour des réponses cohérentes
+                max_tokens=50  # Réponse courte suffisante
+            )
+            return self._parse_llm_response(query, response)
+                
+        except Exception as e:
+            logger.error(f"Erreur lors de la classification avec LLM: {e}")
+            # En cas d'erreur, utiliser RAG par défaut
+            return True, 0.5, f"Erreur de classification: {str(e)}"
+    
+    async def _aclassify_with_llm(self, query: str) -> Tuple[bool, float, str]:
+        """
+        Équivalent asynchrone de _classify_with_llm (client MistralAsyncClient)
+        """
+        try:
+            response = await self.async_client.chat(
+                model=CHAT_MODEL,
+                messages=self._build_messages(query),
+                temperature=0.1,
+                max_tokens=50
+            )
+            return self._parse_llm_response(query, response)
+                
+        except Exception as e:
+            logger.error(f"Erreur lors de la classification avec LLM: {e}")
+            return True, 0.5, f"Erreur de classification: {str(e)}"
+    
+    def _build_messages(self, query: str):
+        system_prompt = f"""Vous êtes un classificateur de requêtes pour un assistant virtuel de {COMMUNE_NAME} (Basketball Analytics).
 Votre tâche est de déterminer si une question nécessite une recherche dans une base de connaissances (stats, règles).
 
 Répondez UNIQUEMENT par "RAG" ou "DIRECT" suivi d'une brève explication:
@@ -114,36 +195,25 @@ Réponse: RAG - Demande de stats
 Question: "Quelles sont les règles du marché?"
 Réponse: RAG - Demande de règles
 """
-            
-            messages = [
-                ChatMessage(role="system", content=system_prompt),
-                ChatMessage(role="user", content=query)
-            ]
-            
-            response = self.mistral_client.chat(
-                model=CHAT_MODEL,
-                messages=messages,
-                temperature=0.1,  # Température basse pour des réponses cohérentes
-                max_tokens=50  # Réponse courte suffisante
-            )
-            
-            result = response.choices[0].message.content.strip()
-            logger.info(f"Classification LLM pour '{query}': {result}")
-            
-            # Analyser la réponse
-            if result.startswith("RAG"):
-                confidence = 0.85  # Confiance élevée dans la décision du LLM
-                reason = result.replace("RAG - ", "").replace("RAG-", "").replace("RAG:", "").strip()
-                return True, confidence, reason
-            elif result.startswith("DIRECT"):
-                confidence = 0.85
-                reason = result.replace("DIRECT - ", "").replace("DIRECT-", "").replace("DIRECT:", "").strip()
-                return False, confidence, reason
-            else:
-                # Réponse ambiguë, utiliser RAG par défaut
-                return True, 0.6, "Classification ambiguë, utilisation de RAG par précaution"
-                
-        except Exception as e:
-            logger.error(f"Erreur lors de la classification avec LLM: {e}")
-            # En cas d'erreur, utiliser RAG par défaut
-            return True, 0.5, f"Erreur de classification: {str(e)}"
+        
+        return [
+            ChatMessage(role="system", content=system_prompt),
+            ChatMessage(role="user", content=query)
+        ]
+    
+    def _parse_llm_response(self, query: str, response) -> Tuple[bool, float, str]:
+        result = response.choices[0].message.content.strip()
+        logger.info(f"Classification LLM pour '{query}': {result}")
+        
+        # Analyser la réponse
+        if result.startswith("RAG"):
+            confidence = 0.85  # Confiance élevée dans la décision du LLM
+            reason = result.replace("RAG - ", "").replace("RAG-", "").replace("RAG:", "").strip()
+            return True, confidence, reason
+        elif result.startswith("DIRECT"):
+            confidence = 0.85
+            reason = result.replace("DIRECT - ", "").replace("DIRECT-", "").replace("DIRECT:", "").strip()
+            return False, confidence, reason
+        else:
+            # Réponse ambiguë, utiliser RAG par défaut
+            return True, 0.6, "Classification ambiguë, utilisation de RAG par précaution"
@@ -0,0 +1,268 @@
+"""
+In-memory columnar copy of `player_stats` for analytical questions.
+
+The table is small enough to be held as one NumPy array per column. Filter,
+sort, aggregate and percentile queries then run as vectorized operations,
+without SQL parsing or SQLite row materialization. The arrays are loaded
+from the read engine and reloaded whenever the 'sql' data version changes
+(i.e. after `ingest_data`); a load builds a new immutable snapshot and swaps
+it in, so concurrent queries always see one consistent table.
+
+Queries are about one season: the `season` asked for, else the latest loaded
+one. Their results name it.
+
+Exposed to the agent as the NBA_Stats_Analytics tool, next to NBA_Stats_DB.
+"""
+import operator
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.core.logging import logger
+from src.data.aggregates import COUNTING_STATS, PCT_QUALIFIERS, RANKED_STATS
+from src.data.engine import get_read_engine
+from src.data.models import PlayerStatsSQL
+from src.data.versioning import get_data_version
+from src.monitoring.metrics import metrics
+
+COLUMNAR_QUERIES = metrics.counter("columnar_stats_queries_total", "NBA_Stats_Analytics queries by operation.")
+
+TABLE = PlayerStatsSQL.__tablename__
+TEXT_COLUMNS = ("player", "team", "season")
+# Numeric columns except id, as ranked by the leaderboard
+NUMERIC_COLUMNS = tuple(RANKED_STATS)
+
+FILTER_OPERATORS = {
+    "=": operator.eq, "==": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+}
+RANK_OPERATIONS = ("top", "bottom")
+AGGREGATE_OPERATIONS = ("sum", "mean", "median", "min", "max", "std", "count", "percentile")
+OPERATIONS = RANK_OPERATIONS + ("filter",) + AGGREGATE_OPERATIONS
+MAX_ROWS = 50
+
+
+@dataclass(frozen=True)
+class ColumnarSnapshot:
+    columns: Dict[str, np.ndarray]
+    rows: int
+    data_version: Optional[int]
+    # Team codes as integers (index into `teams`), for grouping with bincount
+    teams: np.ndarray
+    team_ids: np.ndarray
+    # Loaded seasons, the latest last ("2024-25" sorts after "2023-24")
+    seasons: List[str]
+
+
+class ColumnarStats:
+    """
+    Vectorized queries over an in-memory snapshot of player_stats.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self._snapshot: Optional[ColumnarSnapshot] = None
+        self.reloads = 0
+
+    # --- Loading ---
+
+    def snapshot(self) -> ColumnarSnapshot:
+        """
+        Current snapshot, (re)loaded if the stats DB data version changed.
+        """
+        version = get_data_version()["sql"]
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.data_version == version:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._snapshot.data_version != version:
+                self._snapshot = self._load(version)
+                self.reloads += 1
+            return self._snapshot
+
+    def _load(self, version: Optional[int]) -> ColumnarSnapshot:
+        names = TEXT_COLUMNS + NUMERIC_COLUMNS
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(text(f"SELECT {', '.join(names)} FROM {TABLE}")).fetchall()
+        except SQLAlchemyError as e:
+            logger.warning(f"Columnar stats could not load {TABLE}: {e}")
+            rows = []
+
+        columns: Dict[str, np.ndarray] = {}
+        for i, name in enumerate(names):
+            values = [row[i] for row in rows]
+            if name in TEXT_COLUMNS:
+                columns[name] = np.array(["" if v is None else v for v in values], dtype=object)
+            else:
+                # NULLs become NaN, which every operation below skips
+                columns[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        teams, team_ids = np.unique(columns["team"], return_inverse=True)
+        seasons = sorted(set(columns["season"]) - {""})
+        logger.info(f"Columnar stats loaded {len(rows)} rows of seasons {seasons} (data version {version})")
+        return ColumnarSnapshot(columns, len(rows), version, teams, team_ids, seasons)
+
+    # --- Queries ---
+
+    def query(
+        self,
+        metric: str,
+        operation: str = "top",
+        per_game: bool = False,
+        team: Optional[str] = None,
+        filters: Optional[List[dict]] = None,
+        group_by_team: bool = False,
+        percentile: Optional[float] = None,
+        limit: int = 5,
+        season: Optional[str] = None,
+    ) -> str:
+        """
+        Runs one query on the rows of `season` (the latest by default) and
+        returns its result as a text table. Raises ValueError on unknown
+        columns, seasons, operations or filter operators.
+        """
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{operation}', expected one of {', '.join(OPERATIONS)}")
+        if operation == "percentile" and (percentile is None or not 0 <= percentile <= 100):
+            raise ValueError("The percentile operation needs a percentile between 0 and 100")
+        snapshot = self.snapshot()
+        values, label = self._metric(snapshot, metric, per_game)
+        season = self._season(snapshot, season)
+        mask = self._mask(snapshot, team, filters or [])
+        if season is not None:
+            mask &= snapshot.columns["season"] == season
+        limit = max(1, min(limit, MAX_ROWS))
+
+        if operation in RANK_OPERATIONS or operation == "filter":
+            if operation != "filter" and metric in PCT_QUALIFIERS:
+                qualifier, minimum = PCT_QUALIFIERS[metric]
+                mask &= snapshot.columns[qualifier] >= minimum
+            result = self._rank(snapshot, values, mask, label, ascending=operation == "bottom", limit=limit)
+        elif group_by_team:
+            result = self._aggregate_by_team(snapshot, values, mask, label, operation, percentile, limit, season)
+        else:
+            result = self._aggregate(values[mask], label, operation, percentile, season)
+
+        COLUMNAR_QUERIES.inc(operation=operation)
+        return result
+
+    def _metric(self, snapshot: ColumnarSnapshot, metric: str, per_game: bool):
+        if metric not in NUMERIC_COLUMNS:
+            raise ValueError(f"Unknown stat '{metric}', expected one of {', '.join(NUMERIC_COLUMNS)}")
+        values = snapshot.columns[metric]
+        if not per_game:
+            return values, metric
+        if metric not in COUNTING_STATS:
+            raise ValueError(f"'{metric}' is not a season total, per_game only applies to {', '.join(COUNTING_STATS)}")
+        gp = snapshot.columns["gp"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(gp > 0, values / gp, np.nan), f"{metric}_per_game"
+
+    def _season(self, snapshot: ColumnarSnapshot, season: Optional[str]) -> Optional[str]:
+        if season is None:
+            # None when the rows have no season
+            return snapshot.seasons[-1] if snapshot.seasons else None
+        if season not in snapshot.seasons:
+            raise ValueError(f"Unknown season '{season}', expected one of {', '.join(snapshot.seasons)}")
+        return season
+
+    def _mask(self, snapshot: ColumnarSnapshot, team: Optional[str], filters: List[dict]) -> np.ndarray:
+        mask = np.ones(snapshot.rows, dtype=bool)
+        if team:
+            found = np.flatnonzero(snapshot.teams == team.upper())
+            mask &= snapshot.team_ids == (found[0] if found.size else -1)
+        for condition in filters:
+            column, op, value = condition.get("column"), condition.get("op"), condition.get("value")
+            if column not in NUMERIC_COLUMNS:
+                raise ValueError(f"Unknown filter column '{column}'")
+            if op not in FILTER_OPERATORS:
+                raise ValueError(f"Unknown filter operator '{op}', expected one of {', '.join(FILTER_OPERATORS)}")
+            mask &= FILTER_OPERATORS[op](snapshot.columns[column], float(value))
+        return mask
+
+    def _rank(self, snapshot: ColumnarSnapshot, values: np.ndarray, mask: np.ndarray, label: str, ascending: bool, limit: int) -> str:
+        candidates = np.flatnonzero(mask & ~np.isnan(values))
+        if candidates.size == 0:
+            return "No rows found."
+        keys = values[candidates] if ascending else -values[candidates]
+        if candidates.size > limit:
+            # Partial selection of the N best, then a sort of those N only
+            keep = np.argpartition(keys, limit - 1)[:limit]
+            candidates, keys = candidates[keep], keys[keep]
+        order = candidates[np.argsort(keys, kind="stable")]
+
+        columns = snapshot.columns
+        lines = [f"player | team | season | gp | {label}"]
+        for i in order:
+            lines.append(f"{columns['player'][i]} | {columns['team'][i]} | {columns['season'][i]} | {_format(columns['gp'][i])} | {_format(values[i])}")
+        return "\n".join(lines)
+
+    def _aggregate(self, values: np.ndarray, label: str, operation: str, percentile: Optional[float], season: Optional[str]) -> str:
+        values = values[~np.isnan(values)]
+        players = f"{values.size} players" + (f" in {season}" if season else "")
+        return f"{_operation_label(operation, percentile)}({label}) over {players}: {_format(_reduce(values, operation, percentile))}"
+
+    def _aggregate_by_team(self, snapshot: ColumnarSnapshot, values: np.ndarray, mask: np.ndarray, label: str,
+                           operation: str, percentile: Optional[float], limit: int, season: Optional[str]) -> str:
+        mask = mask & ~np.isnan(values)
+        teams = snapshot.teams
+        team_ids, values = snapshot.team_ids[mask], values[mask]
+        counts = np.bincount(team_ids, minlength=teams.size)
+        if operation in ("sum", "mean", "count"):
+            sums = np.bincount(team_ids, weights=values, minlength=teams.size)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                results = {"sum": sums, "count": counts.astype(np.float64), "mean": sums / counts}[operation]
+        else:
+            # One sort by (team, value), then each team is a contiguous slice
+            order = np.lexsort((values, team_ids))
+            bounds = np.concatenate(([0], np.cumsum(counts)))
+            sorted_values = values[order]
+            results = np.array([_reduce(sorted_values[bounds[i]:bounds[i + 1]], operation, percentile) for i in range(teams.size)])
+
+        # Teams without any matching player are left out
+        present = np.flatnonzero(counts > 0)
+        order = present[np.argsort(-results[present], kind="stable")][:limit]
+        lines = [f"team | season | {_operation_label(operation, percentile)}({label})"]
+        lines.extend(f"{teams[i]} | {season or ''} | {_format(results[i])}" for i in order)
+        return "\n".join(lines)
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "rows": snapshot.rows if snapshot else 0,
+            "reloads": self.reloads,
+            "data_version": snapshot.data_version if snapshot else None,
+        }
+
+
+def _reduce(values: np.ndarray, operation: str, percentile: Optional[float]) -> float:
+    if operation == "count":
+        return float(values.size)
+    if values.size == 0:
+        return float("nan")
+    if operation == "percentile":
+        return float(np.percentile(values, percentile))
+    return float(getattr(np, operation)(values))
+
+
+def _operation_label(operation: str, percentile: Optional[float]) -> str:
+    return f"p{percentile:g}" if operation == "percentile" else operation
+
+
+def _format(value) -> str:
+    value = float(value)
+    if np.isnan(value):
+        return ""
+    return str(int(value)) if value.is_integer() else f"{value:.1f}"
+
+
+def get_columnar_stats(database_url: Optional[str] = None) -> ColumnarStats:
+    """
+    Creates the columnar stats engine on the stats database.
+    """
+    return ColumnarStats(get_read_engine(database_url))
@@ -0,0 +1,260 @@
+"""
+Cache of query embeddings, in front of the mistral-embed API.
+
+Retrieval and the semantic answer cache embed every query with a network
+call, although most queries were embedded before. Embeddings are cached by
+(model, normalized text) in two tiers:
+- memory: an LRU of EMBEDDING_CACHE_MAX_ENTRIES vectors, per process
+- disk (optional): a SQLite file in WAL mode shared by the workers of a host,
+  so a query embedded by one worker is a hit for the others and survives
+  restarts; bounded to EMBEDDING_CACHE_DISK_MAX_ENTRIES rows
+
+The text is normalized (Unicode NFC, whitespace collapsed) and the
+normalized text is what gets embedded, so a hit returns exactly what a miss
+would have. Vectors are kept as float32 in both tiers. Concurrent misses
+for the same key on the event loop share one API call.
+
+Only queries go through the cache: documents are embedded once per index
+build and are passed through.
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.core.config import settings
+from src.core.logging import logger
+from src.core.singleflight import SingleFlight
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class _DiskTier:
+    """
+    Vectors in a SQLite table, shared between processes.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        return np.frombuffer(row[0], dtype=np.float32) if row else None
+
+    def put(self, key: str, vector: np.ndarray):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+                (key, vector.tobytes(), time.time()),
+            )
+            self._writes += 1
+            # The bound is enforced every 1000 writes of this process
+            if self._writes % 1000 == 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+
+class EmbeddingCache:
+    """
+    Memory LRU + optional disk tier of embeddings. Thread-safe; the async
+    path coalesces concurrent misses on the event loop.
+    """
+
+    def __init__(self, max_entries: int = 10_000, path: Optional[str] = None, disk_max_entries: int = 200_000):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        if path:
+            try:
+                self._disk = _DiskTier(path, disk_max_entries)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Embedding cache: disk tier {path} unavailable, memory only: {e}")
+        self._singleflight = SingleFlight()
+
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.disk_errors = 0
+        self.miss_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    # --- Tiers ---
+
+    def _get_memory(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                self._count_saved()
+            return vector
+
+    def _put_memory(self, key: str, vector: np.ndarray):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _get_disk(self, key: str) -> Optional[np.ndarray]:
+        if self._disk is None:
+            return None
+        try:
+            vector = self._disk.get(key)
+        except sqlite3.Error as e:
+            self._disk_error(e)
+            return None
+        if vector is not None:
+            self._put_memory(key, vector)
+            with self._lock:
+                self.hits_disk += 1
+                self._count_saved()
+        return vector
+
+    def _put_disk(self, key: str, vector: np.ndarray):
+        if self._disk is None:
+            return
+        try:
+            self._disk.put(key, vector)
+        except sqlite3.Error as e:
+            self._disk_error(e)
+
+    def _disk_error(self, e: Exception):
+        with self._lock:
+            self.disk_errors += 1
+        logger.warning(f"Embedding cache: disk tier error, skipped: {e}")
+
+    def _count_saved(self):
+        # A hit saves about one average miss
+        if self.misses:
+            self.saved_seconds += self.miss_seconds / self.misses
+
+    def _store(self, key: str, embedding: List[float], seconds: float) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            self.misses += 1
+            self.miss_seconds += seconds
+        self._put_memory(key, vector)
+        return vector
+
+    # --- Lookups ---
+
+    def get_or_compute(self, model: str, text: str, compute: Callable[[str], List[float]]) -> List[float]:
+        """
+        The embedding of `text` by `model`, from the cache or `compute(normalized text)`.
+        """
+        text = normalize_text(text)
+        key = self.key(model, text)
+        vector = self._get_memory(key)
+        if vector is None:
+            vector = self._get_disk(key)
+        if vector is None:
+            start = time.perf_counter()
+            embedding = compute(text)
+            vector = self._store(key, embedding, time.perf_counter() - start)
+            self._put_disk(key, vector)
+        return vector.tolist()
+
+    async def aget_or_compute(self, model: str, text: str, compute: Callable[[str], Awaitable[List[float]]]) -> List[float]:
+        """
+        `get_or_compute` with an async `compute`; the disk tier is used off the event loop.
+        """
+        text = normalize_text(text)
+        key = self.key(model, text)
+        vector = self._get_memory(key)
+        if vector is None:
+            vector = await self._singleflight.do(key, lambda: self._afetch(key, text, compute))
+        return vector.tolist()
+
+    async def _afetch(self, key: str, text: str, compute) -> np.ndarray:
+        vector = await asyncio.to_thread(self._get_disk, key) if self._disk is not None else None
+        if vector is None:
+            start = time.perf_counter()
+            embedding = await compute(text)
+            vector = self._store(key, embedding, time.perf_counter() - start)
+            if self._disk is not None:
+                await asyncio.to_thread(self._put_disk, key, vector)
+        return vector
+
+    def stats(self) -> dict:
+        hits = self.hits_memory + self.hits_disk
+        lookups = hits + self.misses
+        return {
+            "size": len(self._memory),
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "coalesced": self._singleflight.coalesced,
+            "disk_errors": self.disk_errors,
+            "average_miss_seconds": self.miss_seconds / self.misses if self.misses else 0.0,
+            "saved_seconds": self.saved_seconds,
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain embeddings whose query embeddings go through an `EmbeddingCache`.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model: Optional[str] = None):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model or getattr(embeddings, "model", type(embeddings).__name__)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.cache.get_or_compute(self.model, text, self.embeddings.embed_query)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.cache.aget_or_compute(self.model, text, self.embeddings.aembed_query)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+
+_cache_lock = threading.Lock()
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """
+    The process-wide embedding cache, configured by the EMBEDDING_CACHE_* settings.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache(
+                max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+                path=settings.EMBEDDING_CACHE_PATH,
+                disk_max_entries=settings.EMBEDDING_CACHE_DISK_MAX_ENTRIES,
+            )
+        return _cache
@@ -1,6 +1,6 @@
 from typing import Any, List, Optional
 from langchain_mistralai import ChatMistralAI
-from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
 from langchain_core.outputs import ChatResult
 
 class SafeChatMistralAI(ChatMistralAI):
@@ -22,3 +22,13 @@ class SafeChatMistralAI(ChatMistralAI):
         # For now, just suppressing it to clean logs as requested.
         
         return super()._generate(messages, stop=None, run_manager=run_manager, **kwargs)
+
+    async def _agenerate(
+        self,
+        messages: List[Any],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Same as _generate, for the async path used by `ainvoke` (API requests)
+        return await super()._agenerate(messages, stop=None, run_manager=run_manager, **kwargs)
@@ -0,0 +1,419 @@
+"""
+Deterministic NL-to-SQL planner for the most common stat questions.
+
+Recognizes three intents against the `player_stats` columns:
+- top N: "top 5 players by assists", "qui a le plus de rebonds par match ?"
+- player stats: "stats for Nikola Jokic", "how many threes did Curry make"
+- comparison: "compare Tatum and Brown in points and rebounds"
+
+Matched questions are answered with a parameterized SQL query and no LLM call;
+top N questions read the `leaderboard` view when the ingestion materialized it.
+Answers are about one season: the one named in the question ("2023-24"),
+else the latest loaded one.
+Anything else (or anything ambiguous) returns no plan, and the NBA_Stats_DB
+tool falls back to the LLM SQL agent. That includes questions with words no
+template accounts for: "top 5 scorers under 25", "most points among guards"
+or "off the bench" are not the plain leaderboard.
+"""
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.core.logging import logger
+from src.data.aggregates import COUNTING_STATS, LEADERBOARD_VIEW, PCT_QUALIFIERS
+from src.data.engine import get_read_engine
+from src.data.models import PlayerStatsSQL
+from src.data.versioning import get_data_version
+from src.monitoring.metrics import metrics
+
+PLANNER_QUERIES = metrics.counter("sql_planner_queries_total", "NBA_Stats_DB questions by planner intent (fallback = LLM SQL agent).")
+
+TABLE = PlayerStatsSQL.__tablename__
+
+# Normalized phrases -> column. Longest phrases are matched first, so
+# "rebonds offensifs" wins over "rebonds" and "3 points" over "points".
+# "ppg", "rpg" and "apg" also make the question per game (PER_GAME_PATTERN).
+STAT_ALIASES: Dict[str, List[str]] = {
+    "pts": ["points", "point", "pts", "ppg", "scorers", "scorer", "scoring", "marqueurs", "marqueur"],
+    "reb": ["rebounds", "rebound", "reb", "rpg", "rebonds", "rebond", "rebounders", "rebondeurs"],
+    "oreb": ["offensive rebounds", "oreb", "rebonds offensifs"],
+    "dreb": ["defensive rebounds", "dreb", "rebonds defensifs"],
+    "ast": ["assists", "assist", "ast", "apg", "passes decisives", "passe decisive", "passeurs", "passers"],
+    "stl": ["steals", "steal", "stl", "interceptions"],
+    "blk": ["blocks", "block", "blk", "blocked shots", "shot blockers", "blockers", "contres"],
+    "tov": ["turnovers", "turnover", "tov", "balles perdues", "pertes de balle"],
+    "fgm": ["field goals made", "fgm", "paniers reussis"],
+    "fga": ["field goal attempts", "fga", "tirs tentes"],
+    "fg_pct": ["fg%", "field goal percentage", "shooting percentage", "pourcentage au tir", "adresse"],
+    "three_pm": ["3pm", "threes", "three pointers", "three pointers made", "3 pointers", "3 points", "trois points", "tirs a 3 points"],
+    "three_pa": ["3pa", "three point attempts", "3 point attempts"],
+    "three_p_pct": ["3p%", "3pt%", "three point percentage", "3 point percentage", "pourcentage a 3 points", "pourcentage a trois points"],
+    "ftm": ["ftm", "free throws made", "free throws", "lancers francs"],
+    "fta": ["fta", "free throw attempts"],
+    "ft_pct": ["ft%", "free throw percentage", "pourcentage aux lancers francs", "pourcentage aux lancers"],
+    "min": ["minutes"],
+    "gp": ["games played", "matchs joues", "matches joues"],
+    "w": ["wins", "victoires"],
+    "l": ["losses", "defaites"],
+    "pf": ["fouls", "personal fouls", "fautes"],
+    "plus_minus": ["+/-", "plus minus", "plus/minus"],
+    "age": ["age", "oldest", "plus age", "plus ages"],
+}
+
+# Columns returned when a player question names no specific stat
+DEFAULT_COLUMNS = ["team", "season", "gp", "min", "pts", "reb", "ast", "stl", "blk", "fg_pct", "three_p_pct", "ft_pct", "plus_minus"]
+
+TOP_PATTERN = re.compile(r"\b(top|most|best|leads?|leaders?|leading|highest|meilleurs?|plus de|le plus|la plus|classement|ranking)\b")
+BOTTOM_PATTERN = re.compile(r"\b(fewest|least|lowest|worst|moins de|le moins|la moins|pires?)\b")
+PER_GAME_PATTERN = re.compile(r"\b(per game|par match|moyenne|average|averages|avg|ppg|rpg|apg)\b")
+COMPARE_PATTERN = re.compile(r"\b(compare|comparer|comparaison|comparison|versus|vs|contre|better|meilleur que)\b")
+TEAM_PATTERN = re.compile(r"\b(teams?|equipes?|franchises?)\b")
+# Team-level, per-game-log or multi-season questions need the SQL agent
+UNSUPPORTED_PATTERN = re.compile(r"\b(teams?|equipes?|franchises?|last game|dernier match|tonight|career|carriere|playoffs?|history|historique)\b")
+SINGLE_PATTERN = re.compile(r"\b(who|qui|which player|quel joueur)\b")
+# A standalone 1-2 digit number ("top 10"), not part of a season like "2024-25"
+COUNT_PATTERN = re.compile(r"(?<![\w/-])(\d{1,2})(?![\w/-])")
+# "2023-24", "2023-2024" or "2023/24", as stored: "2023-24"
+SEASON_PATTERN = re.compile(r"(?<![\w/-])((?:19|20)\d{2})[-/]((?:19|20)?\d{2})(?![\w/-])")
+
+# Words that do not change the answer of a template. Any other word left
+# over once the players, stats, season and intent words are matched (a
+# position, an age, a conference, "rookies", "bench", "with", "under"...)
+# qualifies the question in a way the templates would silently drop.
+FILLER_WORDS = {
+    "a", "an", "the", "in", "of", "by", "for", "on", "and", "to", "than", "is", "are", "was", "s",
+    "what", "whats", "how", "many", "much", "has", "have", "had", "did", "does", "do", "i", "me", "you", "can",
+    "show", "give", "list", "tell", "find", "please", "stats", "statistics", "total", "number",
+    "stat", "player", "players", "nba", "league", "this", "season", "made", "make", "score", "scored",
+    "qui", "quel", "quels", "quelle", "quelles", "le", "la", "les", "l", "un", "une", "de", "des", "du", "d",
+    "en", "au", "aux", "par", "pour", "et", "est", "sont", "il", "t", "combien", "joueur", "joueurs",
+    "statistiques", "cette", "saison", "ligue", "marque", "fait",
+}
+
+NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv"}
+DEFAULT_TOP_N = 5
+MAX_TOP_N = 50
+
+
+@dataclass
+class PlannedQuery:
+    intent: str
+    sql: str
+    params: Dict[str, object] = field(default_factory=dict)
+
+
+def _fold(value: str) -> str:
+    """
+    Strips accents and punctuation like `normalize_query`, but keeps the case.
+    """
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    value = re.sub(r"[^\w\s%+/-]", " ", value)
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def _phrase_pattern(phrase: str) -> re.Pattern:
+    return re.compile(r"(?<![\w%+/-])" + re.escape(phrase) + r"(?![\w%+/-])")
+
+
+STAT_PATTERNS: List[Tuple[re.Pattern, str]] = sorted(
+    ((_phrase_pattern(phrase), column) for column, phrases in STAT_ALIASES.items() for phrase in phrases),
+    key=lambda item: -len(item[0].pattern),
+)
+
+
+def find_stats(normalized: str) -> Tuple[List[str], str]:
+    """
+    Returns the stat columns named in a normalized question (in order of
+    appearance) and the question with those phrases blanked out.
+    """
+    found: List[Tuple[int, str]] = []
+    for pattern, column in STAT_PATTERNS:
+        for match in pattern.finditer(normalized):
+            found.append((match.start(), column))
+            normalized = normalized[:match.start()] + " " * (match.end() - match.start()) + normalized[match.end():]
+
+    columns: List[str] = []
+    for _, column in sorted(found):
+        if column not in columns:
+            columns.append(column)
+    return columns, normalized
+
+
+def unknown_words(rest: str) -> List[str]:
+    """
+    Returns the words of `rest` (a question without its players and stats)
+    that are neither filler nor matched by the season, count and intent patterns.
+    """
+    rest = SEASON_PATTERN.sub(" ", rest)
+    # One count ("top 5"); another number is a filter ("under 25", "50 games")
+    rest = COUNT_PATTERN.sub(" ", rest, count=1)
+    for pattern in (TOP_PATTERN, BOTTOM_PATTERN, PER_GAME_PATTERN, COMPARE_PATTERN, SINGLE_PATTERN):
+        rest = pattern.sub(" ", rest)
+    return [word for word in rest.split() if re.search(r"\w", word) and word not in FILLER_WORDS]
+
+
+class QueryPlanner:
+    """
+    Plans and runs template SQL for NBA_Stats_DB questions.
+    """
+
+    def __init__(self, engine, result_cache=None):
+        self.engine = engine
+        # Optional SQLResultCache shared with the SQL agent
+        self.result_cache = result_cache
+        self._full_names: Dict[Tuple[str, ...], str] = {}
+        self._last_names: Dict[str, str] = {}
+        # Whether the ingestion materialized the leaderboard view
+        self._has_leaderboard = False
+        self._seasons: List[str] = []
+        self._data_version = None
+
+    # --- Player index ---
+
+    def _refresh_players(self):
+        """
+        (Re)loads the player names whenever the stats DB data version changed.
+        A failed load keeps the previous index and is retried on the next question.
+        """
+        version = get_data_version()["sql"]
+        if version == self._data_version:
+            return
+
+        try:
+            with self.engine.connect() as conn:
+                names = [row[0] for row in conn.execute(text(f"SELECT DISTINCT player FROM {TABLE}"))]
+                seasons = [row[0] for row in conn.execute(text(f"SELECT DISTINCT season FROM {TABLE} WHERE season IS NOT NULL"))]
+                has_leaderboard = LEADERBOARD_VIEW in inspect(conn).get_view_names()
+        except SQLAlchemyError as e:
+            logger.warning(f"Query planner could not load player names: {e}")
+            return
+
+        full_names: Dict[Tuple[str, ...], str] = {}
+        last_names: Dict[str, List[str]] = {}
+        for name in names:
+            tokens = tuple(_fold(name).lower().split())
+            full_names[tokens] = name
+            core = [t for t in tokens if t not in NAME_SUFFIXES]
+            if len(core) > 1:
+                last_names.setdefault(core[-1], []).append(name)
+
+        self._full_names = full_names
+        self._has_leaderboard = has_leaderboard
+        # "2024-25" sorts after "2023-24": the last one is the latest
+        self._seasons = sorted(seasons)
+        # Ambiguous last names ("Williams") only match with the full name
+        self._last_names = {last: found[0] for last, found in last_names.items() if len(found) == 1}
+        self._data_version = version
+        logger.info(f"Query planner indexed {len(names)} players (data version {version})")
+
+    def _find_players(self, cased_tokens: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Returns the players named in the question and the tokens left over.
+        Full names match in any case; a last name alone must be capitalized
+        so that e.g. "young players" or "smart passes" are not taken for names.
+        """
+        tokens = [t.lower() for t in cased_tokens]
+        longest = max((len(name) for name in self._full_names), default=0)
+        players: List[str] = []
+        remaining: List[str] = []
+        i = 0
+        while i < len(tokens):
+            match = None
+            for size in range(min(longest, len(tokens) - i), 1, -1):
+                name = self._full_names.get(tuple(tokens[i:i + size]))
+                if name is not None:
+                    match = (name, size)
+                    break
+            if match is None and cased_tokens[i][:1].isupper():
+                name = self._last_names.get(tokens[i])
+                if name is not None:
+                    match = (name, 1)
+
+            if match is not None:
+                if match[0] not in players:
+                    players.append(match[0])
+                i += match[1]
+            else:
+                remaining.append(tokens[i])
+                i += 1
+        return players, remaining
+
+    def _find_season(self, folded: str) -> Tuple[bool, Optional[str]]:
+        """
+        Returns whether the question can be answered from one loaded season,
+        and that season: the one it names, else the latest (None when the
+        rows have no season).
+        """
+        found = {f"{start}-{end[-2:]}" for start, end in SEASON_PATTERN.findall(folded)}
+        if not found:
+            return True, self._seasons[-1] if self._seasons else None
+        if len(found) == 1 and found <= set(self._seasons):
+            return True, found.pop()
+        # Several seasons, or one that was not loaded
+        return False, None
+
+    # --- Planning ---
+
+    def plan(self, question: str) -> Optional[PlannedQuery]:
+        """
+        Returns the SQL answering `question`, or None when no template applies.
+        """
+        self._refresh_players()
+
+        folded = _fold(question)
+        if UNSUPPORTED_PATTERN.search(folded.lower()):
+            return None
+        answerable, season = self._find_season(folded)
+        if not answerable:
+            return None
+
+        players, remaining = self._find_players(folded.split())
+        words = " ".join(remaining)
+        stats, rest = find_stats(words)
+        if unknown_words(rest):
+            return None
+
+        if len(players) >= 2:
+            return self._plan_players("compare", players, stats, season)
+        if len(players) == 1:
+            if COMPARE_PATTERN.search(rest) or TOP_PATTERN.search(rest) or BOTTOM_PATTERN.search(rest):
+                # "Is Jokic the best passer?" needs more than one row of context
+                return None
+            return self._plan_players("player_stats", players, stats, season)
+        if stats and (TOP_PATTERN.search(rest) or BOTTOM_PATTERN.search(rest)):
+            return self._plan_top(stats[0], rest, season, per_game=PER_GAME_PATTERN.search(words) is not None)
+        return None
+
+    def _plan_players(self, intent: str, players: List[str], stats: List[str], season: Optional[str]) -> PlannedQuery:
+        if stats:
+            # Games played lets the agent turn the season totals into averages
+            columns = ["player", "team", "season", "gp"] + [c for c in stats if c != "gp"]
+        else:
+            columns = ["player"] + DEFAULT_COLUMNS
+        placeholders = ", ".join(f":player_{i}" for i in range(len(players)))
+        sql = f"SELECT {', '.join(columns)} FROM {TABLE} WHERE player IN ({placeholders})"
+        params: Dict[str, object] = {f"player_{i}": player for i, player in enumerate(players)}
+        if season is not None:
+            sql += " AND season = :season"
+            params["season"] = season
+        return PlannedQuery(intent, sql, params)
+
+    def _plan_top(self, stat: str, rest: str, season: Optional[str], per_game: bool) -> PlannedQuery:
+        ascending = BOTTOM_PATTERN.search(rest) is not None and TOP_PATTERN.search(rest) is None
+        count = COUNT_PATTERN.search(rest)
+        if count is not None:
+            limit = int(count.group(1))
+        elif SINGLE_PATTERN.search(rest):
+            limit = 1
+        else:
+            limit = DEFAULT_TOP_N
+        limit = max(1, min(limit, MAX_TOP_N))
+        per_game = per_game and stat in COUNTING_STATS
+
+        if self._has_leaderboard:
+            return self._plan_leaderboard(stat, per_game, ascending, limit, season)
+
+        where = []
+        params: Dict[str, object] = {"limit": limit}
+        if season is not None:
+            where.append("season = :season")
+            params["season"] = season
+        if per_game:
+            value = f"ROUND(CAST({stat} AS REAL) / gp, 1) AS {stat}_per_game"
+            order_by = f"{stat}_per_game"
+            where.append("gp > 0")
+        else:
+            value = stat
+            order_by = stat
+        if stat in PCT_QUALIFIERS:
+            qualifier, minimum = PCT_QUALIFIERS[stat]
+            where.append(f"{qualifier} >= :min_{qualifier}")
+            params[f"min_{qualifier}"] = minimum
+
+        sql = f"SELECT player, team, season, gp, {value} FROM {TABLE}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order_by} {'ASC' if ascending else 'DESC'} LIMIT :limit"
+        return PlannedQuery("top_n", sql, params)
+
+    def _plan_leaderboard(self, stat: str, per_game: bool, ascending: bool, limit: int, season: Optional[str]) -> PlannedQuery:
+        """
+        Top N as a range of the precomputed ranks of the season (percentage
+        ranks are already restricted to qualified players).
+        """
+        params: Dict[str, object] = {"stat": stat, "limit": limit}
+        where = ""
+        if season is not None:
+            where += " AND season = :season"
+            params["season"] = season
+        if per_game:
+            value = f"value_per_game AS {stat}_per_game"
+            where += " AND per_game_rank IS NOT NULL"
+            rank = "per_game_rank"
+        else:
+            value = f"value AS {stat}"
+            rank = "rank"
+        sql = (
+            f"SELECT player, team, season, gp, {value} FROM {LEADERBOARD_VIEW} WHERE stat = :stat{where} "
+            f"ORDER BY {rank} {'DESC' if ascending else 'ASC'} LIMIT :limit"
+        )
+        return PlannedQuery("top_n", sql, params)
+
+    # --- Execution ---
+
+    def run(self, planned: PlannedQuery) -> str:
+        key = None
+        if self.result_cache is not None:
+            key = self.result_cache.make_key(planned.sql, "planner", tuple(sorted(planned.params.items())))
+            found, output = self.result_cache.get(key)
+            if found:
+                return output
+
+        output = self._execute(planned)
+        if key is not None:
+            self.result_cache.put(key, output)
+        return output
+
+    def _execute(self, planned: PlannedQuery) -> str:
+        with self.engine.connect() as conn:
+            result = conn.execute(text(planned.sql), planned.params)
+            columns = list(result.keys())
+            rows = result.fetchall()
+
+        if not rows:
+            return f"No rows found.\nSQL: {planned.sql}"
+        lines = [" | ".join(columns)]
+        lines.extend(" | ".join("" if value is None else str(value) for value in row) for row in rows)
+        # Keeps the agent aware of the data semantics (season totals, not per game)
+        return "\n".join(lines) + f"\n(Season totals, except min and plus_minus which are per game.)\nSQL: {planned.sql}"
+
+    def answer(self, question: str) -> Optional[str]:
+        """
+        Answers `question` from a template, or returns None to fall back to the SQL agent.
+        """
+        try:
+            planned = self.plan(question)
+            if planned is None:
+                PLANNER_QUERIES.inc(intent="fallback")
+                return None
+            output = self.run(planned)
+        except SQLAlchemyError as e:
+            logger.warning(f"Template SQL failed, falling back to the SQL agent: {e}")
+            PLANNER_QUERIES.inc(intent="fallback")
+            return None
+
+        PLANNER_QUERIES.inc(intent=planned.intent)
+        logger.info(f"Answered with template '{planned.intent}': {planned.sql} {planned.params}")
+        return output
+
+
+def get_query_planner(database_url: Optional[str] = None, result_cache=None) -> QueryPlanner:
+    """
+    Creates the template planner on the stats database.
+    """
+    return QueryPlanner(get_read_engine(database_url), result_cache=result_cache)
@@ -0,0 +1,263 @@
+"""
+Schema catalog of the stats database, for the SQL agent prompts.
+
+The catalog reflects the tables once, keeps their DDL, column descriptions
+and a few sample rows in memory, and rebuilds itself only when the 'sql' data
+version changes (i.e. after an ingestion). It serves two things:
+- `table_info()`: what the sql_db_schema tool returns, without reflecting the
+  database and querying sample rows on every call
+- `prompt_context(question)`: the same information pruned to the columns the
+  question is about, passed to the SQL agent with the question
+
+The `leaderboard` and `team_stats` views materialized by the ingestion are
+listed with player_stats; the tables behind them are not.
+"""
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.core.logging import logger
+from src.data.aggregates import COUNTING_STATS, INTERNAL_TABLES, LEADERBOARD_VIEW, PCT_QUALIFIERS, TEAM_STATS_VIEW
+from src.data.engine import get_read_engine
+from src.data.models import PlayerStatsSQL
+from src.data.versioning import get_data_version
+from src.rag.answer_cache import normalize_query
+from src.rag.query_planner import BOTTOM_PATTERN, TEAM_PATTERN, TOP_PATTERN, find_stats
+
+# Units matter: most stats are season totals, but min and plus_minus are per game
+COLUMN_DESCRIPTIONS: Dict[str, str] = {
+    "player": "player name, accents kept (e.g. 'Nikola Jokić')",
+    "team": "3-letter team code (e.g. 'OKC')",
+    "age": "player age",
+    "gp": "games played",
+    "w": "games won by the player's team in the games he played",
+    "l": "games lost by the player's team in the games he played",
+    "min": "minutes per game",
+    "pts": "total points over the season",
+    "fgm": "total field goals made",
+    "fga": "total field goals attempted",
+    "fg_pct": "field goal percentage (0-100)",
+    "three_pm": "total three pointers made",
+    "three_pa": "total three pointers attempted",
+    "three_p_pct": "three point percentage (0-100)",
+    "ftm": "total free throws made",
+    "fta": "total free throws attempted",
+    "ft_pct": "free throw percentage (0-100)",
+    "oreb": "total offensive rebounds",
+    "dreb": "total defensive rebounds",
+    "reb": "total rebounds",
+    "ast": "total assists",
+    "tov": "total turnovers",
+    "stl": "total steals",
+    "blk": "total blocks",
+    "pf": "total personal fouls",
+    "plus_minus": "average plus/minus per game",
+    "season": "NBA season of the stats (e.g. '2024-25')",
+    "source": "workbook the row was loaded from (ingestion bookkeeping)",
+    "row_hash": "hash of the row's stats (ingestion bookkeeping)",
+    # leaderboard view
+    "stat": "ranked player_stats column (e.g. 'pts', 'ast', 'fg_pct')",
+    "rank": "rank of the player for the stat within the season, 1 = highest value",
+    "value": "the player's value of the stat, as in player_stats",
+    "value_per_game": "value / gp rounded to 0.1, for season-total stats only",
+    "per_game_rank": "rank by value_per_game, 1 = highest (NULL for stats that are not season totals)",
+    # team_stats view
+    "players": "number of players who played for the team",
+    "games": "team games (most games played by one of its players)",
+    "wins": "team wins",
+    "losses": "team losses",
+    "avg_age": "average age of the team's players",
+}
+for _stat in COUNTING_STATS:
+    _label = COLUMN_DESCRIPTIONS[_stat].replace("total ", "").replace(" over the season", "")
+    COLUMN_DESCRIPTIONS[f"{_stat}_total"] = f"season total of {_label} by the team's players"
+    COLUMN_DESCRIPTIONS[f"{_stat}_per_game"] = f"{_label} per team game"
+
+_QUALIFIERS = ", ".join(f"{pct}: {made} >= {minimum}" for pct, (made, minimum) in PCT_QUALIFIERS.items())
+TABLE_DESCRIPTIONS: Dict[str, str] = {
+    LEADERBOARD_VIEW: (
+        "Precomputed player rankings, one row per (stat, season, player), ranked within each season. For the top N "
+        "of a stat: WHERE stat = '<column>' AND season = '<season>' ORDER BY rank LIMIT N (ORDER BY rank DESC for "
+        f"the lowest). Percentage stats only rank qualified players ({_QUALIFIERS})."
+    ),
+    TEAM_STATS_VIEW: (
+        "Precomputed team aggregates, one row per (season, team): <stat>_total sums the players' season totals, "
+        "<stat>_per_game divides it by the team games, percentages are computed from the made/attempted totals."
+    ),
+    PlayerStatsSQL.__tablename__: (
+        "Season totals, one row per (player, team, season); several seasons may be loaded. Filter on season "
+        "(the latest one unless the question names another) or the rows of different seasons get mixed."
+    ),
+}
+
+# Player W/L questions are about the team record in the team_stats view
+TEAM_COLUMNS = {"w": "wins", "l": "losses", "gp": "games", "age": "avg_age"}
+
+# Always part of the pruned context: they identify the rows and give the per-game denominator
+KEY_COLUMNS = ("player", "team", "season", "gp")
+
+
+@dataclass
+class TableSchema:
+    name: str
+    columns: List[tuple]  # (name, SQL type)
+    sample_rows: List[tuple] = field(default_factory=list)
+    kind: str = "TABLE"  # or "VIEW"
+
+    def render(self, columns: Optional[List[str]] = None) -> str:
+        """
+        DDL with column descriptions, followed by the sample rows, like
+        SQLDatabase.get_table_info but restricted to `columns` if given.
+        """
+        indexes = [i for i, (name, _) in enumerate(self.columns) if columns is None or name in columns]
+        lines = []
+        if self.name in TABLE_DESCRIPTIONS:
+            lines.append(f"-- {TABLE_DESCRIPTIONS[self.name]}")
+        lines.append(f"CREATE {self.kind} {self.name} (")
+        for i in indexes:
+            name, sql_type = self.columns[i]
+            description = COLUMN_DESCRIPTIONS.get(name)
+            lines.append(f"\t{name} {sql_type}," + (f" -- {description}" if description else ""))
+        lines.append(")")
+
+        if self.sample_rows:
+            lines.append("")
+            lines.append(f"/*\n{len(self.sample_rows)} rows from {self.name} {self.kind.lower()}:")
+            lines.append("\t".join(self.columns[i][0] for i in indexes))
+            for row in self.sample_rows:
+                lines.append("\t".join(str(row[i]) for i in indexes))
+            lines.append("*/")
+        return "\n".join(lines)
+
+
+class SchemaCatalog:
+    """
+    Cached table DDL, column descriptions and sample rows.
+    """
+
+    def __init__(self, engine, sample_rows: int = 3):
+        self.engine = engine
+        self.sample_rows = sample_rows
+        self._lock = threading.Lock()
+        self._tables: Dict[str, TableSchema] = {}
+        self._rendered: Dict[str, str] = {}
+        self._data_version = None
+        self.rebuilds = 0
+
+    def _refresh(self):
+        version = get_data_version()["sql"]
+        if version == self._data_version:
+            return
+        with self._lock:
+            if version == self._data_version:
+                return
+            self._tables = self._reflect()
+            self._rendered = {name: table.render() for name, table in self._tables.items()}
+            self._data_version = version
+            self.rebuilds += 1
+            logger.info(f"Schema catalog built for tables {sorted(self._tables)} (data version {version})")
+
+    def _reflect(self) -> Dict[str, TableSchema]:
+        tables = {}
+        try:
+            inspector = inspect(self.engine)
+            names = [(name, "TABLE") for name in inspector.get_table_names() if name not in INTERNAL_TABLES]
+            names += [(name, "VIEW") for name in inspector.get_view_names()]
+            with self.engine.connect() as conn:
+                for name, kind in names:
+                    columns = [(column["name"], str(column["type"])) for column in inspector.get_columns(name)]
+                    rows = conn.execute(text(f'SELECT * FROM "{name}" LIMIT :limit'), {"limit": self.sample_rows})
+                    tables[name] = TableSchema(name, columns, [tuple(row) for row in rows], kind)
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not reflect the stats database: {e}")
+        return tables
+
+    def table_names(self) -> List[str]:
+        self._refresh()
+        return sorted(self._tables)
+
+    def table_info(self, table_names: Optional[List[str]] = None) -> str:
+        """
+        Full schema of `table_names` (all tables by default), as served to the sql_db_schema tool.
+        """
+        self._refresh()
+        names = table_names or sorted(self._rendered)
+        missing = set(names) - set(self._rendered)
+        if missing:
+            raise ValueError(f"table_names {missing} not found in database")
+        return "\n\n".join(self._rendered[name] for name in names)
+
+    def relevant_columns(self, question: str) -> List[str]:
+        """
+        Columns of the base tables the question refers to, by stat name/alias
+        or by column name.
+        """
+        normalized = normalize_query(question)
+        columns, _ = find_stats(normalized)
+        words = set(normalized.split())
+        for table in self._tables.values():
+            if table.kind == "VIEW":
+                continue
+            for name, _ in table.columns:
+                if name in words and name not in columns:
+                    columns.append(name)
+        return columns
+
+    def _question_tables(self, normalized: str, relevant: List[str]) -> List[TableSchema]:
+        """
+        Base tables, plus the views that answer this kind of question.
+        """
+        tables = [table for table in self._tables.values() if table.kind == "TABLE"]
+        if LEADERBOARD_VIEW in self._tables and relevant and (TOP_PATTERN.search(normalized) or BOTTOM_PATTERN.search(normalized)):
+            tables.append(self._tables[LEADERBOARD_VIEW])
+        if TEAM_STATS_VIEW in self._tables and TEAM_PATTERN.search(normalized):
+            tables.append(self._tables[TEAM_STATS_VIEW])
+        return tables
+
+    def _pruned_columns(self, table: TableSchema, relevant: List[str]) -> List[str]:
+        names = [name for name, _ in table.columns]
+        if table.name == LEADERBOARD_VIEW:
+            return names
+        if table.name == TEAM_STATS_VIEW:
+            wanted = ["season", "team", "games"]
+            for column in relevant:
+                wanted += [TEAM_COLUMNS.get(column, column), f"{column}_total", f"{column}_per_game"]
+            return [c for c in names if c in wanted]
+        return [c for c in (*KEY_COLUMNS, *relevant) if c in names]
+
+    def prompt_context(self, question: str) -> str:
+        """
+        Schema pruned to the columns relevant to `question` (plus the key
+        columns), with the leaderboard view for top/bottom questions and the
+        team_stats view for team questions. Without any recognizable column,
+        lists every column with its description but no sample rows.
+        """
+        self._refresh()
+        normalized = normalize_query(question)
+        relevant = self.relevant_columns(question)
+        tables = self._question_tables(normalized, relevant)
+        if not relevant:
+            return "\n\n".join(
+                TableSchema(table.name, table.columns, kind=table.kind).render() for table in tables
+            )
+
+        parts = []
+        for table in tables:
+            columns = self._pruned_columns(table, relevant)
+            if table.kind == "TABLE" and not set(columns) & set(relevant):
+                continue
+            parts.append(table.render(columns))
+        return "\n\n".join(parts)
+
+    def stats(self) -> dict:
+        return {"tables": len(self._tables), "rebuilds": self.rebuilds, "data_version": self._data_version}
+
+
+def get_schema_catalog(database_url: Optional[str] = None) -> SchemaCatalog:
+    """
+    Creates the schema catalog of the stats database.
+    """
+    return SchemaCatalog(get_read_engine(database_url))
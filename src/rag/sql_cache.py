@@ -0,0 +1,123 @@
+"""
+Result cache for the read queries of the NBA_Stats_DB tool.
+
+The SQL agent and the template planner often run the very same SELECT (e.g.
+"... ORDER BY pts DESC LIMIT 5"). Results are cached by normalized SQL text
+(plus bound parameters), bounded both in entries and in bytes, and dropped as
+a whole when the 'sql' data version changes, i.e. after every ingestion.
+"""
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from src.core.logging import logger
+from src.data.versioning import get_data_version
+
+# String literals and quoted identifiers are kept verbatim: 'LAL' != 'lal'
+_QUOTED = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+_READ_QUERY = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Lowercases and collapses whitespace outside of quoted strings, and drops
+    trailing semicolons, so formatting differences share a cache key.
+    """
+    parts = _QUOTED.split(sql.strip().rstrip(";").strip())
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r"\s+", " ", parts[i].lower())
+        parts[i] = re.sub(r"\s*([(),=<>])\s*", r"\1", parts[i])
+    return "".join(parts).strip()
+
+
+def is_read_query(sql: str) -> bool:
+    return _READ_QUERY.match(sql) is not None
+
+
+def _size_of(value: Any) -> int:
+    return len(value) if isinstance(value, str) else len(repr(value))
+
+
+class SQLResultCache:
+    """
+    Thread-safe LRU of query results (the SQL toolkit runs queries in worker threads).
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._data_version = get_data_version()["sql"]
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.too_large = 0
+
+    def make_key(self, sql: str, *extra) -> Hashable:
+        return (normalize_sql(sql),) + tuple(extra)
+
+    def get(self, key: Hashable) -> Tuple[bool, Optional[Any]]:
+        """
+        Returns (found, result).
+        """
+        with self._lock:
+            self._check_data_version()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key: Hashable, result: Any):
+        size = _size_of(result)
+        if size > self.max_bytes:
+            self.too_large += 1
+            return
+
+        with self._lock:
+            self._check_data_version()
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            while self._entries and (len(self._entries) >= self.max_entries or self._bytes + size > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+            self._entries[key] = (result, size)
+            self._bytes += size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "too_large": self.too_large,
+            "invalidations": self.invalidations,
+            "data_version": self._data_version,
+        }
+
+    def _check_data_version(self):
+        # Called with the lock held
+        current = get_data_version()["sql"]
+        if current != self._data_version:
+            logger.info(f"SQL result cache: data version changed {self._data_version} -> {current}, invalidating")
+            self._entries.clear()
+            self._bytes = 0
+            self._data_version = current
+            self.invalidations += 1
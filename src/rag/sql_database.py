@@ -0,0 +1,89 @@
+"""
+SQLDatabase used by the LLM SQL agent.
+"""
+from typing import Any, Dict, List, Optional
+
+from langchain_community.utilities import SQLDatabase
+from langchain_community.utilities.sql_database import truncate_word
+from sqlalchemy import text
+
+from src.rag.schema_catalog import SchemaCatalog
+from src.rag.sql_cache import SQLResultCache, is_read_query
+from src.rag.sql_guard import cap_output, cap_rows, check_read_only, query_deadline
+
+
+class StatsSQLDatabase(SQLDatabase):
+    """
+    SQLDatabase whose table info comes from the cached schema catalog instead
+    of reflecting the tables and querying sample rows on every schema call,
+    and whose read queries go through a result cache when one is given.
+
+    Statements are guarded (see sql_guard): read-only check, execution
+    deadline, at most `max_rows` rows fetched and `max_result_chars`
+    characters of result returned.
+    """
+
+    def __init__(
+        self,
+        engine,
+        catalog: SchemaCatalog,
+        result_cache: Optional[SQLResultCache] = None,
+        max_rows: int = 100,
+        timeout_seconds: float = 5.0,
+        max_result_chars: int = 4000,
+        **kwargs,
+    ):
+        # The catalog reflects the tables; the base class does not need to
+        kwargs.setdefault("lazy_table_reflection", True)
+        # Set first: the base constructor lists the usable tables
+        self.catalog = catalog
+        self.result_cache = result_cache
+        self.max_rows = max_rows
+        self.timeout_seconds = timeout_seconds
+        self.max_result_chars = max_result_chars
+        super().__init__(engine, **kwargs)
+
+    def get_usable_table_names(self) -> List[str]:
+        # Includes the leaderboard/team views, not the tables behind them
+        return self.catalog.table_names()
+
+    def get_table_info(self, table_names: Optional[List[str]] = None) -> str:
+        return self.catalog.table_info(table_names)
+
+    def run(self, command, fetch: str = "all", include_columns: bool = False, *, parameters: Optional[Dict[str, Any]] = None, **kwargs):
+        if isinstance(command, str):
+            check_read_only(command)
+        # Cursors cannot be replayed; non-SELECT statements were rejected above
+        if self.result_cache is None or fetch == "cursor" or not isinstance(command, str) or not is_read_query(command):
+            return self._run_guarded(command, fetch, include_columns, parameters=parameters, **kwargs)
+
+        key = self.result_cache.make_key(command, fetch, include_columns, tuple(sorted((parameters or {}).items())))
+        found, result = self.result_cache.get(key)
+        if found:
+            return result
+        # Errors propagate and are not cached
+        result = self._run_guarded(command, fetch, include_columns, parameters=parameters, **kwargs)
+        self.result_cache.put(key, result)
+        return result
+
+    def _run_guarded(self, command, fetch: str, include_columns: bool, *, parameters: Optional[Dict[str, Any]] = None, **kwargs):
+        """
+        SQLDatabase.run with the deadline and the row/character caps.
+        """
+        if fetch == "cursor":
+            return super().run(command, fetch, include_columns, parameters=parameters, **kwargs)
+
+        with self._engine.connect() as connection:
+            with query_deadline(connection, self.timeout_seconds):
+                cursor = connection.execute(text(command) if isinstance(command, str) else command, parameters or {})
+                if not cursor.returns_rows:
+                    return ""
+                # Fetching one row past the cap tells whether rows were left out, without draining the cursor
+                rows = cursor.fetchmany(self.max_rows + 1 if fetch == "all" else 1)
+        rows, truncated = cap_rows([row._asdict() for row in rows], self.max_rows)
+        if not rows:
+            return ""
+
+        rows = [{column: truncate_word(value, length=self._max_string_length) for column, value in row.items()} for row in rows]
+        result = rows if include_columns else [tuple(row.values()) for row in rows]
+        return cap_output(str(result), self.max_result_chars, self.max_rows if truncated else 0)
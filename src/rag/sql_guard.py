@@ -0,0 +1,117 @@
+"""
+Guardrails for the SQL written by the LLM SQL agent.
+
+A generated query can be a cross join without LIMIT: it keeps a worker busy
+and its rows end up in the agent scratchpad. Before and while a statement
+runs on the stats database:
+- statements that are not a single read-only SELECT/WITH are rejected (the
+  read-only engine is the backstop, this gives the agent a clear error)
+- execution is interrupted past a deadline, with SQLite's progress handler
+- at most `max_rows` rows are fetched, the cursor is not drained further
+- the text returned to the LLM is capped in characters
+Each guard increments `sql_guard_events_total` when it fires.
+"""
+import re
+import time
+from contextlib import contextmanager
+
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+
+from src.core.logging import logger
+from src.monitoring.metrics import metrics
+from src.rag.sql_cache import _QUOTED
+
+GUARD_EVENTS = metrics.counter("sql_guard_events_total", "SQL agent statements rejected, interrupted or trimmed, by guard.")
+
+# SQLite VM instructions between two deadline checks
+PROGRESS_HANDLER_STEPS = 1000
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_READ_START = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+_WRITE_KEYWORDS = re.compile(
+    r"\b(insert|update|delete|drop|alter|create|attach|detach|pragma|vacuum|reindex|analyze|begin|commit|rollback|savepoint)\b",
+    re.IGNORECASE,
+)
+
+
+class SQLGuardError(SQLAlchemyError):
+    """
+    A statement refused or stopped by a guard. Subclass of SQLAlchemyError so
+    that the SQL toolkit returns it to the agent as an "Error: ..." observation.
+    """
+
+
+def check_read_only(sql: str):
+    """
+    Raises SQLGuardError unless `sql` is a single SELECT (or WITH ... SELECT) statement.
+    """
+    code = "".join(part for i, part in enumerate(_QUOTED.split(_COMMENTS.sub(" ", sql))) if i % 2 == 0)
+    code = code.strip().rstrip(";")
+    reason = None
+    if not _READ_START.match(code):
+        reason = "only SELECT statements are allowed"
+    elif ";" in code:
+        reason = "only one statement can be run at a time"
+    else:
+        keyword = _WRITE_KEYWORDS.search(code)
+        if keyword:
+            reason = f"{keyword.group(1).upper()} is not allowed, the database is read-only"
+    if reason:
+        GUARD_EVENTS.inc(guard="rejected")
+        logger.warning(f"SQL guard rejected a statement ({reason}): {sql}")
+        raise SQLGuardError(f"Statement rejected: {reason}.")
+
+
+@contextmanager
+def query_deadline(connection, seconds: float):
+    """
+    Interrupts the statements run on `connection` (a SQLAlchemy Connection)
+    within the block once `seconds` have elapsed. No-op on other databases
+    than SQLite or with a non-positive timeout.
+    """
+    dbapi_connection = connection.connection.driver_connection
+    if seconds <= 0 or not hasattr(dbapi_connection, "set_progress_handler"):
+        yield
+        return
+
+    deadline = time.monotonic() + seconds
+    # A non-zero return value makes SQLite abort the statement with "interrupted"
+    dbapi_connection.set_progress_handler(lambda: int(time.monotonic() > deadline), PROGRESS_HANDLER_STEPS)
+    try:
+        yield
+    except OperationalError as e:
+        if time.monotonic() <= deadline:
+            raise
+        GUARD_EVENTS.inc(guard="timeout")
+        logger.warning(f"SQL guard interrupted a statement after {seconds}s: {e.statement}")
+        raise SQLGuardError(
+            f"Query interrupted after {seconds:g}s. Add a LIMIT, filter the rows, or aggregate instead of joining the table with itself."
+        ) from e
+    finally:
+        dbapi_connection.set_progress_handler(None, 0)
+
+
+def cap_rows(rows: list, max_rows: int):
+    """
+    Returns (rows, truncated) for a fetch of up to `max_rows + 1` rows.
+    """
+    if len(rows) <= max_rows:
+        return rows, False
+    GUARD_EVENTS.inc(guard="row_cap")
+    return rows[:max_rows], True
+
+
+def cap_output(output: str, max_chars: int, truncated_rows: int = 0) -> str:
+    """
+    Cuts the text sent to the LLM to `max_chars`, and says why it is incomplete.
+    """
+    notes = []
+    if truncated_rows:
+        notes.append(f"only the first {truncated_rows} rows are shown")
+    if max_chars > 0 and len(output) > max_chars:
+        GUARD_EVENTS.inc(guard="truncated")
+        output = output[:max_chars] + " ..."
+        notes.append(f"output cut to {max_chars} characters")
+    if notes:
+        output += f"\n(Result truncated: {', '.join(notes)}. Use LIMIT, filters or aggregates to get a smaller result.)"
+    return output
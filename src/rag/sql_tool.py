@@ -1,17 +1,37 @@
-from langchain.utilities import SQLDatabase
 from langchain_community.agent_toolkits import create_sql_agent
 from src.rag.mistral_wrapper import SafeChatMistralAI
 from langchain.agents.agent_types import AgentType
 from src.core.config import settings
+from src.data.engine import get_read_engine
+from src.rag.schema_catalog import SchemaCatalog, get_schema_catalog
+from src.rag.sql_database import StatsSQLDatabase
 
 import logfire
 
+# The relevant schema is sent with each question (see `with_schema_context`),
+# so the agent does not have to list the tables and fetch their schema first
+SQL_SUFFIX = """Begin!
+
+Question: {input}
+Thought: The schema of the relevant columns is given with the question. I should write the query from it, and only use sql_db_schema if a column I need is missing.
+{agent_scratchpad}"""
+
+
 @logfire.instrument("create_sql_agent")
-def get_sql_tool(llm=None):
+def get_sql_tool(llm=None, catalog=None, result_cache=None):
     """
     Creates a LangChain SQL Agent tool.
     """
-    db = SQLDatabase.from_uri(settings.DATABASE_URL)
+    # Read-only pool: the agent can only SELECT, and never waits for an ingestion
+    engine = get_read_engine()
+    if catalog is None:
+        catalog = SchemaCatalog(engine)
+    db = StatsSQLDatabase(
+        engine, catalog=catalog, result_cache=result_cache,
+        max_rows=settings.SQL_GUARD_MAX_ROWS,
+        timeout_seconds=settings.SQL_GUARD_TIMEOUT_SECONDS,
+        max_result_chars=settings.SQL_GUARD_MAX_RESULT_CHARS,
+    )
     
     if llm is None:
         llm = SafeChatMistralAI(
@@ -27,15 +47,23 @@ def get_sql_tool(llm=None):
         toolkit=None, # We can pass specific toolkit if needed, but create_sql_agent handles it with db
         db=db,
         agent_type=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        suffix=SQL_SUFFIX,
         verbose=True,
         agent_executor_kwargs={"handle_parsing_errors": True}
     )
     
     return agent_executor
 
+def with_schema_context(question: str, catalog: SchemaCatalog) -> str:
+    """
+    Appends the schema pruned to the question's columns to the SQL agent input.
+    """
+    return f"{question}\n\nRelevant schema:\n{catalog.prompt_context(question)}"
+
 def query_stats(query: str):
     """
     Direct function to query stats, useful for testing.
     """
-    agent = get_sql_tool()
-    return agent.invoke(query)
+    catalog = get_schema_catalog()
+    agent = get_sql_tool(catalog=catalog)
+    return agent.invoke({"input": with_schema_context(query, catalog)})
@@ -1,17 +1,118 @@
+"""
+FAISS index of the text corpus: publication and process-wide serving handle.
+
+Builds (`create_vector_db`, ingest_text_archives.py) never overwrite the
+index being served: each one is saved in its own `vector_db/versions/<id>/`
+directory, then published by atomically replacing the `current.json` manifest
+that names it. Older versions past VECTOR_STORE_KEEP_VERSIONS are removed.
+
+The API process holds one `VectorStoreHandle`: the published index is loaded
+once, and a watcher thread polls the manifest. When a new version is
+published, the watcher loads it in the background and swaps it in with one
+reference assignment, so queries keep using the previous index meanwhile and
+never wait for a load. The serving path never builds an index: without a
+published one, retrieval returns no documents until it is published.
+
+A `vector_db/index.faiss` saved before versioning is served as the "legacy"
+version until a first version is published.
+"""
+import datetime
+import json
 import os
-from typing import List
+import shutil
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
 from langchain_community.document_loaders import PyPDFLoader, DirectoryLoader
-from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_mistralai import MistralAIEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from src.core.config import settings
 from src.core.logging import logger
+from src.data.versioning import bump_data_version
+from src.rag.embedding_cache import CachedEmbeddings, get_embedding_cache
 
 VECTOR_DB_PATH = "vector_db"
+MANIFEST = "current.json"
+VERSIONS_DIR = "versions"
+LEGACY_VERSION = "legacy"
+
+
+def get_embeddings():
+    embeddings = MistralAIEmbeddings(api_key=settings.MISTRAL_API_KEY, model="mistral-embed")
+    if settings.EMBEDDING_CACHE_ENABLED:
+        # Query embeddings served from the process-wide cache
+        return CachedEmbeddings(embeddings, get_embedding_cache())
+    return embeddings
+
+
+# --- Publication ---
+
+def _manifest_path(path: str) -> str:
+    return os.path.join(path, MANIFEST)
+
+
+def read_manifest(path: str = VECTOR_DB_PATH) -> Optional[dict]:
+    """
+    The published version of the index in `path`: {"version", "directory", ...},
+    the legacy layout as version "legacy", None if nothing was published.
+    """
+    try:
+        with open(_manifest_path(path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        if os.path.exists(os.path.join(path, "index.faiss")):
+            return {"version": LEGACY_VERSION, "directory": "."}
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read vector store manifest {_manifest_path(path)}: {e}")
+        return None
+
+
+def publish_vector_store(vectorstore: FAISS, path: str = VECTOR_DB_PATH) -> str:
+    """
+    Saves `vectorstore` as a new version of the index in `path` and makes it
+    the published one. Returns the version.
+    """
+    # Sorted by publication time
+    version = f"{datetime.datetime.now(datetime.timezone.utc):%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:6]}"
+    directory = os.path.join(VERSIONS_DIR, version)
+    tmp_directory = os.path.join(path, f"{directory}.tmp")
+    vectorstore.save_local(tmp_directory)
+    # Complete before the manifest names it
+    os.rename(tmp_directory, os.path.join(path, directory))
+
+    manifest = {
+        "version": version,
+        "directory": directory,
+        "documents": vectorstore.index.ntotal,
+        "published_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+    tmp_manifest = f"{_manifest_path(path)}.tmp"
+    with open(tmp_manifest, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    # Atomic: watchers see the previous manifest or this one
+    os.replace(tmp_manifest, _manifest_path(path))
+    logger.info(f"Vector store version {version} ({manifest['documents']} vectors) published in {path}")
+
+    versions = sorted(name for name in os.listdir(os.path.join(path, VERSIONS_DIR)) if not name.endswith(".tmp"))
+    versions.remove(version)
+    for old in versions[:len(versions) - max(0, settings.VECTOR_STORE_KEEP_VERSIONS - 1)]:
+        shutil.rmtree(os.path.join(path, VERSIONS_DIR, old), ignore_errors=True)
+    # For processes without a handle: the API's answer cache follows the
+    # version its handle has loaded (`VectorStoreHandle.version`) instead
+    bump_data_version("vector")
+    return version
+
 
 def create_vector_db(data_path: str = "inputs"):
     """
-    Ingests PDF documents from data_path and creates a FAISS index.
+    Ingests PDF documents from data_path, creates a FAISS index and publishes it.
     """
     if not os.path.exists(data_path):
         logger.warning(f"Data path {data_path} does not exist.")
@@ -20,7 +121,7 @@ def create_vector_db(data_path: str = "inputs"):
     logger.info(f"Loading documents from {data_path}...")
     loader = DirectoryLoader(data_path, glob="*.pdf", loader_cls=PyPDFLoader)
     documents = loader.load()
-    
+
     if not documents:
         logger.warning("No documents found.")
         return None
@@ -31,35 +132,150 @@ def create_vector_db(data_path: str = "inputs"):
         chunk_overlap=200
     )
     texts = text_splitter.split_documents(documents)
-    
-    logger.info(f"Created {len(texts)} chunks. Embedding and indexing...")
-from langchain_mistralai import MistralAIEmbeddings
-
-# ... (imports)
 
-def create_vector_db(data_path: str = "inputs"):
-    # ... (code)
     logger.info(f"Created {len(texts)} chunks. Embedding and indexing...")
-    embeddings = MistralAIEmbeddings(api_key=settings.MISTRAL_API_KEY, model="mistral-embed")
-    vectorstore = FAISS.from_documents(texts, embeddings)
-    
-    vectorstore.save_local(VECTOR_DB_PATH)
-    logger.info(f"Vector store saved to {VECTOR_DB_PATH}")
+    vectorstore = FAISS.from_documents(texts, get_embeddings())
+    publish_vector_store(vectorstore)
     return vectorstore
 
-def get_vector_store():
+
+# --- Serving ---
+
+@dataclass(frozen=True)
+class LoadedIndex:
+    store: FAISS
+    version: str
+
+
+class VectorStoreHandle:
     """
-    Loads the FAISS index from disk.
+    The published index of `path`, reloaded in the background when a new
+    version is published.
     """
-    embeddings = MistralAIEmbeddings(api_key=settings.MISTRAL_API_KEY, model="mistral-embed")
-    if os.path.exists(VECTOR_DB_PATH):
-        return FAISS.load_local(VECTOR_DB_PATH, embeddings, allow_dangerous_deserialization=True)
-    else:
-        logger.warning("Vector store not found. Creating new one...")
-        return create_vector_db()
-
-def get_retriever():
-    vectorstore = get_vector_store()
-    if vectorstore:
-        return vectorstore.as_retriever(search_kwargs={"k": 4})
-    return None
+
+    def __init__(self, path: str, embeddings, poll_seconds: float = 0):
+        self.path = path
+        self.embeddings = embeddings
+        self.poll_seconds = poll_seconds
+        self._loaded: Optional[LoadedIndex] = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.reloads = 0
+        self.reload_failures = 0
+        self._failed_version: Optional[str] = None  # Not retried until another version is published
+
+    def current(self) -> Optional[FAISS]:
+        """
+        The index to query: never blocks, None before a version is published.
+        """
+        loaded = self._loaded
+        return loaded.store if loaded else None
+
+    @property
+    def version(self) -> Optional[str]:
+        loaded = self._loaded
+        return loaded.version if loaded else None
+
+    def refresh(self) -> bool:
+        """
+        Loads the published version if it is not the current one, then swaps
+        it in. Returns whether the index changed. A failed load keeps the
+        current index.
+        """
+        with self._reload_lock:
+            manifest = read_manifest(self.path)
+            if manifest is None or manifest["version"] in (self.version, self._failed_version):
+                return False
+            directory = os.path.join(self.path, manifest["directory"])
+            try:
+                store = FAISS.load_local(directory, self.embeddings, allow_dangerous_deserialization=True)
+            except Exception as e:
+                self.reload_failures += 1
+                self._failed_version = manifest["version"]
+                logger.error(f"Failed to load vector store version {manifest['version']}: {e}")
+                return False
+            previous = self.version
+            self._loaded = LoadedIndex(store, manifest["version"])
+            self.reloads += 1
+            logger.info(f"Vector store version {manifest['version']} loaded ({store.index.ntotal} vectors, previous: {previous})")
+            return True
+
+    def start_watching(self):
+        if self._watcher is None and self.poll_seconds > 0:
+            self._watcher = threading.Thread(target=self._watch, name="vector-store-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Vector store watcher failed to check for a new version")
+
+    def stats(self) -> dict:
+        store = self.current()
+        return {
+            "loaded": int(store is not None),
+            "vectors": store.index.ntotal if store is not None else 0,
+            "reloads": self.reloads,
+            "reload_failures": self.reload_failures,
+        }
+
+
+class HotSwapRetriever(BaseRetriever):
+    """
+    Similarity search on the current index of a handle, whichever it is at
+    the time of the query.
+    """
+
+    handle: Any
+    search_kwargs: Dict[str, Any] = {"k": 4}
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        store = self.handle.current()
+        if store is None:
+            return []
+        return store.similarity_search(query, **self.search_kwargs)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        store = self.handle.current()
+        if store is None:
+            return []
+        return await store.asimilarity_search(query, **self.search_kwargs)
+
+
+_handles_lock = threading.Lock()
+_handles: Dict[str, VectorStoreHandle] = {}
+
+
+def get_vector_store_handle(embeddings=None, path: str = VECTOR_DB_PATH) -> VectorStoreHandle:
+    """
+    The process-wide handle of the index in `path`, loaded and watched from its first use.
+    """
+    with _handles_lock:
+        handle = _handles.get(path)
+        if handle is None:
+            handle = VectorStoreHandle(path, embeddings or get_embeddings(), settings.VECTOR_STORE_POLL_SECONDS)
+            if not handle.refresh():
+                logger.warning(f"No vector store published in {path}, build one with build_vector_db.py")
+            handle.start_watching()
+            _handles[path] = handle
+        return handle
+
+
+def get_vector_store(embeddings=None) -> Optional[FAISS]:
+    """
+    The currently published FAISS index, None if there is none.
+    """
+    return get_vector_store_handle(embeddings).current()
+
+
+def get_retriever(embeddings=None):
+    return HotSwapRetriever(handle=get_vector_store_handle(embeddings), search_kwargs={"k": 4})
@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import insert
+
+from src.core.config import settings
+from src.data.engine import get_write_engine
+from src.data.models import Base, PlayerStatsSQL
+
+
+@pytest.fixture
+def stats_db(tmp_path, monkeypatch):
+    """
+    Creates a stats database in `tmp_path` with the given player_stats rows,
+    and returns its (write) engine. Data versions are isolated in `tmp_path` too.
+    """
+    monkeypatch.setattr(settings, "DATA_VERSION_FILE", str(tmp_path / "data_version.json"))
+
+    def create(rows):
+        engine = get_write_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(insert(PlayerStatsSQL), rows)
+        return engine
+
+    return create
+
+
+@pytest.fixture
+def ready_components(monkeypatch):
+    """
+    The API components marked ready, with a new QueryClassifier and a fake
+    chat model that answers "Hi there" once.
+    """
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage
+    from src.api.components import components
+    from src.rag.classifier import QueryClassifier
+
+    monkeypatch.setattr(components, "classifier", QueryClassifier())
+    monkeypatch.setattr(components, "chat_llm", GenericFakeChatModel(messages=iter([AIMessage(content="Hi there")])))
+    monkeypatch.setattr(components, "status", "ready")
+    return components
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from src.api.admission import AdmissionController, AdmissionRejected, Lane
+
+
+def _controller(queue_timeout=5.0):
+    return AdmissionController({
+        "RAG": Lane("RAG", max_concurrent=1, max_queue=1, queue_timeout=queue_timeout, initial_service_time=4.0),
+        "CHAT": Lane("CHAT", max_concurrent=1, max_queue=1, queue_timeout=queue_timeout, initial_service_time=1.0),
+    })
+
+
+async def _hold(controller, mode, release: asyncio.Event):
+    async with controller.slot(mode):
+        await release.wait()
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def scenario():
+        controller = _controller()
+        release = asyncio.Event()
+        running = asyncio.create_task(_hold(controller, "RAG", release))
+        queued = asyncio.create_task(_hold(controller, "RAG", release))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with controller.slot("RAG"):
+                pass
+
+        # The CHAT lane is unaffected by the saturated RAG lane
+        async with controller.slot("CHAT"):
+            pass
+
+        release.set()
+        await asyncio.gather(running, queued)
+        return rejected.value, controller.stats()
+
+    rejection, stats = asyncio.run(scenario())
+    assert rejection.status_code == 429
+    # One request queued ahead + this one, 1 slot, 4s per request
+    assert rejection.retry_after == 8
+    assert stats["RAG"]["rejected_queue_full"] == 1
+    assert stats["CHAT"]["admitted"] == 1
+
+
+def test_queue_wait_timeout_returns_503():
+    async def scenario():
+        controller = _controller(queue_timeout=0.05)
+        release = asyncio.Event()
+        running = asyncio.create_task(_hold(controller, "RAG", release))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with controller.slot("RAG"):
+                pass
+
+        release.set()
+        await running
+        return rejected.value
+
+    assert asyncio.run(scenario()).status_code == 503
@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import insert, text
+
+from src.data.aggregates import materialize_aggregates
+from src.data.models import PlayerStatsSQL
+
+PLAYERS = [
+    {"player": "Shai Gilgeous-Alexander", "team": "OKC", "season": "2024-25", "age": 26, "gp": 76, "w": 64, "l": 12, "pts": 2485.0, "fgm": 860.0, "fga": 1656.0, "fg_pct": 51.9},
+    {"player": "Jalen Williams", "team": "OKC", "season": "2024-25", "age": 24, "gp": 69, "w": 57, "l": 12, "pts": 1490.0, "fgm": 571.0, "fga": 1180.0, "fg_pct": 48.4},
+    {"player": "Nikola Jokić", "team": "DEN", "season": "2024-25", "age": 30, "gp": 70, "w": 45, "l": 25, "pts": 2072.0, "fgm": 803.0, "fga": 1394.0, "fg_pct": 57.6},
+    {"player": "Grant Williams", "team": "CHA", "season": "2024-25", "age": 26, "gp": 16, "w": 4, "l": 12, "pts": 150.0, "fgm": 50.0, "fga": 71.0, "fg_pct": 70.0},
+    {"player": "Two-Way Player", "team": "CHA", "season": "2024-25", "age": 22, "gp": 0, "w": 0, "l": 0, "pts": 0.0, "fgm": 0.0, "fga": 0.0, "fg_pct": 0.0},
+]
+
+
+@pytest.fixture
+def engine(stats_db):
+    engine = stats_db(PLAYERS)
+    with engine.begin() as conn:
+        materialize_aggregates(conn)
+    return engine
+
+
+def test_leaderboard_ranks_every_numeric_stat(engine):
+    with engine.connect() as conn:
+        top = conn.execute(text("SELECT rank, player, value FROM leaderboard WHERE stat = 'pts' ORDER BY rank")).fetchall()
+        per_game = conn.execute(text(
+            "SELECT player, value_per_game FROM leaderboard WHERE stat = 'pts' AND per_game_rank IS NOT NULL ORDER BY per_game_rank"
+        )).fetchall()
+        stats = {row[0] for row in conn.execute(text("SELECT DISTINCT stat FROM leaderboard"))}
+
+    assert [row[1] for row in top[:3]] == ["Shai Gilgeous-Alexander", "Nikola Jokić", "Jalen Williams"]
+    assert [row[0] for row in top] == [1, 2, 3, 4, 5]
+    assert per_game[0] == ("Shai Gilgeous-Alexander", 32.7)
+    # No per-game value without games played
+    assert "Two-Way Player" not in [row[0] for row in per_game]
+    assert {"pts", "age", "gp", "min", "plus_minus", "fg_pct"} <= stats and "id" not in stats
+
+
+def test_percentage_leaderboards_only_rank_qualified_players(engine):
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT player FROM leaderboard WHERE stat = 'fg_pct' ORDER BY rank")).fetchall()
+
+    # Grant Williams has the best FG% but too few made shots to qualify
+    assert [row[0] for row in rows] == ["Nikola Jokić", "Shai Gilgeous-Alexander", "Jalen Williams"]
+
+
+def test_team_stats_totals_rates_and_percentages(engine):
+    with engine.connect() as conn:
+        okc = conn.execute(text("SELECT * FROM team_stats WHERE team = 'OKC'")).mappings().one()
+
+    assert okc["players"] == 2
+    assert (okc["games"], okc["wins"], okc["losses"]) == (76, 64, 12)
+    assert okc["pts_total"] == 3975.0
+    assert okc["pts_per_game"] == 52.3
+    assert okc["fg_pct"] == round(100 * (860 + 571) / (1656 + 1180), 1)
+
+
+def test_rematerializing_replaces_previous_aggregates(engine):
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM player_stats WHERE team = 'OKC'"))
+        materialize_aggregates(conn)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM team_stats")).scalar() == 2
+        assert conn.execute(text("SELECT player FROM leaderboard WHERE stat = 'pts' AND rank = 1")).scalar() == "Nikola Jokić"
+
+
+def test_ranks_and_team_totals_are_per_season(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(PlayerStatsSQL), [
+            {"player": "Shai Gilgeous-Alexander", "team": "OKC", "season": "2023-24", "age": 25, "gp": 75, "w": 55, "l": 20, "pts": 2254.0, "fgm": 796.0, "fga": 1487.0},
+            {"player": "Luka Dončić", "team": "DAL", "season": "2023-24", "age": 24, "gp": 70, "w": 46, "l": 24, "pts": 2370.0, "fgm": 804.0, "fga": 1652.0},
+        ])
+        materialize_aggregates(conn)
+
+    with engine.connect() as conn:
+        ranks = conn.execute(text(
+            "SELECT season, rank, player FROM leaderboard WHERE stat = 'pts' AND rank <= 2 ORDER BY season, rank"
+        )).fetchall()
+        okc = conn.execute(text("SELECT season, players, games, pts_total, pts_per_game FROM team_stats WHERE team = 'OKC' ORDER BY season")).fetchall()
+
+    # Each player appears once per season, ranked against that season only
+    assert ranks == [
+        ("2023-24", 1, "Luka Dončić"), ("2023-24", 2, "Shai Gilgeous-Alexander"),
+        ("2024-25", 1, "Shai Gilgeous-Alexander"), ("2024-25", 2, "Nikola Jokić"),
+    ]
+    assert okc == [("2023-24", 1, 75, 2254.0, 30.1), ("2024-25", 2, 76, 3975.0, 52.3)]
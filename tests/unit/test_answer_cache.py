@@ -0,0 +1,123 @@
+import asyncio
+import time
+
+import pytest
+
+from src.core.config import settings
+from src.data.versioning import bump_data_version
+from src.rag.answer_cache import AnswerCache, normalize_query, query_entities
+
+
+class FakeEmbeddings:
+    """Maps known texts to fixed vectors, anything else to an orthogonal one."""
+
+    VECTORS = {
+        "who leads the league in ppg": [1.0, 0.0, 0.0],
+        "highest points per game": [0.95, 0.05, 0.0],
+        "best rebounder": [0.0, 1.0, 0.0],
+    }
+
+    async def aembed_query(self, text):
+        return self.VECTORS.get(text, [0.0, 0.0, 1.0])
+
+
+@pytest.fixture(autouse=True)
+def isolated_data_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_VERSION_FILE", str(tmp_path / "data_version.json"))
+
+
+def test_normalize_query():
+    assert normalize_query("  Who leads the League in PPG?? ") == "who leads the league in ppg"
+    assert normalize_query("Nikola Jokić FG%") == "nikola jokic fg%"
+
+
+def test_query_entities():
+    assert query_entities("Points leader in 2023-2024") == {"2023-24"}
+    assert query_entities("How many points did Nikola Jokić score in his last 10 games?") == {"nikola", "jokic", "10"}
+    assert query_entities("Top scorer of OKC by PPG") == {"okc"}
+    assert query_entities("Who leads the league in PPG?") == frozenset()
+
+
+def test_semantic_hits_need_the_same_entities():
+    cache = AnswerCache(embeddings=FakeEmbeddings(), similarity_threshold=0.9)
+    # FakeEmbeddings gives all of these the same vector
+    for query, answer in [("Points leader in 2023-24", "Luka"), ("How many points did Jokic score?", "2072")]:
+        cache.put(query, answer, "RAG", asyncio.run(cache.aembed(query)))
+
+    def similar(query):
+        return cache.get_similar(query, asyncio.run(cache.aembed(query)))
+
+    assert similar("points leader 2023/24?").answer == "Luka"
+    assert similar("Points leader in 2024-25") is None
+    assert similar("Points leader of DEN in 2023-24") is None
+    assert similar("how many points has Jokic scored").answer == "2072"
+    assert similar("How many points did Curry score?") is None
+
+
+def test_exact_and_semantic_tiers():
+    cache = AnswerCache(embeddings=FakeEmbeddings(), similarity_threshold=0.9)
+    embedding = asyncio.run(cache.aembed("Who leads the league in PPG?"))
+    cache.put("Who leads the league in PPG?", "SGA", "RAG", embedding)
+
+    assert cache.get("who leads the league in ppg").answer == "SGA"
+
+    similar = asyncio.run(cache.aembed("highest points per game?"))
+    assert cache.get_similar("highest points per game?", similar).answer == "SGA"
+
+    unrelated = asyncio.run(cache.aembed("best rebounder"))
+    assert cache.get_similar("best rebounder", unrelated) is None
+
+    stats = cache.stats()
+    assert (stats["hits_exact"], stats["hits_semantic"], stats["misses"]) == (1, 1, 1)
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = AnswerCache(max_entries=2, ttl_seconds=10)
+    cache.put("q1", "a1", "RAG")
+    cache.put("q2", "a2", "RAG")
+    cache.get("q1")  # q1 becomes most recently used
+    cache.put("q3", "a3", "RAG")
+
+    assert cache.get("q2") is None
+    assert cache.get("q1") is not None
+    assert cache.stats()["evictions"] == 1
+
+    now = time.monotonic()
+    monkeypatch.setattr("src.rag.answer_cache.time.monotonic", lambda: now + 60)
+    assert cache.get("q3") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_data_version_bump_invalidates():
+    cache = AnswerCache()
+    cache.put("q1", "a1", "RAG")
+    bump_data_version("sql")
+
+    assert cache.get("q1") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_vector_invalidation_follows_the_served_index():
+    served = {"version": "v1"}
+    cache = AnswerCache(vector_version=lambda: served["version"])
+    cache.put("q1", "a1", "RAG")
+
+    # Published, but not swapped in yet: answers still come from v1
+    bump_data_version("vector")
+    assert cache.get("q1").answer == "a1"
+
+    served["version"] = "v2"
+    assert cache.get("q1") is None and cache.stats()["invalidations"] == 1
+
+
+def test_answers_computed_across_a_data_change_are_not_stored():
+    served = {"version": "v1"}
+    cache = AnswerCache(vector_version=lambda: served["version"])
+    data_version = cache.data_version()
+    served["version"] = "v2"  # Swapped in while the agent ran on v1
+
+    cache.put("q1", "a1", "RAG", data_version=data_version)
+    assert cache.get("q1") is None and cache.stats()["stale_answers"] == 1
+
+    cache.put("q1", "a2", "RAG", data_version=cache.data_version())
+    assert cache.get("q1").answer == "a2"
@@ -11,3 +11,45 @@ def test_health_check():
 def test_docs_endpoint():
     response = client.get("/docs")
     assert response.status_code == 200
+
+def test_readiness_before_warmup():
+    # TestClient is not used as a context manager, so the startup warmup did not run
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "pending"
+
+def test_chat_stream_emits_classification_then_tokens(ready_components):
+    response = client.post("/api/v1/chat/stream", json={"query": "hello"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [line.split(": ", 1)[1] for line in response.text.splitlines() if line.startswith("event: ")]
+    assert events[0] == "classification"
+    assert "token" in events
+    assert events[-1] == "done"
+
+def test_chat_batch_reports_per_item_errors(ready_components):
+    # Only one canned answer (ready_components): the second item fails when the fake model runs dry
+    response = client.post("/api/v1/chat/batch", json={
+        "queries": [{"query": "hello"}, {"query": "thanks"}],
+        "max_concurrency": 1000,
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["results"]) == 2
+    assert body["succeeded"] == 1
+    assert body["failed"] == 1
+    assert body["max_concurrency"] <= 8
+    assert [r["mode"] for r in body["results"]].count("ERROR") == 1
+
+def test_chat_timings_and_metrics(ready_components):
+    response = client.post("/api/v1/chat", json={"query": "hello", "include_timings": True})
+    assert response.status_code == 200
+    stages = [s["stage"] for s in response.json()["timings"]["stages"]]
+    assert stages == ["classification", "llm"]
+
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert 'sportsee_request_duration_seconds_count{cache="none",mode="CHAT"}' in metrics.text
+    assert 'sportsee_stage_duration_seconds_bucket{name="QueryClassifier",stage="classification",le="+Inf"}' in metrics.text
+    assert 'sportsee_admission_admitted{key="CHAT"}' in metrics.text
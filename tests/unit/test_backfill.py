@@ -0,0 +1,114 @@
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import text
+
+from src.core.config import settings
+from src.data import ingestion
+from src.data.backfill import ingest_directory, season_of, source_of
+from src.data.engine import get_write_engine
+from tests.unit.test_ingestion import ROW
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'stats.db'}")
+    monkeypatch.setattr(settings, "DATA_VERSION_FILE", str(tmp_path / "data_version.json"))
+    monkeypatch.setattr(settings, "SOURCE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "SOURCE_CACHE_PART_ROWS", 2)
+    monkeypatch.setattr(settings, "INGESTION_BATCH_SIZE", 1)
+
+
+def write_workbook(path, players, bad_age=False, renamed=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["NBA stats"])
+    sheet.append([(renamed or {}).get(name, name) for name in ROW])
+    for i, player in enumerate(players):
+        sheet.append(list({**ROW, "Player": player, "Age": "n/a" if bad_age and i == 0 else ROW["Age"]}.values()))
+    workbook.save(path)
+
+
+def test_season_comes_from_the_source_path():
+    assert season_of("regular_NBA_2022-23.xlsx") == "2022-23"
+    assert season_of("2019_2020/DEN.xlsx") == "2019-20"
+    assert season_of("regular_NBA.xlsx") == settings.INGESTION_SEASON
+    assert source_of("data/raw/2023-24/DEN.xlsx", "data/raw") == "2023-24/DEN.xlsx"
+    assert source_of("/tmp/DEN.xlsx", "data/raw") == "/tmp/DEN.xlsx"
+
+
+def test_workbooks_of_a_directory_are_loaded_with_their_season(tmp_path):
+    raw = tmp_path / "raw"
+    write_workbook(raw / "regular_NBA_2022-23.xlsx", ["A", "B", "C"], bad_age=True)
+    write_workbook(raw / "2023-24" / "DEN.xlsx", ["A", "B", "C", "D", "E"])
+    (raw / "broken.xlsx").write_text("not a workbook")
+
+    reports = ingest_directory(str(raw), workers=2)
+
+    by_source = {report.source: report for report in reports}
+    assert by_source["broken.xlsx"].failure.startswith("parse:")
+    assert by_source["regular_NBA_2022-23.xlsx"].result.inserted == 2
+    assert by_source["regular_NBA_2022-23.xlsx"].result.errors[0].startswith("Row 0:")
+    assert by_source["2023-24/DEN.xlsx"].rows == 5
+    with get_write_engine().connect() as conn:
+        rows = conn.execute(text("SELECT season, source, COUNT(*) FROM player_stats GROUP BY 1, 2 ORDER BY 1")).fetchall()
+    assert rows == [("2022-23", "regular_NBA_2022-23.xlsx", 2), ("2023-24", "2023-24/DEN.xlsx", 5)]
+
+    again = ingest_directory(str(raw), workers=2)
+    assert [report.result.skipped for report in again] == [True, False, True]
+
+
+def test_explicit_paths_keep_their_directory_source_and_season(tmp_path):
+    raw = tmp_path / "raw"
+    write_workbook(raw / "2023-24" / "DEN.xlsx", ["A", "B"])
+    write_workbook(raw / "2024-25" / "DEN.xlsx", ["A", "B", "C"])
+    ingest_directory(str(raw))
+
+    # Same file names in two seasons: neither load deletes the other's rows
+    reports = ingest_directory(str(raw), paths=[str(raw / "2023-24" / "DEN.xlsx"), str(raw / "2024-25" / "DEN.xlsx")])
+    assert [(report.source, report.season) for report in reports] == [("2023-24/DEN.xlsx", "2023-24"), ("2024-25/DEN.xlsx", "2024-25")]
+    # The same sources as the directory load: unchanged, skipped
+    assert all(report.result.skipped for report in reports)
+
+    write_workbook(raw / "2024-25" / "DEN.xlsx", ["A", "C"])
+    reports = ingest_directory(str(raw), paths=[str(raw / "2024-25" / "DEN.xlsx")])
+    assert reports[0].result.deleted == 1
+    with get_write_engine().connect() as conn:
+        rows = conn.execute(text("SELECT season, source, COUNT(*) FROM player_stats GROUP BY 1, 2 ORDER BY 1")).fetchall()
+    assert rows == [("2023-24", "2023-24/DEN.xlsx", 2), ("2024-25", "2024-25/DEN.xlsx", 2)]
+
+
+def test_indexes_and_aggregates_are_rebuilt_once_per_backfill(tmp_path, monkeypatch):
+    raw = tmp_path / "raw"
+    for season in ("2022-23", "2023-24", "2024-25"):
+        write_workbook(raw / f"regular_NBA_{season}.xlsx", ["A", "B"])
+    calls = []
+    materialize = ingestion.materialize_aggregates
+    monkeypatch.setattr(ingestion, "materialize_aggregates", lambda conn: calls.append(1) or materialize(conn))
+
+    ingest_directory(str(raw))
+
+    assert len(calls) == 1
+    with get_write_engine().connect() as conn:
+        indexes = {row[1] for row in conn.execute(text("PRAGMA index_list(player_stats)"))}
+        ranked = conn.execute(text("SELECT season, COUNT(*) FROM leaderboard WHERE stat = 'pts' GROUP BY 1 ORDER BY 1")).fetchall()
+    assert {"ix_player_stats_pts", "ix_player_stats_team_pts"} <= indexes
+    assert ranked == [("2022-23", 2), ("2023-24", 2), ("2024-25", 2)]
+
+
+def test_workbook_with_a_broken_header_leaves_its_rows_in_place(tmp_path):
+    raw = tmp_path / "raw"
+    write_workbook(raw / "regular_NBA_2024-25.xlsx", ["A", "B", "C"])
+    ingest_directory(str(raw))
+
+    # Every row fails validation: rejected, not applied as the removal of all of them
+    write_workbook(raw / "regular_NBA_2024-25.xlsx", ["A", "B", "C"], renamed={"PTS": "Points"})
+    reports = ingest_directory(str(raw))
+
+    assert reports[0].failure.startswith("load: regular_NBA_2024-25.xlsx: 3 of 3 rows failed validation")
+    with get_write_engine().connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM player_stats")).scalar() == 3
+        manifest = conn.execute(text("SELECT row_count FROM ingestion_manifest")).scalar()
+    assert manifest == 3
+    # Not recorded as loaded: read again on the next ingestion
+    assert not ingest_directory(str(raw))[0].result.skipped
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+
+from src.api.main import app
+from src.rag.classifier import QueryClassifier
+
+AMBIGUOUS_QUERY = "quelle heure est-il"  # No domain keyword: goes to the LLM
+
+
+class SlowAsyncMistral:
+    """Stands in for MistralAsyncClient: answers after `delay` seconds."""
+
+    def __init__(self, delay, answer="DIRECT - Hors sujet"):
+        self.delay = delay
+        self.answer = answer
+        self.calls = 0
+
+    async def chat(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.answer))])
+
+
+def test_rules_do_not_call_the_llm():
+    classifier = QueryClassifier()
+    classifier.async_client = SlowAsyncMistral(delay=0)
+
+    assert asyncio.run(classifier.aneeds_rag("Bonjour"))[0] is False
+    assert asyncio.run(classifier.aneeds_rag("Stats de LeBron?"))[0] is True
+    assert classifier.async_client.calls == 0
+
+
+def test_llm_timeout_falls_back_to_rag():
+    classifier = QueryClassifier()
+    classifier.async_client = SlowAsyncMistral(delay=1.0)
+    classifier.timeout = 0.05
+
+    needs_rag, confidence, reason = asyncio.run(classifier.aneeds_rag(AMBIGUOUS_QUERY))
+    assert needs_rag is True
+    assert confidence == 0.5
+    assert "Timeout" in reason
+
+
+def test_other_requests_are_served_while_classifying(ready_components):
+    ready_components.classifier.async_client = SlowAsyncMistral(delay=0.5)
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            start = time.perf_counter()
+            chat = asyncio.create_task(client.post("/api/v1/chat", json={"query": AMBIGUOUS_QUERY}))
+            await asyncio.sleep(0.05)  # The classification is now in flight
+
+            health_latencies = []
+            for _ in range(5):
+                t0 = time.perf_counter()
+                response = await client.get("/health")
+                assert response.status_code == 200
+                health_latencies.append(time.perf_counter() - t0)
+            health_done = time.perf_counter() - start
+
+            chat_response = await chat
+            return chat_response, health_done, max(health_latencies)
+
+    chat_response, health_done, worst_health = asyncio.run(scenario())
+    assert chat_response.status_code == 200
+    assert chat_response.json()["mode"] == "CHAT"
+    # /health was answered while the 0.5s classification was still running
+    assert health_done < 0.4
+    assert worst_health < 0.1
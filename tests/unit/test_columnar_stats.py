@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import insert
+
+from src.data.models import PlayerStatsSQL
+from src.data.versioning import bump_data_version
+from src.rag.chain import build_columnar_stats_tool
+from src.rag.columnar_stats import ColumnarStats
+
+PLAYERS = [
+    {"player": "Shai Gilgeous-Alexander", "team": "OKC", "season": "2024-25", "age": 26, "gp": 76, "pts": 2485.0, "reb": 380.0, "fgm": 860.0, "fg_pct": 51.9},
+    {"player": "Nikola Jokić", "team": "DEN", "season": "2024-25", "age": 30, "gp": 70, "pts": 2072.0, "reb": 889.0, "fgm": 803.0, "fg_pct": 57.6},
+    {"player": "Jalen Williams", "team": "OKC", "season": "2024-25", "age": 24, "gp": 69, "pts": 1490.0, "reb": 365.0, "fgm": 571.0, "fg_pct": 48.4},
+    {"player": "Grant Williams", "team": "CHA", "season": "2024-25", "age": 26, "gp": 16, "pts": 150.0, "reb": 70.0, "fgm": 50.0, "fg_pct": 70.0},
+    {"player": "Two-Way Player", "team": "CHA", "season": "2024-25", "age": 22, "gp": 0, "pts": 0.0, "reb": 0.0, "fgm": 0.0, "fg_pct": None},
+]
+
+
+@pytest.fixture
+def columnar(stats_db):
+    return ColumnarStats(stats_db(PLAYERS))
+
+
+def test_top_and_bottom_with_filters_and_per_game(columnar):
+    assert columnar.query("pts", limit=2).splitlines() == [
+        "player | team | season | gp | pts",
+        "Shai Gilgeous-Alexander | OKC | 2024-25 | 76 | 2485",
+        "Nikola Jokić | DEN | 2024-25 | 70 | 2072",
+    ]
+    rows = columnar.query("reb", per_game=True, filters=[{"column": "age", "op": "<", "value": 30}]).splitlines()
+    assert rows[0] == "player | team | season | gp | reb_per_game"
+    # Two-Way Player has no games: no per-game value
+    assert [row.split(" | ")[0] for row in rows[1:]] == ["Jalen Williams", "Shai Gilgeous-Alexander", "Grant Williams"]
+
+    assert columnar.query("pts", operation="bottom", team="cha", limit=1).splitlines()[1].startswith("Two-Way Player")
+    # Percentage rankings only include qualified players, like the leaderboard
+    assert columnar.query("fg_pct", limit=1).splitlines()[1].startswith("Nikola Jokić")
+
+
+def test_aggregates_and_percentiles(columnar):
+    assert columnar.query("pts", operation="sum", team="OKC") == "sum(pts) over 2 players in 2024-25: 3975"
+    # NULL percentages are skipped
+    assert columnar.query("fg_pct", operation="count") == "count(fg_pct) over 4 players in 2024-25: 4"
+    assert columnar.query("age", operation="percentile", percentile=50) == "p50(age) over 5 players in 2024-25: 26"
+
+    rows = columnar.query("pts", operation="sum", group_by_team=True).splitlines()
+    assert rows == ["team | season | sum(pts)", "OKC | 2024-25 | 3975", "DEN | 2024-25 | 2072", "CHA | 2024-25 | 150"]
+    assert columnar.query("age", operation="median", group_by_team=True, limit=1).splitlines()[1] == "DEN | 2024-25 | 30"
+
+
+def test_invalid_arguments_raise_value_error(columnar):
+    with pytest.raises(ValueError):
+        columnar.query("shoe_size")
+    with pytest.raises(ValueError):
+        columnar.query("pts", operation="mode")
+    with pytest.raises(ValueError):
+        columnar.query("fg_pct", per_game=True)
+    with pytest.raises(ValueError):
+        columnar.query("pts", filters=[{"column": "age", "op": "~", "value": 1}])
+    with pytest.raises(ValueError):
+        columnar.query("pts", season="1999-00")
+
+
+def test_queries_one_season_the_latest_by_default(columnar):
+    with columnar.engine.begin() as conn:
+        conn.execute(insert(PlayerStatsSQL), [
+            {"player": "Shai Gilgeous-Alexander", "team": "OKC", "season": "2023-24", "gp": 75, "pts": 2254.0},
+            {"player": "Luka Dončić", "team": "DAL", "season": "2023-24", "gp": 70, "pts": 2370.0},
+        ])
+    bump_data_version("sql")
+
+    assert [row.split(" | ")[:3] for row in columnar.query("pts", limit=2).splitlines()[1:]] == [
+        ["Shai Gilgeous-Alexander", "OKC", "2024-25"], ["Nikola Jokić", "DEN", "2024-25"],
+    ]
+    assert columnar.query("pts", season="2023-24", limit=1).splitlines()[1] == "Luka Dončić | DAL | 2023-24 | 70 | 2370"
+    assert columnar.query("pts", operation="sum", team="OKC") == "sum(pts) over 2 players in 2024-25: 3975"
+    assert columnar.query("pts", operation="sum", group_by_team=True, season="2023-24").splitlines()[1:] == [
+        "DAL | 2023-24 | 2370", "OKC | 2023-24 | 2254",
+    ]
+
+
+def test_reloads_on_data_version_change(columnar):
+    assert columnar.query("pts", operation="count") == "count(pts) over 5 players in 2024-25: 5"
+    with columnar.engine.begin() as conn:
+        conn.execute(insert(PlayerStatsSQL), [{"player": "Victor Wembanyama", "team": "SAS", "season": "2024-25", "gp": 46, "pts": 1116.0}])
+
+    # Served from the loaded snapshot until the ingestion bumps the version
+    assert columnar.query("pts", operation="count") == "count(pts) over 5 players in 2024-25: 5"
+    bump_data_version("sql")
+    assert columnar.query("pts", operation="count") == "count(pts) over 6 players in 2024-25: 6"
+    assert columnar.reloads == 2
+
+
+def test_tool_validates_arguments_and_returns_errors(columnar):
+    tool = build_columnar_stats_tool(columnar)
+
+    output = tool.invoke({"metric": "pts", "filters": [{"column": "gp", "op": ">=", "value": 70}], "limit": 1})
+    assert output.splitlines()[1].startswith("Shai Gilgeous-Alexander")
+    assert tool.invoke({"metric": "shoe_size"}).startswith("Error: Unknown stat")
@@ -0,0 +1,87 @@
+import asyncio
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.rag.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+class CountingEmbeddings(Embeddings):
+    model = "fake-embed"
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_query(self, text):
+        self.calls.append(text)
+        return [len(text), text.count("a"), 0.1]
+
+    async def aembed_query(self, text):
+        await asyncio.sleep(0.01)
+        return self.embed_query(text)
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+def test_query_is_embedded_once_per_model_and_normalized_text():
+    inner = CountingEmbeddings()
+    cache = EmbeddingCache()
+    embeddings = CachedEmbeddings(inner, cache)
+
+    first = embeddings.embed_query("Who  leads the league?")
+    assert embeddings.embed_query(" Who leads the league? ") == first
+    assert CachedEmbeddings(inner, cache, model="other-embed").embed_query("Who leads the league?") == first
+    assert inner.calls == ["Who leads the league?", "Who leads the league?"]
+    assert first == np.float32([21, 2, 0.1]).tolist()
+
+    stats = cache.stats()
+    assert (stats["hits_memory"], stats["misses"]) == (1, 2)
+    assert stats["hit_rate"] == 1 / 3 and stats["saved_seconds"] >= 0
+
+
+def test_memory_tier_is_bounded_lru():
+    inner = CountingEmbeddings()
+    embeddings = CachedEmbeddings(inner, EmbeddingCache(max_entries=2))
+    for text in ("a", "b", "a", "c", "a", "b"):
+        embeddings.embed_query(text)
+
+    # "b" was the least recently used when "c" came in
+    assert inner.calls == ["a", "b", "c", "b"]
+
+
+def test_disk_tier_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    first_worker = CachedEmbeddings(CountingEmbeddings(), EmbeddingCache(path=path))
+    second_inner = CountingEmbeddings()
+    second_worker = CachedEmbeddings(second_inner, EmbeddingCache(path=path))
+
+    vector = first_worker.embed_query("best rebounder")
+
+    assert second_worker.embed_query("best rebounder") == vector
+    assert asyncio.run(second_worker.aembed_query("best rebounder")) == vector
+    assert second_inner.calls == []
+    assert second_worker.cache.stats()["hits_disk"] == 1
+
+
+def test_concurrent_async_misses_share_one_call():
+    inner = CountingEmbeddings()
+    embeddings = CachedEmbeddings(inner, EmbeddingCache())
+
+    async def burst():
+        return await asyncio.gather(*[embeddings.aembed_query("zone defense") for _ in range(5)])
+
+    vectors = asyncio.run(burst())
+
+    assert inner.calls == ["zone defense"]
+    assert all(vector == vectors[0] for vector in vectors)
+    assert embeddings.cache.stats()["coalesced"] == 4
+
+
+def test_documents_are_not_cached():
+    inner = CountingEmbeddings()
+    embeddings = CachedEmbeddings(inner, EmbeddingCache())
+    embeddings.embed_documents(["rule", "rule"])
+    embeddings.embed_documents(["rule"])
+
+    assert inner.calls == ["rule"] * 3
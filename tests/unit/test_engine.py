@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.data.engine import get_read_engine, get_write_engine
+from src.data.models import Base, PlayerStatsSQL, ensure_indexes
+
+
+@pytest.fixture
+def database_url(stats_db):
+    return str(stats_db([{"player": "Nikola Jokić", "team": "DEN", "pts": 2072.0}]).url)
+
+
+def test_engines_are_shared_per_url(database_url):
+    assert get_read_engine(database_url) is get_read_engine(database_url)
+    assert get_write_engine(database_url) is get_write_engine(database_url)
+    assert get_read_engine(database_url) is not get_write_engine(database_url)
+
+
+def test_read_engine_is_read_only_and_tuned(database_url):
+    with get_read_engine(database_url).connect() as conn:
+        assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA cache_size")).scalar() < 0
+        assert conn.execute(text("PRAGMA mmap_size")).scalar() > 0
+
+        with pytest.raises(OperationalError):
+            conn.execute(text("DELETE FROM player_stats"))
+
+
+def test_readers_are_not_blocked_by_an_open_write_transaction(database_url):
+    with get_write_engine(database_url).connect() as writer:
+        writer.execute(text("DELETE FROM player_stats"))
+
+        # Uncommitted: readers still see the last committed snapshot, without waiting
+        with get_read_engine(database_url).connect() as reader:
+            assert reader.execute(text("SELECT COUNT(*) FROM player_stats")).scalar() == 1
+
+        writer.commit()
+
+    with get_read_engine(database_url).connect() as reader:
+        assert reader.execute(text("SELECT COUNT(*) FROM player_stats")).scalar() == 0
+
+
+def test_ensure_indexes_upgrades_an_existing_database(tmp_path):
+    writer = get_write_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=writer)
+    with writer.begin() as conn:
+        # As created before the secondary indexes existed
+        for index in PlayerStatsSQL.__table__.indexes:
+            if index.name not in ("ix_player_stats_id", "ix_player_stats_player"):
+                conn.execute(text(f"DROP INDEX {index.name}"))
+
+    ensure_indexes(writer)
+    ensure_indexes(writer)  # idempotent
+
+    with writer.connect() as conn:
+        plan = conn.execute(text("EXPLAIN QUERY PLAN SELECT player FROM player_stats WHERE team = 'OKC' ORDER BY pts DESC")).fetchall()
+        assert "ix_player_stats_team_pts" in plan[0][3]
+        plan = conn.execute(text("EXPLAIN QUERY PLAN SELECT player FROM player_stats ORDER BY pts DESC LIMIT 5")).fetchall()
+        assert "ix_player_stats_pts" in plan[0][3]
@@ -0,0 +1,52 @@
+import datetime
+
+import pandas as pd
+from openpyxl import Workbook
+
+from src.data.excel_reader import iter_stats_excel, read_stats_excel, sample_stats_excel
+
+
+def make_workbook(path, rows):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Regular season stats"])
+    sheet.append(["Player", "Team", "PTS", datetime.time(15, 0), "Notes"])
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+    return path
+
+
+def test_batches_match_read_excel(tmp_path):
+    rows = [[f"Player {i}", "DEN", i * 10, i, None] for i in range(7)]
+    rows.insert(3, [None] * 5)  # empty row
+    path = make_workbook(tmp_path / "stats.xlsx", rows)
+
+    batches = list(iter_stats_excel(str(path), batch_size=3))
+    expected = pd.read_excel(path, header=1).rename(columns={datetime.time(15, 0): "3PM"}).dropna(how="all")
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    streamed = pd.concat(batches)
+    assert list(streamed.columns) == ["Player", "Team", "PTS", "3PM", "Notes"]
+    assert list(streamed.index) == list(expected.index)
+    pd.testing.assert_frame_equal(streamed.drop(columns="Notes"), expected.drop(columns="Notes"), check_dtype=False)
+    assert streamed["Notes"].isna().all()
+
+
+def test_only_requested_columns_are_kept(tmp_path):
+    path = make_workbook(tmp_path / "stats.xlsx", [["Player 0", "DEN", 10, 1, "x"]])
+
+    df = read_stats_excel(str(path), columns=["Player", "3PM", "REB"])
+
+    assert list(df.columns) == ["Player", "3PM"]
+    assert df.iloc[0].tolist() == ["Player 0", 1]
+
+
+def test_sample_is_bounded_and_uniform(tmp_path):
+    path = make_workbook(tmp_path / "stats.xlsx", [[f"Player {i}", "DEN", i, 0, None] for i in range(1000)])
+
+    sample = sample_stats_excel(str(path), max_rows=100, batch_size=64)
+
+    assert len(sample) == 100 and sample.index.is_unique
+    # Rows from the whole workbook, not only the first batches
+    assert sample["PTS"].min() < 200 and sample["PTS"].max() > 800
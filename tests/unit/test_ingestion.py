@@ -0,0 +1,162 @@
+import datetime
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from src.data.engine import get_write_engine
+from src.data.ingestion import load_dataframe
+from src.data.models import PlayerStatsSQL
+from src.data.schemas import PlayerStats
+from src.data.validation import validate_frame
+
+ROW = {
+    "Player": "Nikola Jokić", "Team": "DEN", "Age": 30, "GP": 70, "W": 46, "L": 24, "Min": 36.7, "PTS": 2072,
+    "FGM": 784, "FGA": 1365, "FG%": 57.6, "3PM": 140, "3PA": 329, "3P%": 41.7, "FTM": 364, "FTA": 448,
+    "FT%": 80.0, "OREB": 203, "DREB": 693, "REB": 889, "AST": 714, "TOV": 231, "STL": 126, "BLK": 42,
+    "PF": 161, "+/-": 8.5, "FP": 4501,
+}
+
+
+def make_frame(overrides):
+    return pd.DataFrame([{**ROW, "Player": f"Player {i}", **override} for i, override in enumerate(overrides)])
+
+
+def row_by_row(df):
+    rows, errors = [], []
+    for index, row in df.iterrows():
+        try:
+            rows.append(PlayerStats(**row.to_dict()).model_dump())
+        except Exception as e:
+            errors.append(f"Row {index}: {e}")
+    return rows, errors
+
+
+def test_validate_frame_matches_row_by_row_validation():
+    df = make_frame([
+        {},
+        {"Age": "abc"},
+        {"FG%": 120.0},
+        {"Player": None},
+        {"GP": 3.5},
+        {"PTS": "12"},  # numeric strings are coerced, as by Pydantic
+        {"3PM": datetime.time(15, 0)},
+        {"AST": -1},
+        {"+/-": None},  # NaN is allowed in unconstrained floats
+    ])
+
+    valid, errors = validate_frame(df)
+    expected_rows, expected_errors = row_by_row(df)
+
+    assert errors == expected_errors
+    assert len(errors) == 6 and errors[0].startswith("Row 1: 1 validation error for PlayerStats")
+    assert list(valid.index) == [0, 5, 8]
+    assert valid.to_dict("records")[:2] == expected_rows[:2]
+    assert list(valid.columns) == list(PlayerStats.model_fields)
+
+
+def test_missing_column_fails_every_row():
+    valid, errors = validate_frame(make_frame([{}, {}]).drop(columns=["REB"]))
+
+    assert valid.empty
+    assert len(errors) == 2 and "REB\n  Field required" in errors[0]
+
+
+def test_load_dataframe_inserts_in_batches_with_aggregates(tmp_path):
+    engine = get_write_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    df = make_frame([{}, {"PTS": 100}, {"Age": None}, {"PTS": 3000}, {"Team": "OKC"}])
+
+    result = load_dataframe(df, engine=engine, batch_size=2)
+
+    assert result.inserted == 4 and len(result.errors) == 1
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM player_stats")).scalar() == 4
+        assert conn.execute(text("SELECT player FROM leaderboard WHERE stat = 'pts' AND rank = 1")).scalar() == "Player 3"
+        assert conn.execute(text("SELECT age, pts FROM player_stats WHERE player = 'Player 1'")).one() == (30, 100.0)
+
+
+def test_reloading_applies_only_the_differences(tmp_path):
+    engine = get_write_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    df = make_frame([{}, {"PTS": 100}, {"PTS": 3000}])
+    load_dataframe(df, engine=engine, source="a.xlsx")
+
+    again = load_dataframe(df, engine=engine, source="a.xlsx")
+    assert (again.inserted, again.updated, again.deleted, again.unchanged) == (0, 0, 0, 3)
+
+    with engine.connect() as conn:
+        ids = dict(conn.execute(text("SELECT player, id FROM player_stats")).fetchall())
+    # Player 1 changed, Player 2 removed, Player 3 added
+    changed = make_frame([{}, {"PTS": 150}, {}, {}]).drop(index=2)
+    result = load_dataframe(changed, engine=engine, source="a.xlsx")
+
+    assert (result.inserted, result.updated, result.deleted, result.unchanged) == (1, 1, 1, 1)
+    with engine.connect() as conn:
+        rows = dict(conn.execute(text("SELECT player, pts FROM player_stats")).fetchall())
+        assert rows == {"Player 0": 2072.0, "Player 1": 150.0, "Player 3": 2072.0}
+        assert conn.execute(text("SELECT id FROM player_stats WHERE player = 'Player 1'")).scalar() == ids["Player 1"]
+        assert conn.execute(text("SELECT value FROM leaderboard WHERE stat = 'pts' AND player = 'Player 1'")).scalar() == 150.0
+        assert conn.execute(text("SELECT row_count FROM ingestion_manifest WHERE source = 'a.xlsx'")).scalar() == 3
+
+
+def test_invalid_rows_are_not_deleted_and_mostly_invalid_loads_are_rejected(tmp_path):
+    engine = get_write_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    load_dataframe(make_frame([{}, {}, {}]), engine=engine, source="a.xlsx")
+
+    # Player 1 fails validation: kept, although it is not among the valid rows
+    result = load_dataframe(make_frame([{"PTS": 100}, {"Age": "n/a"}, {}]), engine=engine, source="a.xlsx")
+    assert (result.updated, result.deleted, len(result.errors)) == (1, 0, 1)
+
+    with pytest.raises(ValueError, match="2 of 3 rows failed validation"):
+        load_dataframe(make_frame([{"Age": "n/a"}, {"GP": -1}, {}]), engine=engine, source="a.xlsx")
+    with pytest.raises(ValueError, match="3 of 3 rows failed validation"):
+        load_dataframe(make_frame([{}, {}, {}]).rename(columns={"PTS": "Points"}), engine=engine, source="a.xlsx")
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM player_stats")).scalar() == 3
+        assert conn.execute(text("SELECT pts FROM player_stats WHERE player = 'Player 0'")).scalar() == 100.0
+
+
+def test_rows_of_other_sources_and_seasons_are_kept(tmp_path):
+    engine = get_write_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    load_dataframe(make_frame([{}, {}]), engine=engine, source="a.xlsx", season="2023-24")
+    load_dataframe(make_frame([{}, {}]), engine=engine, source="a.xlsx", season="2024-25")
+    load_dataframe(make_frame([{}, {}, {}]).iloc[2:], engine=engine, source="b.xlsx", season="2024-25")
+
+    result = load_dataframe(make_frame([{}]), engine=engine, source="a.xlsx", season="2024-25")
+
+    assert result.deleted == 1
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT season, player FROM player_stats ORDER BY season, player")).fetchall()
+    assert rows == [("2023-24", "Player 0"), ("2023-24", "Player 1"), ("2024-25", "Player 0"), ("2024-25", "Player 2")]
+
+
+def test_duplicates_of_the_append_only_ingestion_are_removed(tmp_path):
+    engine = get_write_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        # player_stats as created before the season/source/row_hash columns
+        conn.execute(text("CREATE TABLE player_stats (id INTEGER PRIMARY KEY, player VARCHAR, team VARCHAR, age INTEGER, pts FLOAT)"))
+        conn.execute(text("INSERT INTO player_stats (player, team, age, pts) VALUES ('Player 0', 'DEN', 30, 1), ('Player 0', 'DEN', 30, 2)"))
+    with engine.begin() as conn:
+        for name, column in PlayerStatsSQL.__table__.columns.items():
+            if name not in ("id", "player", "team", "age", "pts", "season", "source", "row_hash"):
+                conn.execute(text(f"ALTER TABLE player_stats ADD COLUMN {name} {column.type}"))
+
+    result = load_dataframe(make_frame([{}]), engine=engine, source="a.xlsx")
+
+    # The kept duplicate is taken over by the workbook instead of being inserted again
+    assert (result.inserted, result.updated) == (0, 1)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT season, pts FROM player_stats")).fetchall() == [("2024-25", 2072.0)]
+        indexes = {row[1] for row in conn.execute(text("PRAGMA index_list(player_stats)"))}
+    assert "ux_player_stats_player_team_season" in indexes
+
+
+def test_duplicate_keys_of_a_workbook_keep_the_first_row(tmp_path):
+    engine = get_write_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    df = make_frame([{}, {}, {}])
+    df.loc[2, "Player"] = "Player 0"
+
+    result = load_dataframe(df, engine=engine, batch_size=2)
+
+    assert result.inserted == 2
+    assert result.errors == ["Row 2: duplicate of an earlier row for (Player 0, DEN), ignored"]
@@ -0,0 +1,218 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine, insert
+
+from src.core.config import settings
+from src.data.aggregates import materialize_aggregates
+from src.data.models import Base, PlayerStatsSQL
+from src.data.versioning import bump_data_version
+from src.rag.chain import build_sql_agent_tool
+from src.rag.query_planner import QueryPlanner
+
+PLAYERS = [
+    {"player": "Shai Gilgeous-Alexander", "team": "OKC", "season": "2024-25", "gp": 76, "pts": 2485.0, "reb": 380.0, "ast": 486.0, "fgm": 860.0, "fg_pct": 51.9},
+    {"player": "Nikola Jokić", "team": "DEN", "season": "2024-25", "gp": 70, "pts": 2072.0, "reb": 889.0, "ast": 714.0, "fgm": 803.0, "fg_pct": 57.6},
+    {"player": "Trae Young", "team": "ATL", "season": "2024-25", "gp": 76, "pts": 1841.0, "reb": 237.0, "ast": 880.0, "fgm": 573.0, "fg_pct": 41.1},
+    {"player": "Jalen Williams", "team": "OKC", "season": "2024-25", "gp": 69, "pts": 1490.0, "reb": 365.0, "ast": 351.0, "fgm": 571.0, "fg_pct": 48.4},
+    {"player": "Grant Williams", "team": "CHA", "season": "2024-25", "gp": 16, "pts": 150.0, "reb": 70.0, "ast": 30.0, "fgm": 50.0, "fg_pct": 70.0},
+]
+
+
+@pytest.fixture
+def planner(stats_db):
+    return QueryPlanner(stats_db(PLAYERS))
+
+
+def test_top_n_by_stat(planner):
+    planned = planner.plan("Top 3 players by assists")
+    assert planned.intent == "top_n"
+    assert planned.params["limit"] == 3
+
+    output = planner.run(planned)
+    rows = output.splitlines()[1:4]
+    assert [row.split(" | ")[0] for row in rows] == ["Trae Young", "Nikola Jokić", "Shai Gilgeous-Alexander"]
+
+
+def test_top_n_per_game_and_percentage_qualifier(planner):
+    planned = planner.plan("Qui a le plus de rebonds par match ?")
+    assert planned.params["limit"] == 1
+    assert "reb_per_game" in planned.sql
+
+    # Grant Williams has the best FG% but too few made shots to qualify
+    output = planner.answer("Who has the best FG%?")
+    assert output.splitlines()[1].startswith("Nikola Jokić")
+
+
+def test_per_game_abbreviations(planner):
+    planned = planner.plan("Who leads the league in PPG?")
+    assert (planned.intent, planned.params["limit"]) == ("top_n", 1)
+    assert "pts_per_game" in planned.sql
+    assert "reb_per_game" in planner.plan("top 3 in rpg").sql
+    assert planner.answer("Top 2 players by APG").splitlines()[1:3] == [
+        "Trae Young | ATL | 2024-25 | 76 | 11.6", "Nikola Jokić | DEN | 2024-25 | 70 | 10.2",
+    ]
+
+
+def test_player_stats_matches_last_name_and_accents(planner):
+    planned = planner.plan("How many points did Jokic score?")
+    assert planned.intent == "player_stats"
+    assert planned.params == {"player_0": "Nikola Jokić", "season": "2024-25"}
+    assert "pts" in planned.sql
+
+    # Lowercase last names are ordinary words, not players: here a qualifier the templates cannot apply
+    assert planner.plan("young players with the most steals") is None
+
+
+def test_compare_players(planner):
+    planned = planner.plan("Compare Shai Gilgeous-Alexander and Trae Young in points and assists")
+    assert planned.intent == "compare"
+    assert set(planned.params.values()) == {"Shai Gilgeous-Alexander", "Trae Young", "2024-25"}
+    assert "pts, ast" in planned.sql
+
+
+def test_falls_back_when_no_template_applies(planner):
+    assert planner.plan("What is a triple-double?") is None
+    assert planner.plan("Which team has the most wins?") is None
+    assert planner.plan("Is Jokic the best passer?") is None
+    # "Williams" is ambiguous without a first name
+    assert planner.plan("Stats for Williams") is None
+    assert planner.answer("What is a triple-double?") is None
+
+
+@pytest.mark.parametrize("question", [
+    "top 5 scorers with at least 50 games",
+    "top 5 scorers under 25 years old",
+    "who has the most points among guards",
+    "top 3 rookies by points",
+    "most points for a player from OKC",
+    "who scored the most points off the bench",
+    "best scorer in the Western Conference",
+    "top 5 in assists this month",
+    "How many players scored more than 2000 points?",
+    "How many points did Jokic score in his last 10 games?",
+])
+def test_qualified_questions_fall_back(planner, question):
+    # Answering these with the plain leaderboard would drop the qualifier
+    assert planner.plan(question) is None
+
+
+def test_filler_words_keep_the_template(planner):
+    assert planner.plan("Show me the top 3 players in the league by points this season").params["limit"] == 3
+    assert planner.plan("Quels sont les 5 meilleurs marqueurs de la saison ?").intent == "top_n"
+    assert planner.plan("What is Trae Young's plus/minus?").intent == "player_stats"
+
+
+def test_player_names_are_bound_parameters(planner):
+    planned = planner.plan("Stats for Nikola Jokic';")
+    assert "Jokić" not in planned.sql
+    assert planner.run(planned).splitlines()[1].startswith("Nikola Jokić")
+    assert planner.plan("Stats for Nikola Jokic'; DROP TABLE player_stats; --") is None
+
+
+def test_reloads_players_on_data_version_change(planner):
+    assert planner.plan("Stats for Victor Wembanyama") is None
+
+    with planner.engine.begin() as conn:
+        conn.execute(insert(PlayerStatsSQL), [{"player": "Victor Wembanyama", "team": "SAS", "season": "2024-25", "gp": 46, "pts": 1116.0}])
+    bump_data_version("sql")
+
+    assert planner.plan("Stats for Victor Wembanyama").params == {"player_0": "Victor Wembanyama", "season": "2024-25"}
+
+
+def test_failed_player_load_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_VERSION_FILE", str(tmp_path / "data_version.json"))
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    planner = QueryPlanner(engine)
+    # No player_stats table yet: nothing indexed, and not marked up to date
+    assert planner.plan("Stats for Trae Young") is None
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(PlayerStatsSQL), PLAYERS)
+
+    assert planner.plan("Stats for Trae Young").params["player_0"] == "Trae Young"
+
+
+def test_top_n_reads_the_leaderboard_view(planner):
+    with planner.engine.begin() as conn:
+        materialize_aggregates(conn)
+    bump_data_version("sql")
+
+    planned = planner.plan("Top 3 players by assists")
+    assert "FROM leaderboard WHERE stat = :stat" in planned.sql
+    rows = planner.run(planned).splitlines()[1:4]
+    assert [row.split(" | ")[0] for row in rows] == ["Trae Young", "Nikola Jokić", "Shai Gilgeous-Alexander"]
+
+    assert planner.answer("Who has the best FG%?").splitlines()[1].startswith("Nikola Jokić")
+    assert planner.answer("Who has the most rebounds per game?").splitlines()[1] == "Nikola Jokić | DEN | 2024-25 | 70 | 12.7"
+
+
+@pytest.mark.parametrize("leaderboard", [False, True])
+def test_answers_are_about_one_season(planner, leaderboard):
+    with planner.engine.begin() as conn:
+        conn.execute(insert(PlayerStatsSQL), [
+            {"player": "Shai Gilgeous-Alexander", "team": "OKC", "season": "2023-24", "gp": 75, "pts": 2254.0, "ast": 465.0},
+            {"player": "Luka Doncic", "team": "DAL", "season": "2023-24", "gp": 70, "pts": 2370.0, "ast": 686.0},
+        ])
+        if leaderboard:
+            materialize_aggregates(conn)
+    bump_data_version("sql")
+
+    # The latest season unless the question names one
+    rows = planner.answer("Top 3 scorers").splitlines()[1:4]
+    assert [row.split(" | ")[:3] for row in rows] == [
+        ["Shai Gilgeous-Alexander", "OKC", "2024-25"], ["Nikola Jokić", "DEN", "2024-25"], ["Trae Young", "ATL", "2024-25"],
+    ]
+    assert planner.answer("Top 2 scorers in 2023-2024").splitlines()[1:3] == [
+        "Luka Doncic | DAL | 2023-24 | 70 | 2370.0", "Shai Gilgeous-Alexander | OKC | 2023-24 | 75 | 2254.0",
+    ]
+    assert planner.answer("Stats for Shai Gilgeous-Alexander").count("Shai Gilgeous-Alexander | OKC | 2024-25") == 1
+    assert planner.plan("Shai Gilgeous-Alexander points in 2023-24").params["season"] == "2023-24"
+    # Seasons that are not loaded, or several of them, are left to the SQL agent
+    assert planner.plan("Top 3 scorers in 2019-20") is None
+    assert planner.plan("Top 3 scorers in 2023-24 and 2024-25") is None
+
+
+class FakeSQLAgent:
+    """Stands in for the SQL agent executor: records which of invoke/ainvoke ran."""
+
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, inputs, config=None):
+        self.calls.append("invoke")
+        return {"output": f"agent: {inputs['input']}"}
+
+    async def ainvoke(self, inputs, config=None):
+        self.calls.append("ainvoke")
+        return {"output": f"agent: {inputs['input']}"}
+
+
+def test_sql_agent_tool_answers_the_same_off_the_event_loop(planner):
+    threads = []
+    answer = planner.answer
+
+    def recording_answer(question):
+        threads.append(threading.get_ident())
+        return answer(question)
+
+    planner.answer = recording_answer
+    agent = FakeSQLAgent()
+    tool = build_sql_agent_tool(agent, planner=planner)
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        planned = await tool.ainvoke("Top 3 players by assists")
+        fallback = await tool.ainvoke("Who is the MVP?")
+        return loop_thread, planned, fallback
+
+    loop_thread, planned, fallback = asyncio.run(scenario())
+
+    # The planner's SQLite query runs in a worker thread, not on the event loop
+    assert threads[0] != loop_thread and threads[1] != loop_thread
+    assert agent.calls == ["ainvoke"]
+    assert planned == tool.invoke("Top 3 players by assists")
+    assert fallback == tool.invoke("Who is the MVP?") == "agent: Who is the MVP?"
+    assert agent.calls == ["ainvoke", "invoke"]
@@ -0,0 +1,77 @@
+import pytest
+
+from src.data.aggregates import materialize_aggregates
+from src.data.versioning import bump_data_version
+from src.rag.schema_catalog import SchemaCatalog
+from src.rag.sql_database import StatsSQLDatabase
+
+
+PLAYERS = [
+    {"player": "Nikola Jokić", "team": "DEN", "season": "2024-25", "gp": 70, "pts": 2072.0, "ast": 714.0, "tov": 231.0},
+    {"player": "Trae Young", "team": "ATL", "season": "2024-25", "gp": 76, "pts": 1841.0, "ast": 880.0, "tov": 355.0},
+]
+
+
+@pytest.fixture
+def catalog(stats_db):
+    return SchemaCatalog(stats_db(PLAYERS))
+
+
+def test_prompt_context_is_pruned_to_relevant_columns(catalog):
+    context = catalog.prompt_context("Which players have more than 500 assists and fewer than 200 turnovers?")
+
+    assert "ast FLOAT, -- total assists" in context
+    assert "tov FLOAT" in context
+    assert "player VARCHAR" in context and "gp INTEGER" in context
+    assert "pts FLOAT" not in context
+    assert "season VARCHAR, -- NBA season" in context
+    assert "Trae Young\tATL\t76\t880.0\t355.0\t2024-25" in context
+    assert len(context) < len(catalog.table_info()) / 2
+
+
+def test_prompt_context_without_known_columns_lists_all_columns(catalog):
+    context = catalog.prompt_context("Who is the MVP?")
+
+    assert "plus_minus FLOAT, -- average plus/minus per game" in context
+    assert "rows from player_stats" not in context
+
+
+def test_table_info_is_cached_until_data_version_changes(catalog):
+    assert "Nikola Jokić" in catalog.table_info(["player_stats"])
+    assert catalog.rebuilds == 1
+
+    catalog.table_info()
+    assert catalog.rebuilds == 1
+
+    bump_data_version("sql")
+    catalog.table_info()
+    assert catalog.rebuilds == 2
+
+    with pytest.raises(ValueError):
+        catalog.table_info(["missing_table"])
+
+
+def test_sql_database_serves_table_info_from_catalog(catalog):
+    db = StatsSQLDatabase(catalog.engine, catalog=catalog)
+
+    assert db.get_table_info() == catalog.table_info()
+    assert "Trae Young" in db.run("SELECT player, ast FROM player_stats ORDER BY ast DESC LIMIT 1")
+
+
+def test_views_replace_the_internal_aggregate_tables(catalog):
+    with catalog.engine.begin() as conn:
+        materialize_aggregates(conn)
+    bump_data_version("sql")
+
+    assert catalog.table_names() == ["leaderboard", "player_stats", "team_stats"]
+    assert StatsSQLDatabase(catalog.engine, catalog=catalog).get_usable_table_names() == catalog.table_names()
+
+    context = catalog.prompt_context("Top 5 players by assists")
+    assert "CREATE VIEW leaderboard (" in context
+    assert "season VARCHAR" in context and "AND season = '<season>'" in context
+    assert "team_stats" not in context
+
+    context = catalog.prompt_context("Which team has the most assists per game?")
+    assert "CREATE VIEW team_stats (" in context
+    assert "ast_per_game FLOAT, -- assists per team game" in context
+    assert "pts_total" not in context
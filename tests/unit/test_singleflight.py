@@ -0,0 +1,41 @@
+import asyncio
+
+from src.core.singleflight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    calls = 0
+
+    async def slow_answer():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "SGA"
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("top scorer", slow_answer) for _ in range(10)))
+        return flight, results
+
+    flight, results = asyncio.run(scenario())
+    assert results == ["SGA"] * 10
+    assert calls == 1
+    assert flight.stats()["upstream_calls_saved"] == 9
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_exception_is_shared_and_key_released():
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(flight.do("q", failing), flight.do("q", failing), return_exceptions=True)
+        # The failed execution is not reused by later callers
+        later = await flight.do("q", lambda: asyncio.sleep(0, result="ok"))
+        return results, later
+
+    results, later = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert later == "ok"
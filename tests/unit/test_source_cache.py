@@ -0,0 +1,78 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.core.config import settings
+from src.data import source_cache
+from src.data.excel_reader import read_stats_excel
+from src.data.source_cache import iter_source_batches, read_source, sample_source
+from tests.unit.test_excel_reader import make_workbook
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SOURCE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "SOURCE_CACHE_PART_ROWS", 4)
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    calls = []
+    iter_stats_excel = source_cache.iter_stats_excel
+
+    def counting(*args, **kwargs):
+        calls.append(args[0])
+        return iter_stats_excel(*args, **kwargs)
+
+    monkeypatch.setattr(source_cache, "iter_stats_excel", counting)
+    return calls
+
+
+def test_cached_batches_match_the_workbook(tmp_path, parses):
+    rows = [[f"Player {i}", "DEN", i * 10, i, None] for i in range(10)]
+    rows[2] = [None] * 5  # empty row
+    rows[5][2] = "n/a"  # mixed column, kept as text
+    path = str(make_workbook(tmp_path / "stats.xlsx", rows))
+
+    cached = pd.concat(iter_source_batches(path, batch_size=3, columns=["Player", "PTS", "3PM", "REB"]))
+    again = read_source(path)
+    expected = read_stats_excel(path)
+
+    assert parses == [path]
+    assert list(cached.columns) == ["Player", "PTS", "3PM"]
+    assert list(cached.index) == list(expected.index)
+    # Parsed as validation does: the numbers of the text part are the same
+    pd.testing.assert_series_equal(pd.to_numeric(cached["PTS"], errors="coerce"),
+                                   pd.to_numeric(expected["PTS"], errors="coerce"), check_dtype=False)
+    assert cached.loc[5, "PTS"] == "n/a"
+    assert cached["3PM"].tolist() == expected["3PM"].tolist()
+    assert again["Notes"].isna().all() and list(again.columns) == list(expected.columns)
+
+
+def test_modified_workbook_replaces_its_entry(tmp_path, cache_dir, parses):
+    path = make_workbook(tmp_path / "stats.xlsx", [["Player 0", "DEN", 10, 1, None]])
+    read_source(str(path))
+    make_workbook(path, [["Player 0", "DEN", 12, 1, None]])
+
+    assert read_source(str(path))["PTS"].tolist() == [12]
+    assert len(parses) == 2
+    assert len(os.listdir(cache_dir)) == 1
+
+
+def test_sample_reads_bounded_rows_from_every_part(tmp_path):
+    path = make_workbook(tmp_path / "stats.xlsx", [[f"Player {i}", "DEN", i, 0, None] for i in range(100)])
+
+    sample = sample_source(str(path), max_rows=10)
+
+    assert len(sample) == 10 and sample.index.is_monotonic_increasing
+    assert sample["PTS"].tolist() == list(sample.index)
+
+
+def test_disabled_cache_reads_the_workbook(tmp_path, cache_dir, monkeypatch, parses):
+    monkeypatch.setattr(settings, "SOURCE_CACHE_ENABLED", False)
+    path = make_workbook(tmp_path / "stats.xlsx", [["Player 0", "DEN", 10, 1, None]])
+
+    assert len(read_source(str(path))) == 1
+    assert not cache_dir.exists()
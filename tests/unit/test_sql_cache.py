@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import create_engine, insert
+
+from src.core.config import settings
+from src.data.models import Base, PlayerStatsSQL
+from src.data.versioning import bump_data_version
+from src.rag.schema_catalog import SchemaCatalog
+from src.rag.sql_cache import SQLResultCache, normalize_sql
+from src.rag.sql_database import StatsSQLDatabase
+
+
+@pytest.fixture(autouse=True)
+def data_version_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_VERSION_FILE", str(tmp_path / "data_version.json"))
+
+
+def test_normalize_sql_ignores_formatting_but_not_literals():
+    assert normalize_sql("SELECT player, pts\n  FROM player_stats ORDER BY pts DESC LIMIT 5;") == \
+        normalize_sql("select player,pts from player_stats order by pts desc limit 5")
+    assert normalize_sql("SELECT * FROM player_stats WHERE team = 'LAL'") != \
+        normalize_sql("SELECT * FROM player_stats WHERE team = 'lal'")
+
+
+def test_bounded_by_entries_and_bytes():
+    cache = SQLResultCache(max_entries=2, max_bytes=10)
+    cache.put(cache.make_key("select 1"), "aaaa")
+    cache.put(cache.make_key("select 2"), "bbbb")
+    cache.put(cache.make_key("select 3"), "cccc")
+    assert cache.get(cache.make_key("select 1")) == (False, None)
+    assert cache.stats()["evictions"] == 1
+
+    cache.put(cache.make_key("select 4"), "dddddddd")
+    assert cache.stats()["bytes"] <= 10
+    cache.put(cache.make_key("select 5"), "x" * 11)
+    assert cache.stats()["too_large"] == 1
+
+
+def test_invalidated_by_data_version():
+    cache = SQLResultCache()
+    key = cache.make_key("SELECT 1")
+    cache.put(key, "[(1,)]")
+    assert cache.get(key) == (True, "[(1,)]")
+
+    bump_data_version("sql")
+    assert cache.get(key) == (False, None)
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_sql_database_serves_repeated_queries_from_cache(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(PlayerStatsSQL), [{"player": "Nikola Jokić", "team": "DEN", "pts": 2072.0}])
+
+    cache = SQLResultCache()
+    db = StatsSQLDatabase(engine, catalog=SchemaCatalog(engine), result_cache=cache)
+    first = db.run("SELECT player, pts FROM player_stats ORDER BY pts DESC LIMIT 5")
+    second = db.run("select player, pts from player_stats\norder by pts desc limit 5;")
+
+    assert first == second
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    # Errors are not cached
+    assert "Error" in db.run_no_throw("SELECT missing FROM player_stats")
+    assert cache.stats()["size"] == 1
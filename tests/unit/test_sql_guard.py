@@ -0,0 +1,59 @@
+import pytest
+
+from src.data.engine import get_read_engine
+from src.rag.schema_catalog import SchemaCatalog
+from src.rag.sql_database import StatsSQLDatabase
+from src.rag.sql_guard import GUARD_EVENTS, SQLGuardError, check_read_only
+
+ENDLESS = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT COUNT(*) FROM c"
+
+
+def guard_count(guard: str) -> float:
+    return GUARD_EVENTS._values.get((("guard", guard),), 0.0)
+
+
+@pytest.fixture
+def db(stats_db):
+    writer = stats_db([{"player": f"Player {i}", "team": "OKC", "pts": float(i)} for i in range(300)])
+    engine = get_read_engine(str(writer.url))
+    return StatsSQLDatabase(engine, catalog=SchemaCatalog(engine), max_rows=10, timeout_seconds=0.2, max_result_chars=200)
+
+
+def test_check_read_only():
+    check_read_only("SELECT player FROM player_stats WHERE player = 'Drop; Delete'")
+    check_read_only("WITH t AS (SELECT team, SUM(pts) AS s FROM player_stats GROUP BY team) SELECT * FROM t;")
+
+    for sql in [
+        "DELETE FROM player_stats",
+        "SELECT 1; DROP TABLE player_stats",
+        "WITH t AS (SELECT 1) INSERT INTO player_stats (player) SELECT * FROM t",
+        "PRAGMA query_only = OFF",
+        "ATTACH DATABASE 'x.db' AS x",
+    ]:
+        with pytest.raises(SQLGuardError):
+            check_read_only(sql)
+
+
+def test_rejected_statements_are_reported_to_the_agent(db):
+    before = guard_count("rejected")
+    assert db.run_no_throw("UPDATE player_stats SET pts = 0").startswith("Error: Statement rejected")
+    assert guard_count("rejected") == before + 1
+
+
+def test_runaway_query_is_interrupted(db):
+    before = guard_count("timeout")
+    assert db.run_no_throw(ENDLESS).startswith("Error: Query interrupted after 0.2s")
+    assert guard_count("timeout") == before + 1
+
+    # The pooled connection is usable again, without the deadline
+    assert db.run("SELECT COUNT(*) FROM player_stats") == "[(300,)]"
+
+
+def test_rows_and_output_are_capped(db):
+    output = db.run("SELECT pts FROM player_stats ORDER BY pts")
+    assert output.startswith("[(0.0,), (1.0,)") and "(9.0,)]" in output and "10.0" not in output
+    assert "only the first 10 rows are shown" in output
+
+    output = db.run("SELECT player, team, pts FROM player_stats ORDER BY pts LIMIT 10")
+    assert "output cut to 200 characters" in output
+    assert "only the first" not in output
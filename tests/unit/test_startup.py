@@ -0,0 +1,86 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Only needed once the RAG components are built, never at import time
+DEFERRED_MODULES = {"langchain", "langchain_community", "langchain_mistralai", "mistralai", "logfire", "faiss"}
+
+# Import time of our own modules on top of FastAPI/pydantic (was ~1.2s with eager imports)
+IMPORT_BUDGET_SECONDS = 0.5
+
+
+def _importtime(module: str) -> dict:
+    """
+    Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+    returns {module name: cumulative import time in seconds}.
+    """
+    env = {**os.environ, "MISTRAL_API_KEY": os.environ.get("MISTRAL_API_KEY", "test-key")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def test_api_import_defers_heavy_dependencies():
+    times = _importtime("src.api.main")
+
+    # Exact package names: Pydantic's plugin hook loads `logfire._internal` on
+    # its own when logfire is installed, which is outside of our control
+    assert not DEFERRED_MODULES & set(times)
+
+    overhead = times["src.api.main"] - times["fastapi"]
+    assert overhead < IMPORT_BUDGET_SECONDS, f"src.api.main import took {overhead:.3f}s on top of FastAPI"
+
+
+def test_health_answers_while_warmup_runs_in_background(monkeypatch):
+    from src.api.components import components
+    from src.api.main import app
+
+    release = threading.Event()
+    monkeypatch.setattr(components, "status", "pending")
+    monkeypatch.setattr(components, "_build", lambda: release.wait(5))
+
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+        assert client.get("/ready").status_code == 503
+
+        release.set()
+        response = client.get("/ready", params={"wait": 5})
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+
+
+def test_readiness_waits_hold_no_worker_thread(monkeypatch):
+    from src.api.components import ComponentRegistry
+
+    registry = ComponentRegistry()
+    monkeypatch.setattr(registry, "_build", lambda: None)
+
+    async def scenario():
+        # One worker thread: waits holding it would keep the warmup from running
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+        waits = [asyncio.create_task(registry.wait_ready(5)) for _ in range(10)]
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        await registry.ensure_ready()
+        return await asyncio.gather(*waits), time.perf_counter() - start
+
+    ready, elapsed = asyncio.run(scenario())
+    assert ready == [True] * 10
+    assert elapsed < 1
+    assert registry._ready_waiters == []
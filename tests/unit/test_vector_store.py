@@ -0,0 +1,76 @@
+import asyncio
+import os
+
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from src.core.config import settings
+from src.rag import vector_store
+from src.rag.vector_store import HotSwapRetriever, VectorStoreHandle, publish_vector_store, read_manifest
+
+
+class FakeEmbeddings(Embeddings):
+    """Bag of letters: texts sharing letters are close."""
+
+    def embed_query(self, text):
+        return [text.lower().count(letter) + 0.01 for letter in "abcdefghijklmnopqrstuvwxyz"]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_VERSION_FILE", str(tmp_path / "data_version.json"))
+
+
+def publish(path, texts):
+    return publish_vector_store(FAISS.from_texts(texts, FakeEmbeddings()), path=str(path))
+
+
+def test_new_version_is_swapped_in_and_old_ones_pruned(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_STORE_KEEP_VERSIONS", 2)
+    first = publish(tmp_path, ["zone defense rules"])
+    handle = VectorStoreHandle(str(tmp_path), FakeEmbeddings())
+    retriever = HotSwapRetriever(handle=handle, search_kwargs={"k": 1})
+
+    assert handle.refresh() and handle.version == first
+    assert not handle.refresh()
+    assert retriever.invoke("zone")[0].page_content == "zone defense rules"
+
+    publish(tmp_path, ["travel rules"])
+    third = publish(tmp_path, ["goaltending rules"])
+    # The retriever keeps serving the loaded index until the handle swaps
+    assert retriever.invoke("goal")[0].page_content == "zone defense rules"
+    assert handle.refresh() and handle.version == third
+    assert asyncio.run(retriever.ainvoke("goal"))[0].page_content == "goaltending rules"
+    assert len(os.listdir(tmp_path / "versions")) == 2
+
+
+def test_failed_load_keeps_the_current_index(tmp_path):
+    publish(tmp_path, ["zone defense rules"])
+    handle = VectorStoreHandle(str(tmp_path), FakeEmbeddings())
+    handle.refresh()
+
+    broken = publish(tmp_path, ["travel rules"])
+    os.remove(tmp_path / read_manifest(str(tmp_path))["directory"] / "index.faiss")
+
+    assert not handle.refresh() and not handle.refresh()
+    assert handle.version != broken and handle.reload_failures == 1
+    assert handle.current().similarity_search("zone", k=1)[0].page_content == "zone defense rules"
+
+
+def test_missing_index_is_never_built_on_the_serving_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, "create_vector_db", lambda *args: pytest.fail("index built while serving"))
+    handle = VectorStoreHandle(str(tmp_path), FakeEmbeddings())
+
+    assert not handle.refresh()
+    assert HotSwapRetriever(handle=handle).invoke("zone") == []
+
+
+def test_legacy_index_is_served(tmp_path):
+    FAISS.from_texts(["zone defense rules"], FakeEmbeddings()).save_local(str(tmp_path))
+    handle = VectorStoreHandle(str(tmp_path), FakeEmbeddings())
+
+    assert handle.refresh() and handle.version == "legacy"
@@ -10,6 +10,8 @@ from mistralai.exceptions import MistralAPIException
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document # Utilisé pour le format attendu par le splitter
 
+from src.rag.embedding_cache import get_embedding_cache
+
 from .config import (
     MISTRAL_API_KEY, EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE,
     FAISS_INDEX_FILE, DOCUMENT_CHUNKS_FILE, CHUNK_SIZE, CHUNK_OVERLAP
@@ -199,6 +201,14 @@ class VectorStoreManager:
         except Exception as e:
             logging.error(f"Erreur lors de la sauvegarde de l'index/chunks: {e}")
 
+    def _embed_query(self, text: str) -> List[float]:
+        """Embedding d'une requête via l'API Mistral."""
+        response = self.mistral_client.embeddings(
+            model=EMBEDDING_MODEL,
+            input=[text] # La requête doit être une liste
+        )
+        return response.data[0].embedding
+
     def search(self, query_text: str, k: int = 5, min_score: float = None) -> List[Dict[str, any]]:
         """
         Recherche les k chunks les plus pertinents pour une requête.
@@ -220,12 +230,9 @@ class VectorStoreManager:
 
         logging.info(f"Recherche des {k} chunks les plus pertinents pour: '{query_text}'")
         try:
-            # 1. Générer l'embedding de la requête
-            response = self.mistral_client.embeddings(
-                model=EMBEDDING_MODEL,
-                input=[query_text] # La requête doit être une liste
-            )
-            query_embedding = np.array([response.data[0].embedding]).astype('float32')
+            # 1. Générer l'embedding de la requête (ou le reprendre du cache des embeddings)
+            embedding = get_embedding_cache().get_or_compute(EMBEDDING_MODEL, query_text, self._embed_query)
+            query_embedding = np.array([embedding]).astype('float32')
 
             # Normaliser l'embedding de la requête pour la similarité cosinus
             faiss.normalize_L2(query_embedding)